@@ -0,0 +1,126 @@
+"""
+catalog_events.py
+
+Change notifications for the recipe and spice catalogs.
+
+In-memory indexes (pantry matcher, fuzzy names, caches) subscribe here instead
+of polling the database. ORM writes are collected automatically on every
+flush; writes issued as Core statements call `mark()` on the session. The
+changes of a transaction are published once it commits, and dropped if it
+rolls back, so subscribers never see uncommitted data.
+
+Author: Rafael Kaher
+"""
+
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.db_manager import Ingredient, Recipe, RecipeIngredient
+from app.core.logger import get_logger
+from app.core.modules.spices.db.spices_models import Spice
+
+logger = get_logger(__name__)
+
+_INFO_KEY = "catalog_changes"
+_subscribers = []
+
+
+@dataclass
+class CatalogChanges:
+    """
+    Ids touched by one committed transaction.
+
+    Attributes:
+        recipes (set[int]): Recipes created or changed (name, steps or ingredients).
+        deleted_recipes (set[int]): Recipes removed.
+        ingredients (set[int]): Ingredients created, renamed or removed.
+        spices (set[int]): Spices created, renamed or removed.
+    """
+    recipes: set = field(default_factory=set)
+    deleted_recipes: set = field(default_factory=set)
+    ingredients: set = field(default_factory=set)
+    spices: set = field(default_factory=set)
+
+    def __bool__(self):
+        return bool(self.recipes or self.deleted_recipes or self.ingredients or self.spices)
+
+
+def subscribe(callback):
+    """
+    Call `callback(changes)` after every commit that touched the catalog.
+    Usable as a decorator; callbacks should be cheap and must not raise.
+    """
+    _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def mark(session: Session, recipes=(), deleted_recipes=(), ingredients=(), spices=()):
+    """
+    Record changes made outside the ORM unit of work (bulk Core statements).
+
+    Example:
+        ```python
+        session.execute(delete(Recipe).where(Recipe.id.in_(ids)))
+        mark(session, deleted_recipes=ids)
+        ```
+    """
+    changes = session.info.setdefault(_INFO_KEY, CatalogChanges())
+    changes.recipes.update(recipes)
+    changes.deleted_recipes.update(deleted_recipes)
+    changes.ingredients.update(ingredients)
+    changes.spices.update(spices)
+
+
+def pending(session: Session) -> CatalogChanges | None:
+    """Changes flushed in `session` but not yet committed, if any."""
+    return session.info.get(_INFO_KEY)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    recipes, deleted, ingredients, spices = set(), set(), set(), set()
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Recipe):
+            recipes.add(obj.id)
+        elif isinstance(obj, RecipeIngredient):
+            recipes.add(obj.recipe_id)
+        elif isinstance(obj, Ingredient):
+            ingredients.add(obj.id)
+        elif isinstance(obj, Spice):
+            spices.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Recipe):
+            deleted.add(obj.id)
+        elif isinstance(obj, RecipeIngredient):
+            recipes.add(obj.recipe_id)
+        elif isinstance(obj, Ingredient):
+            ingredients.add(obj.id)
+        elif isinstance(obj, Spice):
+            spices.add(obj.id)
+    if recipes or deleted or ingredients or spices:
+        mark(session, recipes - {None}, deleted - {None}, ingredients - {None}, spices - {None})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session):
+    changes = session.info.pop(_INFO_KEY, None)
+    if not changes:
+        return
+    changes.recipes -= changes.deleted_recipes
+    for callback in list(_subscribers):
+        try:
+            callback(changes)
+        except Exception as e:
+            logger.warning("⚠️ Catalog subscriber %r failed → %s", callback, e)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_INFO_KEY, None)
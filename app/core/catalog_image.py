@@ -0,0 +1,215 @@
+"""
+catalog_image.py
+
+Read-only catalog image shared by every worker through mmap.
+
+An image is a directory of versioned catalog snapshots (see
+`catalog_snapshot`) plus a `CURRENT` file naming the published one:
+
+    <root>/CURRENT
+    <root>/v20261019T120000123456/manifest.json, recipes.id.npy, ...
+
+`publish()` exports a new version into a staging directory, renames it into
+place and then replaces `CURRENT` with `os.replace`, so a reader sees either
+the old version or the new one, never a partial export. Each uvicorn worker
+memory-maps the current version read-only: the pages live once in the OS
+page cache whatever the number of workers, and a worker holds little more than
+the file handles. Workers notice a new `CURRENT` within `CHECK_INTERVAL`
+seconds and swap to it between requests.
+
+Serving from the image is opt-in: set PANACEIA_CATALOG_IMAGE to the image
+root before the app is imported. `lookup_recipe()` then answers
+`get_recipe_by_name` and the recipe half of spice suggestions. Writes made
+through this worker after the version was exported are followed through
+`catalog_events`: the recipes they touch (and every recipe, once an ingredient
+changes) fall back to the database until a newer version is published. Writes
+made by other workers are seen once the next version is published.
+
+Author: Rafael Kaher
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.core import catalog_events
+from app.core.catalog_snapshot import CatalogSnapshot, export_snapshot, load_snapshot
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_ENV = "PANACEIA_CATALOG_IMAGE"
+CURRENT = "CURRENT"
+CHECK_INTERVAL = 1.0
+KEEP_VERSIONS = 3
+
+
+def publish(
+    root: str | Path,
+    session: Session | None = None,
+    spice_session: Session | None = None,
+    keep: int = KEEP_VERSIONS
+) -> str:
+    """
+    Export the catalog as a new image version and make it current.
+
+    Versions older than the `keep` most recent are removed. Workers that still
+    map a removed version keep reading it until they swap, since its open
+    files outlive the directory entry.
+
+    Returns:
+        str: The published version name.
+
+    Example:
+        ```python
+        publish("/var/lib/panaceia/catalog")
+        # Returns: 'v20261019T120000123456'
+        ```
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    version = "v" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=root))
+    try:
+        export_snapshot(staging, session, spice_session)
+        staging.rename(root / version)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = root / f".{CURRENT}.{os.getpid()}"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT)
+    logger.info("📦 Published catalog image %s", version)
+
+    for old in sorted(p for p in root.glob("v*") if p.is_dir())[:-max(keep, 1)]:
+        shutil.rmtree(old, ignore_errors=True)
+    return version
+
+
+class CatalogImage:
+    """
+    The current version of an image, reloaded when `CURRENT` changes.
+
+    Example:
+        ```python
+        image = CatalogImage("/var/lib/panaceia/catalog")
+        image.recipe("Pancakes")
+        # Returns: {"name": "Pancakes", "steps": "...", "ingredients": [...]} or None
+        ```
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        self._created = 0.0
+        self._checked = float("-inf")
+        self._dirty = {}
+        self._stale_since = 0.0
+
+    @property
+    def version(self) -> str | None:
+        return self._version
+
+    def current(self) -> CatalogSnapshot | None:
+        """The mapped snapshot, after checking `CURRENT` at most once per `CHECK_INTERVAL`."""
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked >= CHECK_INTERVAL:
+                self._checked = now
+                self._refresh()
+        return self._snapshot
+
+    def _refresh(self):
+        try:
+            version = (self.root / CURRENT).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return
+        if version == self._version:
+            return
+        try:
+            snapshot = load_snapshot(self.root / version)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Catalog image %s not loaded → %s", version, e)
+            return
+        created = datetime.fromisoformat(snapshot.manifest["created_at"]).timestamp()
+        self._dirty = {rid: at for rid, at in self._dirty.items() if at >= created}
+        self._snapshot, self._version, self._created = snapshot, version, created
+        logger.info("📦 Serving catalog image %s", version)
+
+    def on_catalog_change(self, changes: catalog_events.CatalogChanges):
+        now = time.time()
+        with self._lock:
+            for rid in changes.recipes | changes.deleted_recipes:
+                self._dirty[rid] = now
+            if changes.ingredients:
+                self._stale_since = now
+
+    def recipe(self, name: str) -> dict | None:
+        """
+        The recipe named exactly `name`, or None when the image cannot answer:
+        no image, a name it does not hold, or a recipe changed since it was exported.
+        """
+        snapshot = self.current()
+        if snapshot is None or self._stale_since >= self._created:
+            return None
+        row = snapshot.find_recipe(name)
+        if row is None or self._dirty.get(int(snapshot["recipes.id"][row]), 0.0) >= self._created:
+            return None
+        return snapshot.recipe(row)
+
+
+image = CatalogImage(os.environ[IMAGE_ENV]) if os.environ.get(IMAGE_ENV) else None
+
+
+@catalog_events.subscribe
+def _on_catalog_change(changes):
+    if image is not None:
+        image.on_catalog_change(changes)
+
+
+def lookup_recipe(name: str, session: Session | None = None) -> dict | None:
+    """
+    Serve a recipe from the catalog image when one is enabled and current.
+
+    Returns None whenever the caller should read the database instead,
+    including when `session` holds catalog writes not yet committed.
+
+    Example:
+        ```python
+        cached = lookup_recipe("Pancakes", session)
+        if cached is None:
+            ...  # query the database
+        ```
+    """
+    if image is None or (session is not None and catalog_events.pending(session)):
+        return None
+    return image.recipe(name)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.core import db_manager
+    from app.core.modules.spices.db import spices_models
+
+    parser = argparse.ArgumentParser(description="Publish a new version of the PanaceIA catalog image.")
+    parser.add_argument("root", nargs="?", default=os.environ.get(IMAGE_ENV), help=f"image root (default ${IMAGE_ENV})")
+    parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="versions to keep")
+    args = parser.parse_args()
+    if not args.root:
+        parser.error(f"give an image root or set {IMAGE_ENV}")
+    db_manager.init_db()
+    spices_models.init_db()
+    print(publish(args.root, keep=args.keep))
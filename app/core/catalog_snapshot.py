@@ -0,0 +1,312 @@
+"""
+catalog_snapshot.py
+
+Columnar snapshots of the whole catalog, loadable without the ORM.
+
+Warming caches or building recommender matrices needs every recipe,
+ingredient, link and spice at once, and hydrating them as ORM objects costs
+seconds at catalog scale. `export_snapshot()` reads the tables with plain Core
+selects and writes them as a directory of `.npy` columns plus a
+`manifest.json`:
+
+    recipes.id / .name / .steps / .links   (`links` = CSR offsets into links.*)
+    recipes.by_name                        (rows in name order, for lookups)
+    links.recipe_id / .ingredient_id / .quantity
+    ingredients.id / .name / .unit
+    recipe_spices.recipe_id / .spice_id
+    spices.id / .name / .flavor_profile / .recommended_quantity / ...
+    strings.blob / .offsets
+
+Text columns hold int32 indexes into one interned string table (UTF-8 blob
+plus offsets; -1 is NULL), ids are int64 and rows are sorted by id, links by
+recipe then ingredient (the order `Recipe.recipe_ingredients` loads them in). `load_snapshot()` memory-maps every column read-only,
+so loading costs a few file opens regardless of size and pages are shared
+between the workers that map the same files. Separate `.npy` files are used
+rather than an `.npz` archive because NumPy cannot memory-map arrays inside
+a zip.
+
+Author: Rafael Kaher
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import db_manager
+from app.core.db_manager import Ingredient, Recipe, RecipeIngredient, RecipeSpice
+from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import Spice
+from app.core.profiling import profiled
+
+FORMAT = "panaceia-catalog"
+VERSION = 2
+MANIFEST = "manifest.json"
+
+# Column kinds per table: "id" → int64, "str" → int32 string index, "float" → float64 (NaN is NULL).
+TABLES = {
+    "recipes": {"id": "id", "name": "str", "steps": "str"},
+    "links": {"recipe_id": "id", "ingredient_id": "id", "quantity": "float"},
+    "ingredients": {"id": "id", "name": "str", "unit": "str"},
+    "recipe_spices": {"recipe_id": "id", "spice_id": "id"},
+    "spices": {
+        "id": "id",
+        "name": "str",
+        "flavor_profile": "str",
+        "recommended_quantity": "str",
+        "pairs_with_ingredients": "str",
+        "pairs_with_recipes": "str",
+    },
+}
+_DTYPES = {"id": np.int64, "str": np.int32, "float": np.float64}
+
+
+class StringTable:
+    """
+    Interned strings stored as one UTF-8 blob and `len + 1` byte offsets.
+
+    Example:
+        ```python
+        snapshot.strings[snapshot["recipes.name"][0]]
+        # Returns: 'Pancakes'
+        ```
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str | None:
+        if index < 0:
+            return None
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def decode(self, indexes) -> list:
+        """Decode a column of string indexes."""
+        return [self[index] for index in np.asarray(indexes).tolist()]
+
+
+class _Interner:
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, value) -> int:
+        if value is None:
+            return -1
+        index = self.index.get(value)
+        if index is None:
+            index = self.index[value] = len(self.index)
+        return index
+
+    def columns(self) -> dict:
+        encoded = [value.encode("utf-8") for value in self.index]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return {
+            "strings.blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "strings.offsets": offsets,
+        }
+
+
+class CatalogSnapshot:
+    """
+    A loaded snapshot: read-only columns keyed `"<table>.<column>"`.
+
+    Example:
+        ```python
+        snapshot = load_snapshot("snapshots/catalog")
+        snapshot["recipes.id"][:3]
+        snapshot.recipe(0)
+        # Returns: {"name": "Pancakes", "steps": "...", "ingredients": [{"name": "Flour", ...}]}
+        ```
+    """
+
+    def __init__(self, path: Path, manifest: dict, columns: dict):
+        self.path = path
+        self.manifest = manifest
+        self.columns = columns
+        self.strings = StringTable(columns["strings.blob"], columns["strings.offsets"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def counts(self) -> dict:
+        return self.manifest["counts"]
+
+    def find_recipe(self, name: str) -> int | None:
+        """Row of the recipe named exactly `name`, by binary search over `recipes.by_name`."""
+        order, names = self["recipes.by_name"], self["recipes.name"]
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.strings[names[order[mid]]] < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self.strings[names[order[lo]]] == name:
+            return int(order[lo])
+        return None
+
+    def recipe(self, row: int) -> dict:
+        """Rebuild recipe `row` in the format of `get_recipe_by_name`."""
+        start, end = self["recipes.links"][row], self["recipes.links"][row + 1]
+        ingredient_rows = np.searchsorted(self["ingredients.id"], self["links.ingredient_id"][start:end])
+        quantities = self["links.quantity"][start:end].tolist()
+        ingredients = [
+            {
+                "name": self.strings[self["ingredients.name"][ing]],
+                "quantity": None if quantity != quantity else quantity,
+                "unit": self.strings[self["ingredients.unit"][ing]],
+            }
+            for ing, quantity in zip(ingredient_rows.tolist(), quantities)
+        ]
+        return {
+            "name": self.strings[self["recipes.name"][row]],
+            "steps": self.strings[self["recipes.steps"][row]],
+            "ingredients": ingredients,
+        }
+
+
+def _table_columns(table: str, rows, intern) -> dict:
+    columns = {}
+    for position, (column, kind) in enumerate(TABLES[table].items()):
+        values = [row[position] for row in rows]
+        if kind == "str":
+            array = np.fromiter(map(intern, values), dtype=np.int32, count=len(values))
+        else:
+            array = np.array(values, dtype=_DTYPES[kind])
+        columns[f"{table}.{column}"] = array
+    return columns
+
+
+@profiled
+def export_snapshot(path: str | Path, session: Session | None = None, spice_session: Session | None = None) -> dict:
+    """
+    Write the current catalog as a columnar snapshot under `path`.
+
+    The manifest is written last, so a directory without one is an
+    unfinished export and `load_snapshot()` refuses it.
+
+    Args:
+        path (str | Path): Snapshot directory, created if missing.
+        session (Session, optional): Recipes session; a private one is used if omitted.
+        spice_session (Session, optional): Spices session; a private one is used if omitted.
+
+    Returns:
+        dict: The manifest: format, version, counts, column dtypes and
+        `created_at`, the time the export started reading.
+
+    Example:
+        ```python
+        export_snapshot("snapshots/catalog")["counts"]
+        # Returns: {"recipes": 100000, "links": 799812, ...}
+        ```
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / MANIFEST).unlink(missing_ok=True)
+
+    started = datetime.now(timezone.utc)
+    intern = _Interner()
+    with db_manager.session_scope(session) as session:
+        rows = {
+            "recipes": session.execute(select(Recipe.id, Recipe.name, Recipe.steps).order_by(Recipe.id)).all(),
+            "links": session.execute(
+                select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id, RecipeIngredient.quantity)
+                .join(Recipe, Recipe.id == RecipeIngredient.recipe_id)
+                .order_by(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+            ).all(),
+            "ingredients": session.execute(
+                select(Ingredient.id, Ingredient.name, Ingredient.unit).order_by(Ingredient.id)
+            ).all(),
+            "recipe_spices": session.execute(
+                select(RecipeSpice.recipe_id, RecipeSpice.spice_id).order_by(RecipeSpice.recipe_id, RecipeSpice.spice_id)
+            ).all(),
+        }
+    with db_manager.session_scope(spice_session, factory=spices_models.SessionLocal) as spice_session:
+        rows["spices"] = spice_session.execute(
+            select(
+                Spice.id, Spice.name, Spice.flavor_profile, Spice.recommended_quantity,
+                Spice.pairs_with_ingredients, Spice.pairs_with_recipes
+            ).order_by(Spice.id)
+        ).all()
+
+    columns = {}
+    for table in TABLES:
+        columns.update(_table_columns(table, rows[table], intern))
+    columns["recipes.links"] = np.append(
+        np.searchsorted(columns["links.recipe_id"], columns["recipes.id"]), len(columns["links.recipe_id"])
+    ).astype(np.int64)
+    names = [name for _, name, _ in rows["recipes"]]
+    columns["recipes.by_name"] = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int32)
+    columns.update(intern.columns())
+
+    for name, array in columns.items():
+        np.save(path / f"{name}.npy", array, allow_pickle=False)
+
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "created_at": started.isoformat(),
+        "counts": {table: len(rows[table]) for table in TABLES} | {"strings": len(intern.index)},
+        "columns": {name: {"dtype": array.dtype.str, "length": len(array)} for name, array in columns.items()},
+    }
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_snapshot(path: str | Path, mmap: bool = True) -> CatalogSnapshot:
+    """
+    Open a snapshot written by `export_snapshot()`.
+
+    Args:
+        path (str | Path): Snapshot directory.
+        mmap (bool): Memory-map the columns read-only (default) instead of
+            reading them into private memory.
+
+    Raises:
+        ValueError: The directory holds no finished snapshot, another format
+            or version, or a column that does not match the manifest.
+
+    Example:
+        ```python
+        snapshot = load_snapshot("snapshots/catalog")
+        snapshot.counts["recipes"]
+        ```
+    """
+    path = Path(path)
+    try:
+        manifest = json.loads((path / MANIFEST).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"'{path}' has no catalog snapshot manifest.") from None
+    if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+        raise ValueError(
+            f"'{path}' holds {manifest.get('format')} v{manifest.get('version')}, expected {FORMAT} v{VERSION}."
+        )
+
+    columns = {}
+    for name, spec in manifest["columns"].items():
+        array = np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or len(array) != spec["length"]:
+            raise ValueError(f"Column '{name}' in '{path}' does not match its manifest.")
+        columns[name] = array
+    return CatalogSnapshot(path, manifest, columns)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the PanaceIA catalog as a columnar snapshot.")
+    parser.add_argument("path", help="snapshot directory")
+    args = parser.parse_args()
+    db_manager.init_db()
+    spices_models.init_db()
+    print(json.dumps(export_snapshot(args.path)["counts"]))
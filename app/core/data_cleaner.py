@@ -11,8 +11,12 @@ It also validates schema integrity using Pydantic models.
 Author: Rafael Kaher
 """
 
-from app.core.schemas import IngredientSchema, RecipeSchema
-from pydantic import ValidationError
+import hashlib
+import json
+import math
+from app.core.schemas import ImportRecipeSchema, IngredientSchema, RecipeSchema
+from pydantic import BaseModel, ValidationError
+from app.core.profiling import profiled
 
 def normalize_string(value:str | dict) ->str|dict:
     """
@@ -73,6 +77,38 @@ def normalize_quantity(value: float | dict) -> float|dict:
     except (ValueError, TypeError):
         return None
 
+UNIT_MAP = {
+    "gramas":"Grm",
+    "gramos":"Grm",
+    "gram":"Grm",
+    "gms":"Grm",
+    "l":"l",
+    "litros":"l",
+    "litro":"l",
+    "mls":"Mls",
+    "mililitros":"Mls",
+    "cps":"Cps",
+    "copos":"Cps",
+    "copo":"Cp",
+    "colher":"Cl",
+    "colheres":"Cls",
+    "colheres de sopa":"Cls Sopa",
+    "colher de sopa":"Cl Sopa",
+    "colher de sobremesa":"Cl SobreMs",
+    "colheres de sobremesa":"Cls SobreMs",
+    "colheres de cha":"Cls Chá",
+    "colher de cha":"Cl Chá",
+    "xicara":"Xca",
+    "xicaras":"Xcas",
+    "chicara":"Xca",
+    "chicaras":"Xcas",
+    "kilos":"Kgs",
+    "kilo":"Kg",
+    "quilo":"Kg",
+    "quilos":"Kgs",
+    "unit":"Unit"
+}
+
 def normalize_unit(value: str | dict) -> str | dict:
     """
     Normalize units of measurement into standardized abbreviations.
@@ -90,54 +126,24 @@ def normalize_unit(value: str | dict) -> str | dict:
         # Returns: 'Grm'
         ```
     """
-    unit_map = {
-        "gramas":"Grm",
-        "gramos":"Grm",
-        "gram":"Grm",
-        "gms":"Grm",
-        "l":"l",
-        "litros":"l",
-        "litro":"l",
-        "mls":"Mls",
-        "mililitros":"Mls",
-        "cps":"Cps",
-        "copos":"Cps",
-        "copo":"Cp",
-        "colher":"Cl",
-        "colheres":"Cls",
-        "colheres de sopa":"Cls Sopa",
-        "colher de sopa":"Cl Sopa",
-        "colher de sobremesa":"Cl SobreMs",
-        "colheres de sobremesa":"Cls SobreMs",
-        "colheres de cha":"Cls Chá",
-        "colher de cha":"Cl Chá",
-        "xicara":"Xca",
-        "xicaras":"Xcas",
-        "chicara":"Xca",
-        "chicaras":"Xcas",
-        "kilos":"Kgs",
-        "kilo":"Kg",
-        "quilo":"Kg",
-        "quilos":"Kgs",
-        "unit":"Unit"
-    }
     if isinstance(value, dict):
         cleaned_dict = {}
         for key, v in value.items():
             clean_key = key.strip().title() if isinstance(key, str) else key
             if isinstance(v, str):
                 raw_value = v.strip().lower()
-                clean_value = unit_map.get(raw_value, v.title())
+                clean_value = UNIT_MAP.get(raw_value, v.title())
             else:
                 clean_value = v
             cleaned_dict[clean_key] = clean_value
         return cleaned_dict
     try:
         v = value.strip().lower()
-        return unit_map.get(v, value.strip())
+        return UNIT_MAP.get(v, value.strip())
     except (ValueError, TypeError):
         return None
 
+@profiled
 def clean_recipe(data: dict) -> dict:
     """
     Clean and normalize a recipe dictionary, including nested ingredients.
@@ -202,6 +208,7 @@ def apply_cleaning(data: dict, cleaning_map: dict):
         if key in cleaning_map and value is not None
     }
 
+@profiled
 def validate_and_clean_ingredient(raw_data: dict):
     """
     Validate and clean a raw ingredient dictionary.
@@ -234,6 +241,7 @@ def validate_and_clean_ingredient(raw_data: dict):
 
     return {"status": "success", "data": normalized}
 
+@profiled
 def validate_and_clean_recipe(raw_data: dict):
     """
     Validate and clean a raw recipe dictionary, including nested ingredients.
@@ -262,11 +270,126 @@ def validate_and_clean_recipe(raw_data: dict):
     """
     normalized = clean_recipe(raw_data)
     try:
-        valid = RecipeSchema(**normalized)
+        RecipeSchema(**normalized)
     except ValidationError as e:
         return {"status": "error", "message": e.errors()}
-    return {"status": "success", "data": clean_recipe(valid.model_dump())}
+    return {"status": "success", "data": normalized}
 
+def _parse_quantity(value) -> float | None:
+    if isinstance(value, bool):
+        return None
+    try:
+        quantity = float(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        return None
+    return quantity if math.isfinite(quantity) else None
+
+@profiled
+def validate_and_normalize_recipe(raw_data: dict) -> dict:
+    """
+    Validate and normalize a raw recipe in a single pass.
+
+    Each field is parsed exactly once. Problems are collected instead of
+    stopping at the first one, so the result is either the cleaned record or
+    the complete error report. Names are title-cased, quantities become
+    floats, units are mapped through `UNIT_MAP`, and steps and any other keys
+    (`spices`, ...) are kept as given.
+
+    Args:
+        raw_data (dict): Must contain:
+            - `name` (str)
+            - `steps` (str)
+            - `ingredients` (list[dict]) with `name`, `quantity` and optional `unit`
+
+    Returns:
+        dict: {"status": "success", "data": {...}} or
+        {"status": "error", "message": "...", "errors": [{"field": "...", "message": "..."}]}
+
+    Example:
+        ```python
+        validate_and_normalize_recipe({
+            "name": "panCakes",
+            "steps": "Mix and fry",
+            "ingredients": [{"name": "flour", "quantity": "200", "unit": "gramas"}]
+        })
+        # Returns: {"status": "success", "data": {"name": "Pancakes", "steps": "Mix and fry",
+        #           "ingredients": [{"name": "Flour", "quantity": 200.0, "unit": "Grm"}]}}
+        ```
+    """
+    if not isinstance(raw_data, dict):
+        return {"status": "error", "message": "Invalid recipe structure",
+                "errors": [{"field": "recipe", "message": "Expected an object."}]}
+
+    errors = []
+    structural = False
+    name, steps, ingredients = raw_data.get("name"), raw_data.get("steps"), raw_data.get("ingredients", [])
+
+    if not isinstance(name, str) or not name.strip():
+        errors.append({"field": "name", "message": "A recipe name is required."})
+        structural = True
+    if not isinstance(steps, str) or not steps.strip():
+        errors.append({"field": "steps", "message": "Steps are required."})
+        structural = True
+    if not isinstance(ingredients, list):
+        errors.append({"field": "ingredients", "message": "Expected a list of ingredients."})
+        structural, ingredients = True, []
+
+    cleaned_ingredients = []
+    for position, item in enumerate(ingredients):
+        field = f"ingredients[{position}]"
+        if not isinstance(item, dict):
+            errors.append({"field": field, "message": "Expected an object."})
+            structural = True
+            continue
+        ingredient_name = item.get("name")
+        if not isinstance(ingredient_name, str) or not ingredient_name.strip():
+            errors.append({"field": f"{field}.name", "message": "An ingredient name is required."})
+            structural = True
+            continue
+        ingredient_name = ingredient_name.strip().title()
+        quantity = _parse_quantity(item.get("quantity"))
+        if quantity is None:
+            errors.append({"field": f"{field}.quantity", "message": f"Invalid quantity for ingredient '{ingredient_name}'"})
+        unit = item.get("unit")
+        if unit is None:
+            unit = ""
+        elif isinstance(unit, str):
+            unit = UNIT_MAP.get(unit.strip().lower(), unit.strip())
+        else:
+            errors.append({"field": f"{field}.unit", "message": f"Invalid unit for ingredient '{ingredient_name}'"})
+        cleaned_ingredients.append({"name": ingredient_name, "quantity": quantity, "unit": unit})
+
+    if errors:
+        message = "Invalid recipe structure" if structural else errors[0]["message"]
+        return {"status": "error", "message": message, "errors": errors}
+
+    cleaned = dict(raw_data)
+    cleaned.update(name=name.strip().title(), steps=steps, ingredients=cleaned_ingredients)
+    return {"status": "success", "data": cleaned}
+
+def normalize_feed_recipe(record: ImportRecipeSchema) -> dict:
+    """
+    Normalize a recipe that `schemas.RECIPE_FEED` already validated: the same
+    data `validate_and_normalize_recipe` returns, without checking it again.
+
+    Example:
+        ```python
+        normalize_feed_recipe(RECIPE_FEED.validate_json(body)[0])
+        # Returns: {"name": "Pancakes", "steps": "Mix and fry",
+        #           "ingredients": [{"name": "Flour", "quantity": 200.0, "unit": "Grm"}], "spices": []}
+        ```
+    """
+    return {
+        "name": record.name.title(),
+        "steps": record.steps,
+        "ingredients": [
+            {"name": item.name.title(), "quantity": item.quantity, "unit": UNIT_MAP.get(item.unit.strip().lower(), item.unit.strip())}
+            for item in record.ingredients
+        ],
+        "spices": record.spices,
+    }
+
+@profiled
 def normalize_universal_input(value):
     """
     It takes inputs and normalize them, it reconizes strings, unit and floats.
@@ -376,3 +499,23 @@ def normalize_universal_input(value):
         return normalize_quantity(value)
     else:
         return value
+
+
+def content_hash(payload: dict | BaseModel) -> str:
+    """
+    Stable hash of an import payload, independent of key order.
+
+    Computed over the payload as received, so unchanged records can be
+    recognized before any normalization runs. Records validated by a feed
+    schema are hashed from their JSON serialization, in field order.
+
+    Example:
+        ```python
+        content_hash({"name": "Pancakes", "steps": "Fry"}) == content_hash({"steps": "Fry", "name": "Pancakes"})
+        # Returns: True
+        ```
+    """
+    if isinstance(payload, BaseModel):
+        return hashlib.blake2b(payload.model_dump_json().encode(), digest_size=16).hexdigest()
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
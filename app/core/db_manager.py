@@ -10,24 +10,124 @@ providing persistent storage and standardized access to the database layer.
 Author: Rafael Kaher
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, Table
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Float, ForeignKey, Index, Table
+from sqlalchemy.orm import Session, sessionmaker, declarative_base, relationship
+from contextlib import contextmanager
+import json
 import os
+import threading
 
-if "PYTEST_CURRENT_TEST" in os.environ:
-    # Shared in-memory DB for tests
-    engine = create_engine(
-        "sqlite:///file::memory:?cache=shared",
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        "sqlite:///recipes.db",
-        connect_args={"check_same_thread": False}
-    )
+class LazySessionmaker(sessionmaker):
+    """
+    A sessionmaker that binds itself to `engine_factory()` on first use,
+    so importing a models module never opens a database.
+    """
+
+    def __init__(self, engine_factory, **kw):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+def database_url(filename: str) -> str:
+    """Shared in-memory DB for tests, otherwise a local SQLite file."""
+    if "PYTEST_CURRENT_TEST" in os.environ:
+        return "sqlite:///file::memory:?cache=shared"
+    return f"sqlite:///{filename}"
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the recipes engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(
+                database_url("recipes.db"),
+                connect_args={"check_same_thread": False}
+            )
+    return _engine
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
-SessionLocal = sessionmaker(bind=engine)
+SessionLocal = LazySessionmaker(get_engine)
+
+def init_db():
+    """
+    Create any missing tables in the recipes database and apply pending
+    migrations. Called once at application startup instead of on import.
+    """
+    from app.core.migrations import migrate
+    Base.metadata.create_all(bind=get_engine())
+    migrate(get_engine())
+
+@contextmanager
+def session_scope(session: Session | None = None, factory=None):
+    """
+    Unit of work used by every manager function.
+
+    When a request-scoped session is injected it is yielded untouched, and the
+    request commits it once at the end. Otherwise a private session is opened,
+    committed on success, rolled back on error and always closed.
+
+    Args:
+        session (Session, optional): Session injected by the route.
+        factory (callable, optional): Session factory for private sessions,
+            defaults to this module's `SessionLocal`.
+
+    Example:
+        ```python
+        with session_scope(session) as session:
+            session.add(Recipe(name="Pancakes", steps="Mix and fry."))
+        ```
+    """
+    if session is not None:
+        yield session
+        return
+
+    own = (factory or SessionLocal)()
+    try:
+        yield own
+        own.commit()
+    except Exception:
+        own.rollback()
+        raise
+    finally:
+        own.close()
+
+def get_session():
+    """
+    FastAPI dependency providing one session per request.
+    The whole request is committed once after the endpoint returns,
+    or rolled back if it raised.
+    """
+    with session_scope() as session:
+        yield session
+
+def run_after_commit(session: Session, callback):
+    """
+    Run `callback()` once the session's current transaction commits.
+    Callbacks are discarded if the transaction rolls back.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(session):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_commit_callbacks(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("after_commit", None)
 
 class RecipeIngredient(Base):
 
@@ -52,8 +152,11 @@ class RecipeIngredient(Base):
     """
 
     __tablename__ = "recipe_ingredients"
+    __table_args__ = (
+        Index("ix_recipe_ingredients_ingredient_recipe", "ingredient_id", "recipe_id"),
+    )
 
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
     ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True)
     quantity = Column(Float)
 
@@ -70,9 +173,11 @@ class Recipe(Base):
         id (int): Primary key identifier.
         name (str): Recipe name, must be unique.
         steps (str): Instructions for preparation.
+        content_hash (str): Hash of the payload it was last imported from, if any.
 
     Relationships:
-        recipe_ingredients: A list of RecipeIngredient objects linked to this recipe.
+        recipe_ingredients: A list of RecipeIngredient objects linked to this recipe,
+            loaded in ingredient id order (as the catalog snapshot and memory catalog hold them).
 
     Example:
         ```python
@@ -85,11 +190,14 @@ class Recipe(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     steps = Column(String)
+    content_hash = Column(String, index=True)
 
     recipe_ingredients = relationship(
         "RecipeIngredient",
         back_populates="recipe",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by=RecipeIngredient.ingredient_id
     )
 
 class Ingredient(Base):
@@ -130,8 +238,11 @@ class RecipeSpice(Base):
     Each record indicates that a recipe includes or was suggested a given spice.
     """
     __tablename__ = "recipe_spices"
+    __table_args__ = (
+        Index("ix_recipe_spices_spice_recipe", "spice_id", "recipe_id"),
+    )
 
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
     spice_id = Column(Integer, ForeignKey("spices.id"), primary_key=True)
 
     recipe = relationship("Recipe", back_populates="spice_links")
@@ -139,9 +250,120 @@ class RecipeSpice(Base):
 
 
 Recipe.spice_links = relationship(
-    "RecipeSpice", back_populates="recipe", cascade="all, delete-orphan"
+    "RecipeSpice", back_populates="recipe", cascade="all, delete-orphan", passive_deletes=True
 )
 
-from app.core.modules.spices.db.spices_models import Spice
+# 🔹 Database-level cascade for recipe children.
+# SQLite only enforces `ON DELETE CASCADE` with `PRAGMA foreign_keys=ON`, which
+# this schema cannot use: `recipe_spices.spice_id` points at the separate spices
+# database. The trigger gives the same guarantee, so deleting a recipe never
+# needs its links loaded (`passive_deletes` above).
+RECIPES_CASCADE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS recipes_cascade_delete AFTER DELETE ON recipes BEGIN "
+    "DELETE FROM recipe_ingredients WHERE recipe_id = old.id; "
+    "DELETE FROM recipe_spices WHERE recipe_id = old.id; END"
+)
+
+@event.listens_for(Recipe.__table__, "after_create")
+def _create_cascade_trigger(table, conn, **kw):
+    conn.execute(text(RECIPES_CASCADE_TRIGGER))
+
+# 🔹 Full-text search index over recipe names and steps.
+# An external-content FTS5 table: it stores only the index, reads the text
+# from `recipes`, and is kept in sync by the triggers below. The triggers stay
+# quiet while `recipes_fts_paused` holds a row (see `search_triggers_suspended`).
+RECIPES_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+    "name, steps, content='recipes', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+RECIPES_FTS_PAUSED_TABLE = "CREATE TABLE IF NOT EXISTS recipes_fts_paused (id INTEGER PRIMARY KEY)"
+_FTS_ACTIVE = "WHEN NOT EXISTS (SELECT 1 FROM recipes_fts_paused) "
+RECIPES_FTS_TRIGGERS = {
+    "recipes_fts_insert": (
+        "CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes " + _FTS_ACTIVE + "BEGIN "
+        "INSERT INTO recipes_fts(rowid, name, steps) VALUES (new.id, new.name, new.steps); END"
+    ),
+    "recipes_fts_delete": (
+        "CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes " + _FTS_ACTIVE + "BEGIN "
+        "INSERT INTO recipes_fts(recipes_fts, rowid, name, steps) VALUES ('delete', old.id, old.name, old.steps); END"
+    ),
+    "recipes_fts_update": (
+        "CREATE TRIGGER IF NOT EXISTS recipes_fts_update AFTER UPDATE OF name, steps ON recipes " + _FTS_ACTIVE + "BEGIN "
+        "INSERT INTO recipes_fts(recipes_fts, rowid, name, steps) VALUES ('delete', old.id, old.name, old.steps); "
+        "INSERT INTO recipes_fts(rowid, name, steps) VALUES (new.id, new.name, new.steps); END"
+    ),
+}
+
+def create_search_index(conn, rebuild: bool = False):
+    """Create the recipes FTS table and its triggers; `rebuild` re-reads every recipe."""
+    conn.execute(text(RECIPES_FTS_TABLE))
+    conn.execute(text(RECIPES_FTS_PAUSED_TABLE))
+    for statement in RECIPES_FTS_TRIGGERS.values():
+        conn.execute(text(statement))
+    if rebuild:
+        conn.execute(text("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')"))
+
+_INDEX_RECIPES = text(
+    "INSERT INTO recipes_fts(rowid, name, steps) "
+    "SELECT id, name, steps FROM recipes WHERE id IN (SELECT value FROM json_each(:ids))"
+)
+_UNINDEX_RECIPES = text(
+    "INSERT INTO recipes_fts(recipes_fts, rowid, name, steps) "
+    "SELECT 'delete', id, name, steps FROM recipes WHERE id IN (SELECT value FROM json_each(:ids))"
+)
+
+def index_recipes(conn, ids, remove: bool = False):
+    """
+    Add the current rows of recipes `ids` to the FTS index in one statement,
+    or with `remove` take them out (call that before the rows change).
+    """
+    ids = list(ids)
+    if ids:
+        conn.execute(_UNINDEX_RECIPES if remove else _INDEX_RECIPES, {"ids": json.dumps(ids)})
+
+_PAUSE_SEARCH_TRIGGERS = text("INSERT INTO recipes_fts_paused DEFAULT VALUES RETURNING id")
+_RESUME_SEARCH_TRIGGERS = text("DELETE FROM recipes_fts_paused WHERE id = :id")
 
-Base.metadata.create_all(bind=engine)
+@contextmanager
+def search_triggers_suspended(conn):
+    """
+    Silence the FTS triggers while `conn` writes recipes; the caller indexes
+    what it wrote with `index_recipes`. The triggers are never dropped: a row
+    in `recipes_fts_paused` switches them off, and it is inserted and removed
+    inside the caller's transaction. Other connections never see it, and a
+    rollback discards it.
+    """
+    pause = conn.execute(_PAUSE_SEARCH_TRIGGERS).scalar_one()
+    try:
+        yield conn
+    finally:
+        conn.execute(_RESUME_SEARCH_TRIGGERS, {"id": pause})
+
+@contextmanager
+def bulk_load_search_index(conn):
+    """
+    Suspend the FTS triggers while `conn` loads many recipes, then rebuild the
+    whole index in one pass. Meant for loading a catalog into an empty or
+    mostly new database; batches into a large catalog use
+    `search_triggers_suspended` and `index_recipes` instead.
+
+    Example:
+        ```python
+        with engine.begin() as conn, bulk_load_search_index(conn):
+            conn.execute(insert(Recipe), rows)
+        ```
+    """
+    with search_triggers_suspended(conn):
+        yield conn
+    conn.execute(text("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')"))
+
+@event.listens_for(Recipe.__table__, "after_create")
+def _create_search_index(table, conn, **kw):
+    create_search_index(conn)
+
+@event.listens_for(Recipe.__table__, "before_drop")
+def _drop_search_index(table, conn, **kw):
+    conn.execute(text("DROP TABLE IF EXISTS recipes_fts"))
+
+from app.core.modules.spices.db.spices_models import Spice
@@ -0,0 +1,27 @@
+"""
+dependencies.py
+
+Shared FastAPI dependencies.
+
+`MainSession` and `SpiceSession` give each request a single session per
+database. Both run with `scope="function"`, so the unit of work is committed
+(or rolled back) before the response leaves the server.
+
+Author: Rafael Kaher
+"""
+
+from typing import Annotated
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from app.core import db_manager
+from app.core.modules.spices.db import spices_models
+
+MainSession = Annotated[Session, Depends(db_manager.get_session, scope="function")]
+SpiceSession = Annotated[Session, Depends(spices_models.get_session, scope="function")]
+
+
+async def _raw_body(request: Request) -> bytes:
+    return await request.body()
+
+# The undecoded request body, for endpoints that validate JSON themselves.
+RawBody = Annotated[bytes, Depends(_raw_body)]
@@ -0,0 +1,298 @@
+"""
+fuzzy_index.py
+
+Typo-tolerant name resolution for ingredients and spices.
+
+`FuzzyIndex` answers exact lookups with a dict hit. For typos it uses
+partition filtering: every stored name is cut into `PARTS` segments, and since
+`k` edits can break at most `k` of them, a name within `k` edits of the query
+has `PARTS - k` segments that appear verbatim in the query, each shifted by at
+most `k` characters. A few dozen dict probes therefore yield a handful of
+candidates, which a banded Levenshtein distance confirms. Typo lookups take
+well under a millisecond with 100k names and every update touches `PARTS`
+entries.
+
+`NameCatalog` keeps one index in step with a table's name column: it is built
+on first use and then updated from `catalog_events`, one id at a time.
+
+Writers only rewrite typos when the request asks for it (`fix_typos`):
+close names are often different ingredients (Custard and Mustard, Batter and
+Butter), so by default a new name is stored as given and the close existing
+ones are returned as suggestions (see `NameCatalog.match`). Even when asked,
+auto-resolution is conservative: names shorter than six characters are never
+rewritten, longer ones by one edit (two from twelve characters), and only
+when a single existing name is that close.
+
+Author: Rafael Kaher
+"""
+
+import threading
+from collections import Counter, defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import catalog_events, db_manager
+from app.core.db_manager import Ingredient
+from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import Spice
+
+
+MAX_EDITS = 2
+PARTS = MAX_EDITS + 2
+SUGGESTIONS = 3
+
+
+def max_edits(name: str) -> int:
+    """Edits tolerated when auto-resolving `name`."""
+    length = len(name)
+    if length < 6:
+        return 0
+    return 1 if length < 12 else MAX_EDITS
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance between `a` and `b`, or `limit + 1` once it is known to exceed `limit`.
+
+    Only the diagonal band of width `2 * limit + 1` is computed.
+
+    Example:
+        ```python
+        levenshtein("tomatoe", "tomato", 2)
+        # Returns: 1
+        ```
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    shortest, prefix, suffix = min(len(a), len(b)), 0, 0
+    while prefix < shortest and a[prefix] == b[prefix]:
+        prefix += 1
+    while suffix < shortest - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a, b = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+    if not a or not b:
+        return max(len(a), len(b))
+
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(a) + 1)]
+    for i, cb in enumerate(b, 1):
+        low, high = max(1, i - limit), min(len(a), i + limit)
+        current = [over] * (len(a) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        for j in range(low, high + 1):
+            value = min(previous[j - 1] + (a[j - 1] != cb), previous[j] + 1, current[j - 1] + 1, over)
+            current[j] = value
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        previous = current
+    return previous[-1]
+
+
+def segments(length: int) -> list[tuple[int, int]]:
+    """(start, size) of the `PARTS` segments a name of `length` is cut into."""
+    short, extra = divmod(length, PARTS)
+    bounds, start = [], 0
+    for i in range(PARTS):
+        size = short + (i >= PARTS - extra)
+        bounds.append((start, size))
+        start += size
+    return bounds
+
+
+class FuzzyIndex:
+    """
+    In-memory typo-tolerant index over a set of names.
+
+    Example:
+        ```python
+        index = FuzzyIndex(["Tomato", "Potato", "Basil"])
+        index.resolve("tomatoe")
+        # Returns: 'Tomato'
+        index.suggest("potatoe")
+        # Returns: [('Potato', 1)]
+        ```
+    """
+
+    def __init__(self, names=()):
+        self._names = {}
+        self._segments = defaultdict(set)
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name: str):
+        return name.lower() in self._names
+
+    @staticmethod
+    def _keys(key: str):
+        length = len(key)
+        for i, (start, size) in enumerate(segments(length)):
+            yield length, i, key[start:start + size]
+
+    def add(self, name: str):
+        key = name.lower()
+        self._names[key] = name
+        for segment in self._keys(key):
+            self._segments[segment].add(key)
+
+    def discard(self, name: str):
+        key = name.lower()
+        if self._names.pop(key, None) is None:
+            return
+        for segment in self._keys(key):
+            keys = self._segments.get(segment)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._segments[segment]
+
+    def canonical(self, name: str) -> str | None:
+        """Stored spelling of `name`, ignoring case."""
+        return self._names.get(name.lower())
+
+    def _candidates(self, key: str, limit: int) -> list[str]:
+        candidates = []
+        for length in range(max(1, len(key) - limit), len(key) + limit + 1):
+            delta = len(key) - length
+            matched = Counter()
+            for i, (start, size) in enumerate(segments(length)):
+                # A segment moves by the insertions and deletions before it, and
+                # what remains of `delta` must fit in the edits after it.
+                low = max(0, start - limit, start + delta - limit)
+                high = min(len(key) - size, start + limit, start + delta + limit)
+                found = set()
+                for position in range(low, high + 1):
+                    keys = self._segments.get((length, i, key[position:position + size]))
+                    if keys:
+                        found |= keys
+                matched.update(found)
+            needed = PARTS - limit
+            candidates.extend(candidate for candidate, count in matched.items() if count >= needed)
+        return candidates
+
+    def suggest(self, name: str, limit: int = 5, max_distance: int = MAX_EDITS) -> list[tuple[str, int]]:
+        """
+        Closest stored names within `max_distance` edits (at most `MAX_EDITS`), nearest first.
+
+        Returns:
+            list[tuple[str, int]]: (name, distance) pairs.
+        """
+        key = name.lower()
+        if key in self._names:
+            return [(self._names[key], 0)]
+        max_distance = min(max_distance, MAX_EDITS)
+        scored = []
+        for candidate in self._candidates(key, max_distance):
+            distance = levenshtein(key, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, candidate))
+        scored.sort()
+        return [(self._names[candidate], distance) for distance, candidate in scored[:limit]]
+
+    def resolve(self, name: str) -> str | None:
+        """
+        The stored name `name` refers to: itself ignoring case, or the only
+        name within `max_edits(name)` typos. None when unknown or ambiguous.
+        """
+        exact = self.canonical(name)
+        if exact is not None:
+            return exact
+        limit = max_edits(name)
+        if not limit:
+            return None
+        close = self.suggest(name, limit=2, max_distance=limit)
+        if len(close) == 1 or (len(close) == 2 and close[0][1] < close[1][1]):
+            return close[0][0]
+        return None
+
+    def match(self, name: str, fix_typos: bool = False) -> tuple[str | None, list[str]]:
+        """
+        `(stored name, [])` for the name to use instead of `name`, or
+        `(None, suggestions)` when `name` is new. Case variants always match;
+        typos only with `fix_typos` (see `resolve`).
+
+        Example:
+            ```python
+            FuzzyIndex(["Mustard"]).match("Custard")
+            # Returns: (None, ['Mustard'])
+            ```
+        """
+        canonical = self.resolve(name) if fix_typos else self.canonical(name)
+        if canonical is not None:
+            return canonical, []
+        return None, [close for close, _ in self.suggest(name, limit=SUGGESTIONS)]
+
+
+class NameCatalog:
+    """
+    A `FuzzyIndex` over the name column of `model`, built on first use and
+    kept current from `catalog_events`.
+
+    Args:
+        model: Mapped class with `id` and `name` columns.
+        changes (str): `CatalogChanges` attribute listing the model's touched ids.
+        factory (callable): Session factory for lookups made without a session.
+    """
+
+    def __init__(self, model, changes: str, factory=None):
+        self.model = model
+        self.changes = changes
+        self.factory = factory
+        self._lock = threading.RLock()
+        self._index = None
+        self._names = {}
+        self._pending = set()
+        catalog_events.subscribe(self.on_catalog_change)
+
+    def invalidate(self):
+        """Drop the index; it is rebuilt on next use."""
+        with self._lock:
+            self._index = None
+
+    def on_catalog_change(self, changes: catalog_events.CatalogChanges):
+        with self._lock:
+            if self._index is not None:
+                self._pending |= getattr(changes, self.changes)
+
+    def _refresh(self, session: Session) -> FuzzyIndex:
+        if self._index is None:
+            self._names = dict(session.execute(select(self.model.id, self.model.name)).all())
+            self._index = FuzzyIndex(self._names.values())
+            self._pending = set()
+        elif self._pending:
+            ids, self._pending = self._pending, set()
+            current = dict(session.execute(
+                select(self.model.id, self.model.name).where(self.model.id.in_(ids))
+            ).all())
+            for id_ in ids:
+                old = self._names.pop(id_, None)
+                if old is not None:
+                    self._index.discard(old)
+                if id_ in current:
+                    self._names[id_] = current[id_]
+                    self._index.add(current[id_])
+        return self._index
+
+    def _call(self, method: str, session: Session | None, *args, **kwargs):
+        with db_manager.session_scope(session, factory=self.factory() if self.factory else None) as session:
+            with self._lock:
+                return getattr(self._refresh(session), method)(*args, **kwargs)
+
+    def resolve(self, name: str, session: Session | None = None) -> str | None:
+        return self._call("resolve", session, name)
+
+    def match(self, name: str, session: Session | None = None, fix_typos: bool = False) -> tuple[str | None, list[str]]:
+        return self._call("match", session, name, fix_typos)
+
+    def suggest(self, name: str, limit: int = 5, session: Session | None = None) -> list[tuple[str, int]]:
+        return self._call("suggest", session, name, limit)
+
+
+ingredient_names = NameCatalog(Ingredient, "ingredients")
+spice_names = NameCatalog(Spice, "spices", factory=lambda: spices_models.SessionLocal)
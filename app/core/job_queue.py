@@ -0,0 +1,128 @@
+"""
+job_queue.py
+
+A small in-process job queue served by background worker threads.
+
+Jobs are grouped into batches before they reach their handler, failed batches
+are retried with a linear backoff, and `flush()` blocks until every job enqueued
+so far has been processed, which keeps tests and shutdowns deterministic.
+
+Author: Rafael Kaher
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobQueue:
+    """
+    Batching job queue with retries and a flush API.
+
+    Args:
+        handler (callable): Receives a list of jobs; raising marks the batch as failed.
+        batch_size (int): Maximum number of jobs handed to the handler at once.
+        max_wait (float): Seconds a worker waits to fill a batch after the first job.
+        retries (int): Attempts per batch before it is recorded in `failed`.
+        backoff (float): Base delay in seconds between attempts (multiplied by attempt).
+        workers (int): Number of worker threads, started on the first enqueue.
+        name (str): Prefix for worker thread names.
+
+    Example:
+        ```python
+        jobs = JobQueue(lambda batch: print(batch), batch_size=10)
+        jobs.enqueue("Pancakes")
+        jobs.flush()
+        ```
+    """
+
+    def __init__(self, handler, batch_size=50, max_wait=0.05, retries=3, backoff=0.1, workers=1, name="jobs"):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.workers = workers
+        self.name = name
+        self.failed = deque(maxlen=100)
+
+        self._queue = queue.Queue()
+        self._threads = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs enqueued but not yet processed."""
+        with self._lock:
+            return self._pending
+
+    def enqueue(self, job):
+        """Add a job to the queue, starting the workers if needed."""
+        with self._lock:
+            self._pending += 1
+        self._ensure_workers()
+        self._queue.put(job)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until every enqueued job has been processed.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"{self.name}-{len(self._threads)}",
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._process(batch)
+            finally:
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+
+    def _process(self, batch):
+        for attempt in range(1, self.retries + 1):
+            try:
+                self.handler(batch)
+                return
+            except Exception as e:
+                if attempt == self.retries:
+                    self.failed.append({"jobs": batch, "error": str(e)})
+                    logger.warning("⚠️ %s batch of %d failed → %s", self.name, len(batch), e)
+                    return
+                logger.info("%s batch attempt %d failed, retrying → %s", self.name, attempt, e)
+                time.sleep(self.backoff * attempt)
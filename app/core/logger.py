@@ -0,0 +1,91 @@
+"""
+logger.py
+
+Central logging setup for PanaceIA.
+
+Every module logs through `get_logger(__name__)`. Records are handed to a
+QueueHandler, so request threads never block on stream I/O; a QueueListener
+thread does the actual writing. Messages use lazy `%s` formatting, so a record
+below the configured level costs a single cached level check.
+
+Levels are read from the environment:
+    - PANACEIA_LOG_LEVEL: level for the whole `app` tree (default WARNING).
+    - PANACEIA_LOG_LEVELS: per-module overrides, e.g.
+      "app.core.modules.spices=DEBUG,app.core.job_queue=INFO".
+
+Author: Rafael Kaher
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+ROOT_LOGGER = "app"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener = None
+
+
+def parse_module_levels(spec: str) -> dict:
+    """
+    Parse a per-module level specification.
+
+    Args:
+        spec (str): Comma-separated `module=LEVEL` entries.
+
+    Returns:
+        dict: Logger names mapped to upper-cased level names.
+
+    Example:
+        ```python
+        parse_module_levels("app.core.modules.spices=debug")
+        # Returns: {"app.core.modules.spices": "DEBUG"}
+        ```
+    """
+    levels = {}
+    for entry in spec.split(","):
+        name, sep, level = entry.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: str | None = None, module_levels: dict | None = None):
+    """
+    Install the queue-backed handler on the `app` logger tree.
+    Calling it again only re-applies the levels.
+
+    Args:
+        level (str, optional): Level for the `app` tree, defaults to PANACEIA_LOG_LEVEL.
+        module_levels (dict, optional): Per-module levels, defaults to PANACEIA_LOG_LEVELS.
+    """
+    global _listener
+
+    if level is None:
+        level = os.environ.get("PANACEIA_LOG_LEVEL", "WARNING")
+    if module_levels is None:
+        module_levels = parse_module_levels(os.environ.get("PANACEIA_LOG_LEVELS", ""))
+
+    root = logging.getLogger(ROOT_LOGGER)
+
+    if _listener is None:
+        records = queue.SimpleQueue()
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(records, stream)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.propagate = False
+
+    root.setLevel(level.upper())
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a module, e.g. `get_logger(__name__)`."""
+    return logging.getLogger(name)
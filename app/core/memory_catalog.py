@@ -0,0 +1,332 @@
+"""
+memory_catalog.py
+
+Compact in-memory copy of the catalog for the read endpoints.
+
+Recipes, ingredients and spices are held as `__slots__` dataclasses whose
+strings are interned, so the name of an ingredient, a unit or a steps text
+shared by thousands of recipes is stored once. A recipe references its
+ingredients by integer id, with the ids and quantities in two `array`
+columns rather than lists of objects. Renaming an ingredient therefore updates
+one record, and every recipe reads the new name. At 100k recipes with 4–12
+ingredients each the catalog takes about 600 bytes per recipe. Hydrating the
+same recipes, links and ingredients through the ORM takes about 10 KB per
+recipe (see `test_build_memory_catalog` in the benchmarks).
+
+Like the pantry matcher, each half (recipes database, spices database) is
+built on first use and then follows `catalog_events`: committed writes queue
+the touched ids, and those are re-read in one query before the next read.
+Reads with nothing queued touch no database. Writes made by other processes
+(other uvicorn workers, scripts) raise no events, so each half is also rebuilt
+once it is older than `max_age` seconds: PANACEIA_MEMORY_CATALOG_TTL, 60 by
+default. That bounds how long another worker's writes, deletes included, go
+unseen. A value of 0 turns expiry off, which is only safe with a single
+process writing.
+
+Serving from memory is opt-in: set PANACEIA_MEMORY_CATALOG=1 before the app
+is imported. `recipes_manager`, `ingredients_manager`, `spices_manager` and
+`spice_bridge` then answer their lookups and listings through `active()`.
+
+Author: Rafael Kaher
+"""
+
+import os
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from itertools import groupby
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import catalog_events, db_manager
+from app.core.db_manager import Ingredient, Recipe, RecipeIngredient
+from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import Spice
+
+CATALOG_ENV = "PANACEIA_MEMORY_CATALOG"
+TTL_ENV = "PANACEIA_MEMORY_CATALOG_TTL"
+DEFAULT_MAX_AGE = 60.0
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class IngredientRecord:
+    id: int
+    name: str
+    unit: str | None
+
+
+@dataclass(slots=True)
+class RecipeRecord:
+    id: int
+    name: str
+    steps: str | None
+    ingredient_ids: array
+    quantities: array
+
+
+@dataclass(slots=True)
+class SpiceRecord:
+    id: int
+    name: str
+    flavor_profile: str | None
+    recommended_quantity: str | None
+    pairs_with_ingredients: str | None
+    pairs_with_recipes: str | None
+
+
+SPICE_FIELDS = tuple(SpiceRecord.__slots__)
+
+
+class MemoryCatalog:
+    """
+    Recipes, ingredients and spices kept in memory, in step with `catalog_events`.
+
+    Example:
+        ```python
+        catalog = MemoryCatalog()
+        catalog.recipe("Pancakes")
+        # Returns: {"name": "Pancakes", "steps": "...", "ingredients": [{"name": "Flour", ...}]}
+        ```
+    """
+
+    def __init__(self, max_age: float | None = DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._main_built = False
+        self._spices_built = False
+        self._main_built_at = 0.0
+        self._spices_built_at = 0.0
+        self._pending_recipes = set()
+        self._pending_deleted = set()
+        self._pending_ingredients = set()
+        self._pending_spices = set()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def invalidate(self):
+        """Drop everything; each half is rebuilt on its next read."""
+        with self._lock:
+            self._main_built = False
+            self._spices_built = False
+
+    def on_catalog_change(self, changes: catalog_events.CatalogChanges):
+        with self._lock:
+            if self._main_built:
+                self._pending_recipes |= changes.recipes
+                self._pending_deleted |= changes.deleted_recipes
+                self._pending_ingredients |= changes.ingredients
+            if self._spices_built:
+                self._pending_spices |= changes.spices
+
+    def _expired(self, built_at: float) -> bool:
+        return self.max_age is not None and time.monotonic() - built_at >= self.max_age
+
+    def _ready_main(self, session: Session | None):
+        if self._main_built and self._expired(self._main_built_at):
+            self._main_built = False
+        if self._main_built and not (self._pending_recipes or self._pending_deleted or self._pending_ingredients):
+            return
+        with db_manager.session_scope(session) as session:
+            if not self._main_built:
+                self._build_main(session)
+            else:
+                self._apply_main(session)
+
+    def _ready_spices(self, session: Session | None):
+        if self._spices_built and self._expired(self._spices_built_at):
+            self._spices_built = False
+        if self._spices_built and not self._pending_spices:
+            return
+        with db_manager.session_scope(session, factory=spices_models.SessionLocal) as session:
+            if not self._spices_built:
+                self._spices_built_at = time.monotonic()
+                self._spices, self._spice_by_name = {}, {}
+                self._pending_spices.clear()
+                self._load_spices(session)
+                self._spices_built = True
+            else:
+                ids, self._pending_spices = self._pending_spices, set()
+                self._load_spices(session, ids)
+
+    def _build_main(self, session: Session):
+        self._main_built_at = time.monotonic()
+        self._ingredients, self._ingredient_by_name = {}, {}
+        self._recipes, self._recipe_by_name = {}, {}
+        self._pending_recipes.clear()
+        self._pending_deleted.clear()
+        self._pending_ingredients.clear()
+        self._load_ingredients(session)
+        self._load_recipes(session)
+        self._main_built = True
+
+    def _apply_main(self, session: Session):
+        recipes, deleted, ingredients = self._pending_recipes, self._pending_deleted, self._pending_ingredients
+        self._pending_recipes, self._pending_deleted, self._pending_ingredients = set(), set(), set()
+        if ingredients:
+            self._load_ingredients(session, ingredients)
+        for rid in deleted:
+            self._drop_recipe(rid)
+        if recipes:
+            self._load_recipes(session, recipes)
+
+    def _load_ingredients(self, session: Session, ids: set | None = None):
+        query = select(Ingredient.id, Ingredient.name, Ingredient.unit)
+        if ids is not None:
+            query = query.where(Ingredient.id.in_(ids))
+        found = set()
+        for iid, name, unit in session.execute(query.order_by(Ingredient.id)):
+            old = self._ingredients.get(iid)
+            if old is not None and self._ingredient_by_name.get(old.name) == iid:
+                del self._ingredient_by_name[old.name]
+            record = IngredientRecord(iid, _intern(name), _intern(unit))
+            self._ingredients[iid] = record
+            self._ingredient_by_name[record.name] = iid
+            found.add(iid)
+        for iid in (ids or set()) - found:
+            old = self._ingredients.pop(iid, None)
+            if old is not None and self._ingredient_by_name.get(old.name) == iid:
+                del self._ingredient_by_name[old.name]
+
+    def _load_recipes(self, session: Session, ids: set | None = None):
+        recipes = select(Recipe.id, Recipe.name, Recipe.steps)
+        links = select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id, RecipeIngredient.quantity)
+        if ids is not None:
+            recipes = recipes.where(Recipe.id.in_(ids))
+            links = links.where(RecipeIngredient.recipe_id.in_(ids))
+
+        grouped = {}
+        rows = session.execute(links.order_by(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id))
+        for rid, group in groupby(rows, key=lambda row: row[0]):
+            group = list(group)
+            grouped[rid] = (
+                array("q", [iid for _, iid, _ in group]),
+                array("d", [float("nan") if q is None else q for _, _, q in group]),
+            )
+
+        found = set()
+        empty = (array("q"), array("d"))
+        for rid, name, steps in session.execute(recipes.order_by(Recipe.id)):
+            old = self._recipes.get(rid)
+            if old is not None and self._recipe_by_name.get(old.name) == rid:
+                del self._recipe_by_name[old.name]
+            record = RecipeRecord(rid, _intern(name), _intern(steps), *grouped.get(rid, empty))
+            self._recipes[rid] = record
+            self._recipe_by_name[record.name] = rid
+            found.add(rid)
+        for rid in (ids or set()) - found:
+            self._drop_recipe(rid)
+
+    def _drop_recipe(self, rid: int):
+        old = self._recipes.pop(rid, None)
+        if old is not None and self._recipe_by_name.get(old.name) == rid:
+            del self._recipe_by_name[old.name]
+
+    def _load_spices(self, session: Session, ids: set | None = None):
+        query = select(*(getattr(Spice, field) for field in SPICE_FIELDS))
+        if ids is not None:
+            query = query.where(Spice.id.in_(ids))
+        found = set()
+        for row in session.execute(query.order_by(Spice.id)):
+            old = self._spices.get(row.id)
+            if old is not None and self._spice_by_name.get(old.name) == row.id:
+                del self._spice_by_name[old.name]
+            record = SpiceRecord(*map(_intern, row))
+            self._spices[record.id] = record
+            self._spice_by_name[record.name] = record.id
+            found.add(record.id)
+        for sid in (ids or set()) - found:
+            old = self._spices.pop(sid, None)
+            if old is not None and self._spice_by_name.get(old.name) == sid:
+                del self._spice_by_name[old.name]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _recipe_dict(self, record: RecipeRecord) -> dict:
+        ingredients = []
+        for iid, quantity in zip(record.ingredient_ids, record.quantities):
+            ingredient = self._ingredients.get(iid)
+            if ingredient is not None:
+                ingredients.append({
+                    "name": ingredient.name,
+                    "quantity": None if quantity != quantity else quantity,
+                    "unit": ingredient.unit,
+                })
+        return {"name": record.name, "steps": record.steps, "ingredients": ingredients}
+
+    def recipe(self, name: str, session: Session | None = None) -> dict | None:
+        """The recipe named exactly `name` in the format of `get_recipe_by_name`, or None."""
+        with self._lock:
+            self._ready_main(session)
+            rid = self._recipe_by_name.get(name)
+            return None if rid is None else self._recipe_dict(self._recipes[rid])
+
+    def recipes(self, session: Session | None = None) -> list[dict]:
+        """Every recipe's name and steps, in load order."""
+        with self._lock:
+            self._ready_main(session)
+            return [{"name": r.name, "steps": r.steps} for r in self._recipes.values()]
+
+    def ingredient(self, name: str, session: Session | None = None) -> dict | None:
+        """The ingredient named exactly `name` as `{"name", "unit"}`, or None."""
+        with self._lock:
+            self._ready_main(session)
+            iid = self._ingredient_by_name.get(name)
+            if iid is None:
+                return None
+            record = self._ingredients[iid]
+            return {"name": record.name, "unit": record.unit}
+
+    def ingredients(self, session: Session | None = None) -> list[dict]:
+        """Every ingredient's name and unit, in load order."""
+        with self._lock:
+            self._ready_main(session)
+            return [{"name": i.name, "unit": i.unit} for i in self._ingredients.values()]
+
+    def spices(self, session: Session | None = None) -> list[SpiceRecord]:
+        """Every spice record, in load order; records are shared, do not modify them."""
+        with self._lock:
+            self._ready_spices(session)
+            return list(self._spices.values())
+
+
+def _max_age() -> float | None:
+    max_age = float(os.environ.get(TTL_ENV) or DEFAULT_MAX_AGE)
+    return max_age if max_age > 0 else None
+
+
+catalog = MemoryCatalog(_max_age()) if os.environ.get(CATALOG_ENV, "").strip().lower() in {"1", "true", "yes", "on"} else None
+
+
+@catalog_events.subscribe
+def _on_catalog_change(changes):
+    if catalog is not None:
+        catalog.on_catalog_change(changes)
+
+
+def active(session: Session | None = None) -> MemoryCatalog | None:
+    """
+    The shared catalog when it is enabled and `session` holds no catalog
+    writes that are not yet committed; otherwise None, and callers read the
+    database.
+
+    Example:
+        ```python
+        memory = active(session)
+        if memory is not None:
+            return memory.recipe("Pancakes", session)
+        ```
+    """
+    if catalog is None or (session is not None and catalog_events.pending(session)):
+        return None
+    return catalog
@@ -0,0 +1,189 @@
+"""
+metrics.py
+
+Per-request SQL and latency instrumentation.
+
+SQLAlchemy cursor hooks count every statement executed on behalf of the
+current request and time it; `MetricsMiddleware` opens that per-request
+window, reports it back to the client in a `Server-Timing` header and feeds
+the per-route histograms exposed by `GET /metrics`.
+
+Statements run outside a request (background jobs, scripts) are not counted.
+
+Author: Rafael Kaher
+"""
+
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class RequestStats:
+    """SQL statement count and time accumulated by one request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("panaceia_request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    """Return the stats of the request being served, if any."""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("panaceia_query_start", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("panaceia_query_start")
+    if stats is None or not starts:
+        return
+    stats.queries += 1
+    stats.db_seconds += perf_counter() - starts.pop()
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative (`le`) counts, sum and max."""
+
+    __slots__ = ("bounds", "counts", "total", "maximum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def snapshot(self) -> dict:
+        buckets, running = {}, 0
+        for bound, count in zip([*map(str, self.bounds), "+Inf"], self.counts):
+            running += count
+            buckets[bound] = running
+        return {"sum": round(self.total, 3), "max": round(self.maximum, 3), "buckets": buckets}
+
+
+class RouteMetrics:
+    """Latency, DB time and statement-count histograms for one route."""
+
+    __slots__ = ("count", "latency_ms", "db_ms", "queries")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "latency_ms": self.latency_ms.snapshot(),
+            "db_ms": self.db_ms.snapshot(),
+            "queries": self.queries.snapshot(),
+        }
+
+
+_routes: dict[str, RouteMetrics] = {}
+_lock = threading.Lock()
+
+
+def record(route: str, latency_ms: float, db_ms: float, queries: int):
+    """Add one finished request to the histograms of `route`."""
+    with _lock:
+        metrics = _routes.get(route)
+        if metrics is None:
+            metrics = _routes[route] = RouteMetrics()
+        metrics.count += 1
+        metrics.latency_ms.observe(latency_ms)
+        metrics.db_ms.observe(db_ms)
+        metrics.queries.observe(queries)
+
+
+def snapshot() -> dict:
+    """
+    Return the histograms of every route seen so far.
+
+    Example:
+        ```python
+        snapshot()["GET /recipes/{name}"]["queries"]["buckets"]["5"]
+        ```
+    """
+    with _lock:
+        return {route: metrics.snapshot() for route, metrics in sorted(_routes.items())}
+
+
+def reset():
+    """Forget every recorded request."""
+    with _lock:
+        _routes.clear()
+
+
+def route_key(scope) -> str:
+    """Label a request by method and route template, e.g. `GET /recipes/{name}`."""
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{scope.get('method', '')} {path}"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times each HTTP request and counts its SQL statements.
+
+    The response carries a header such as
+    `Server-Timing: db;dur=1.84;desc="3 queries", app;dur=4.10`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={elapsed_ms:.2f}"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            record(
+                route_key(scope),
+                (perf_counter() - started) * 1000,
+                stats.db_seconds * 1000,
+                stats.queries
+            )
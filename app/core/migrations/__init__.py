@@ -0,0 +1,116 @@
+"""
+migrations
+
+Versioned schema migrations for the recipes and spices databases.
+
+Each `vNNNN_<name>.py` module in this package defines `upgrade(conn)` and is
+applied once per database, in version order, inside its own transaction.
+Applied versions are recorded in the `schema_migrations` table. Scripts must be
+idempotent (`CREATE INDEX IF NOT EXISTS`, `has_column` checks): fresh databases
+already get the current schema from `create_all`, and existing ones are brought
+up to date while the app keeps serving.
+
+Run them at startup through `init_db()` or by hand:
+
+    python -m app.core.migrations            # upgrade both databases
+    python -m app.core.migrations --status
+
+Author: Rafael Kaher
+"""
+
+import importlib
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_TABLE = "schema_migrations"
+_MODULE_PATTERN = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: object
+
+
+def discover() -> list[Migration]:
+    """Return every migration of this package, ordered by version."""
+    migrations = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(module.name)
+        if match:
+            script = importlib.import_module(f"{__name__}.{module.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), script.upgrade))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+def has_table(conn, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _ensure_version_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+        ))
+
+
+def applied_versions(engine) -> set[int]:
+    _ensure_version_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {VERSION_TABLE}"))}
+
+
+def migrate(engine, target: int | None = None) -> list[int]:
+    """
+    Apply pending migrations to `engine` up to `target` (default: latest).
+
+    Recording the version is the first statement of each transaction, so when
+    several workers start at once only one of them runs a given script.
+
+    Returns:
+        list[int]: Versions applied by this call.
+
+    Example:
+        ```python
+        migrate(db_manager.get_engine())
+        # Returns: [1]
+        ```
+    """
+    done = applied_versions(engine)
+    applied = []
+    for migration in discover():
+        if migration.version in done or (target is not None and migration.version > target):
+            continue
+        with engine.begin() as conn:
+            claimed = conn.execute(
+                text(f"INSERT OR IGNORE INTO {VERSION_TABLE} (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": migration.version, "n": migration.name, "t": datetime.now(timezone.utc).isoformat()}
+            ).rowcount
+            if not claimed:
+                continue
+            migration.upgrade(conn)
+        logger.info("Applied migration %04d_%s to %s", migration.version, migration.name, engine.url)
+        applied.append(migration.version)
+    return applied
+
+
+def status(engine) -> list[dict]:
+    """List every known migration with whether it has been applied."""
+    done = applied_versions(engine)
+    return [
+        {"version": m.version, "name": m.name, "applied": m.version in done}
+        for m in discover()
+    ]
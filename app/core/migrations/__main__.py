@@ -0,0 +1,40 @@
+"""
+Command line entry point: `python -m app.core.migrations [--database ...] [--status]`.
+"""
+
+import argparse
+import sys
+
+from app.core import db_manager
+from app.core.migrations import migrate, status
+from app.core.modules.spices.db import spices_models
+
+ENGINES = {
+    "recipes": db_manager.get_engine,
+    "spices": spices_models.get_engine,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply PanaceIA schema migrations.")
+    parser.add_argument("--database", choices=[*ENGINES, "all"], default="all")
+    parser.add_argument("--status", action="store_true", help="only show applied and pending versions")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args(argv)
+
+    names = list(ENGINES) if args.database == "all" else [args.database]
+    for name in names:
+        engine = ENGINES[name]()
+        if args.status:
+            for row in status(engine):
+                mark = "✓" if row["applied"] else "·"
+                print(f"{name:<8} {mark} {row['version']:04d}_{row['name']}")
+            continue
+        db_manager.Base.metadata.create_all(bind=engine)
+        applied = migrate(engine, args.target)
+        print(f"{name}: applied {', '.join(f'{v:04d}' for v in applied) or 'nothing'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Covering indexes for reverse lookups.
+
+- recipe_ingredients (ingredient_id, recipe_id): recipes using an ingredient.
+- recipe_spices (spice_id, recipe_id): recipes using a spice.
+- spice_ingredient_pairs (lower(ingredient), spice_id): learned pairs by ingredient.
+- spices (lower(name)): case-insensitive spice resolution.
+"""
+
+from sqlalchemy import text
+from app.core.migrations import has_table
+
+INDEXES = {
+    "recipe_ingredients": "CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_ingredient_recipe "
+                          "ON recipe_ingredients (ingredient_id, recipe_id)",
+    "recipe_spices": "CREATE INDEX IF NOT EXISTS ix_recipe_spices_spice_recipe "
+                     "ON recipe_spices (spice_id, recipe_id)",
+    "spice_ingredient_pairs": "CREATE INDEX IF NOT EXISTS ix_spice_pairs_ingredient "
+                              "ON spice_ingredient_pairs (lower(ingredient), spice_id)",
+    "spices": "CREATE INDEX IF NOT EXISTS ix_spices_name_lower ON spices (lower(name))",
+}
+
+
+def upgrade(conn):
+    for table, statement in INDEXES.items():
+        if has_table(conn, table):
+            conn.execute(text(statement))
@@ -0,0 +1,14 @@
+"""
+Full-text search over recipe names and steps.
+
+Creates the external-content `recipes_fts` table with its sync triggers and
+indexes the recipes already stored.
+"""
+
+from app.core.db_manager import create_search_index
+from app.core.migrations import has_table
+
+
+def upgrade(conn):
+    if has_table(conn, "recipes"):
+        create_search_index(conn, rebuild=True)
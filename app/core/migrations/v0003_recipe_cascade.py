@@ -0,0 +1,19 @@
+"""
+Database-level cascade from recipes to recipe_ingredients and recipe_spices.
+
+Installs the `recipes_cascade_delete` trigger (see `db_manager`), then removes
+links left behind by recipes deleted before it existed.
+"""
+
+from sqlalchemy import text
+from app.core.db_manager import RECIPES_CASCADE_TRIGGER
+from app.core.migrations import has_table
+
+
+def upgrade(conn):
+    if not has_table(conn, "recipes"):
+        return
+    conn.execute(text(RECIPES_CASCADE_TRIGGER))
+    for child in ("recipe_ingredients", "recipe_spices"):
+        if has_table(conn, child):
+            conn.execute(text(f"DELETE FROM {child} WHERE recipe_id NOT IN (SELECT id FROM recipes)"))
@@ -0,0 +1,16 @@
+"""
+`content_hash` on recipes and spices, with an index, so re-imports can skip
+records that did not change since the last import.
+"""
+
+from sqlalchemy import text
+from app.core.migrations import has_column, has_table
+
+
+def upgrade(conn):
+    for table in ("recipes", "spices"):
+        if not has_table(conn, table):
+            continue
+        if not has_column(conn, table, "content_hash"):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN content_hash VARCHAR"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_content_hash ON {table} (content_hash)"))
@@ -0,0 +1,16 @@
+"""
+Recreate the recipes FTS triggers with a `recipes_fts_paused` guard, so bulk
+writes can silence them inside their own transaction instead of dropping them.
+"""
+
+from sqlalchemy import text
+from app.core.db_manager import RECIPES_FTS_TRIGGERS, create_search_index
+from app.core.migrations import has_table
+
+
+def upgrade(conn):
+    if not has_table(conn, "recipes"):
+        return
+    for trigger in RECIPES_FTS_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    create_search_index(conn)
@@ -6,66 +6,230 @@ Handles ingestion, validation, and normalization of external recipe or spice dat
 Outputs API-like responses for smooth integration with other modules.
 """
 
+from collections import defaultdict
 from typing import List, Dict, Any
-from app.core.data_cleaner import validate_and_clean_recipe
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core import db_manager
+from app.core.data_cleaner import content_hash, normalize_feed_recipe, normalize_string, validate_and_normalize_recipe
+from app.core.db_manager import Recipe
+from app.core.fuzzy_index import ingredient_names
+from app.core.modules.recipes.recipes_manager import upsert_recipes
+from app.core.profiling import profiled
+from app.core.schemas import RECIPE_FEED, UpsertMode
 
 # ---------------------------------------------------------------------------
 # 🔹 Single Importer
 # ---------------------------------------------------------------------------
 
-def import_single_recipe(raw_recipe: Dict[str, Any]) -> Dict[str, Any]:
+@profiled
+def import_single_recipe(
+    raw_recipe: Dict[str, Any],
+    session: Session | None = None,
+    fix_typos: bool = False
+) -> Dict[str, Any]:
     """
-    Normalize and validate a single recipe payload.
+    Normalize and validate a single recipe payload in one pass (see
+    `validate_and_normalize_recipe`). Unknown ingredient names close to
+    existing ingredients are kept as given, with the close names listed under
+    `suggestions`; with `fix_typos` they are rewritten to the existing
+    ingredient and listed under `resolved` instead.
 
     Returns:
-        dict: {"status": "success", "data": {...}} or {"status": "error", "message": "..."}
+        dict: {"status": "success", "data": {...}} or
+        {"status": "error", "message": "...", "errors": [...]}
     """
+    with db_manager.session_scope(session) as session:
+        return _resolve_ingredients(validate_and_normalize_recipe(raw_recipe), session, fix_typos)
 
-    if not isinstance(raw_recipe, dict):
-        return {"status":"error", "message":"Invalid recipe structure"}
-
-    name = raw_recipe.get ("name","")
-    steps = raw_recipe.get ("steps","")
-    ingredients = raw_recipe.get ("ingredients",[])
-
-    if not name or not steps or not isinstance(ingredients, list):
-        return {"status":"error", "message":"Invalid recipe structure"}
-
-    for ing in ingredients:
-        q = str(ing.get("quantity", "")).strip()
-        if not q:
-            return {"status":"error", "message": f"Invalid quantity for ingredient '{ing.get('name','?')}'"}
-        try:
-            _ = float(q)
-        except ValueError:
-            return {"status":"error", "message": f"Invalid quantity for ingredient '{ing.get('name','?')}'"}
-    
-    try:
-        from app.core.data_cleaner import normalize_universal_input
-        cleaned = normalize_universal_input(raw_recipe)
-    except Exception as e:
-        return {"status": "error", "message": f"Normalization failed: {e}"}
-
-    for ing in cleaned.get("ingredients", []):
-        ing["quantity"] = float(ing["quantity"])
-
-    return {"status":"success", "data": cleaned}
+def _resolve_ingredients(result: dict, session: Session, fix_typos: bool = False) -> dict:
+    if result["status"] == "error":
+        return result
+    resolved, suggestions = {}, {}
+    for ing in result["data"]["ingredients"]:
+        canonical, close = ingredient_names.match(ing["name"], session, fix_typos)
+        if canonical is not None and canonical != ing["name"]:
+            resolved[ing["name"]] = ing["name"] = canonical
+        elif close:
+            suggestions[ing["name"]] = close
+    if resolved:
+        result["resolved"] = resolved
+    if suggestions:
+        result["suggestions"] = suggestions
+    return result
 
 # ---------------------------------------------------------------------------
 # 🔹 Bulk Importer
 # ---------------------------------------------------------------------------
 
-def import_bulk_recipes(list_of_raws: list[dict]) -> list[dict]:
+_HASH_CHUNK = 1000
+
+def import_key(payload, name) -> tuple[str, str] | None:
+    """
+    `(normalized name, content_hash)` of a raw payload or a feed record, or
+    None when it has no usable name. The hash covers the payload as received,
+    so unchanged records are recognized before they are normalized.
+    """
+    if not isinstance(payload, (dict, BaseModel)) or not isinstance(name, str) or not name.strip():
+        return None
+    return normalize_string(name), content_hash(payload)
+
+def known_imports(model, keys: list[tuple[str, str]], session: Session | None = None, factory=None) -> set[tuple]:
+    """
+    The `(name, content_hash)` pairs in `keys` that a stored row still holds,
+    found via the `content_hash` index. Every write outside the import clears
+    the stored hash, so a match means the row is exactly what that payload wrote.
+    """
+    wanted = set(keys)
+    hashes = list({digest for _, digest in wanted})
+    found = set()
+    with db_manager.session_scope(session, factory=factory) as session:
+        for start in range(0, len(hashes), _HASH_CHUNK):
+            chunk = hashes[start:start + _HASH_CHUNK]
+            rows = session.execute(select(model.name, model.content_hash).where(model.content_hash.in_(chunk)))
+            found.update(key for key in map(tuple, rows) if key in wanted)
+    return found
+
+@profiled
+def import_bulk_recipes(
+    list_of_raws: list[dict],
+    mode: UpsertMode | None = None,
+    session: Session | None = None,
+    fix_typos: bool = False
+) -> list[dict]:
     """
     Normalize multiple recipes, keeping individual status per recipe.
+    With a `mode`, the valid ones are also written through `upsert_recipes`
+    in one batch and each result gains its `action`. Records whose name and
+    `content_hash` match a recipe written by an earlier import, and not edited
+    since, are reported as "unchanged" without being normalized or written.
 
     Args:
         data (list[dict]): List of raw recipe dictionaries.
+        mode (str, optional): "skip", "replace" or "merge" for names already stored.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+        fix_typos (bool): Rewrite ingredient names within a typo of an existing one to it.
 
     Returns:
         list[dict]: Each item contains {"status": ..., "data" or "message": ...}
     """
-    results = []
-    for item in list_of_raws:
-        results.append(import_single_recipe(item))
-    return results
\ No newline at end of file
+    return _import_recipes(
+        list_of_raws,
+        validate_and_normalize_recipe,
+        lambda item: import_key(item, item.get("name")) if isinstance(item, dict) else None,
+        mode,
+        session,
+        fix_typos
+    )
+
+def _import_recipes(
+    records: list,
+    normalize,
+    key_of,
+    mode: UpsertMode | None,
+    session: Session | None,
+    fix_typos: bool = False
+) -> list[dict]:
+    with db_manager.session_scope(session) as session:
+        if mode is None:
+            return [_resolve_ingredients(normalize(record), session, fix_typos) for record in records]
+
+        keys = [key_of(record) for record in records]
+        known = known_imports(Recipe, [k for k in keys if k], session)
+        results, valid, payloads = [], [], []
+        for record, key in zip(records, keys):
+            if key in known:
+                results.append({"status": "success", "name": key[0], "action": "unchanged"})
+                continue
+            result = _resolve_ingredients(normalize(record), session, fix_typos)
+            results.append(result)
+            if result["status"] == "success":
+                valid.append(result)
+                payloads.append(dict(result["data"], content_hash=key and key[1]))
+        written = upsert_recipes(payloads, mode, session, normalized=True)
+        for result, outcome in zip(valid, written["results"]):
+            if outcome["status"] == "success":
+                result["action"] = outcome["action"]
+            else:
+                result.update(status="error", message=outcome["message"])
+    return results
+
+# ---------------------------------------------------------------------------
+# 🔹 Feed Importer (raw JSON bytes)
+# ---------------------------------------------------------------------------
+
+_RAW_LIST = TypeAdapter(List[Any])
+
+def _field(loc: tuple) -> str:
+    path = ""
+    for part in loc:
+        path += f"[{part}]" if isinstance(part, int) else f".{part}" if path else str(part)
+    return path
+
+def validate_feed(adapter: TypeAdapter, body: bytes) -> list[tuple[BaseModel | None, list | None]]:
+    """
+    Validate a JSON array of records with a compiled list adapter (see
+    `schemas.RECIPE_FEED`), straight from the request bytes.
+
+    When every record is valid this is a single pydantic-core call. Otherwise
+    the errors are grouped by record and only the remaining records are
+    validated again, one by one.
+
+    Returns:
+        list[tuple]: One `(record, None)` or `(None, errors)` per record, in
+        order; records are the validated models and errors are
+        `{"field": ..., "message": ...}` dicts.
+
+    Raises:
+        RequestValidationError: The body is not a JSON array.
+    """
+    try:
+        return [(record, None) for record in adapter.validate_json(body)]
+    except ValidationError as e:
+        problems = defaultdict(list)
+        for error in e.errors(include_url=False):
+            loc = error["loc"]
+            if not loc or not isinstance(loc[0], int):
+                raise RequestValidationError(e.errors(include_url=False))
+            problems[loc[0]].append({"field": _field(loc[1:]) or "record", "message": error["msg"]})
+
+    records = _RAW_LIST.validate_json(body)
+    return [
+        (None, problems[index]) if index in problems else (adapter.validate_python([record])[0], None)
+        for index, record in enumerate(records)
+    ]
+
+@profiled
+def import_recipe_feed(
+    body: bytes,
+    mode: UpsertMode | None = None,
+    session: Session | None = None,
+    fix_typos: bool = False
+) -> list[dict]:
+    """
+    `import_bulk_recipes` for a raw JSON request body, validated as a whole by
+    `RECIPE_FEED`. Records the schema rejects get their own error result; the
+    others are only normalized (`normalize_feed_recipe`) and typo-resolved
+    before being written, without being validated again.
+
+    Example:
+        ```python
+        import_recipe_feed(b'[{"name": "Pancakes", "steps": "Fry", "ingredients": []}]', mode="skip")
+        ```
+    """
+    checked = validate_feed(RECIPE_FEED, body)
+    imported = iter(_import_recipes(
+        [record for record, errors in checked if errors is None],
+        lambda record: {"status": "success", "data": normalize_feed_recipe(record)},
+        lambda record: import_key(record, record.name),
+        mode,
+        session,
+        fix_typos
+    ))
+    return [
+        next(imported) if errors is None
+        else {"status": "error", "message": "Invalid recipe structure", "errors": errors}
+        for _, errors in checked
+    ]
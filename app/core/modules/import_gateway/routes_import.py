@@ -1,76 +1,67 @@
-from fastapi import APIRouter, Body
-from app.core.modules.import_gateway.import_manager import import_single_recipe, import_bulk_recipes
-from app.core.modules.spices.spices_manager import add_spice
-from app.core.modules.import_gateway.spices_manager import import_bulk_spices, import_single_spice
+from typing import Optional
+from fastapi import APIRouter, Body, Query
+from app.core.modules.import_gateway.import_manager import import_single_recipe, import_bulk_recipes, import_recipe_feed
+from app.core.modules.import_gateway.spices_manager import import_spice_feed, store_imported_spices
+from app.core.dependencies import MainSession, RawBody, SpiceSession
+from app.core.schemas import UpsertMode
+from app.core.responses import FastJSONResponse, FastJSONRoute
 
-router = APIRouter(prefix="/import", tags=["import"])
+router = APIRouter(
+    prefix="/import",
+    tags=["import"],
+    route_class=FastJSONRoute,
+    default_response_class=FastJSONResponse
+)
+
+# Feed endpoints read the body themselves (see `validate_feed`); describe it for the docs.
+_FEED_BODY = {"requestBody": {"required": True, "content": {"application/json": {
+    "schema": {"type": "array", "items": {"type": "object"}}
+}}}}
 
 @router.post("/recipe", status_code=201)
-def import_recipe_endpoint(recipe_data: dict = Body(...)):
+def import_recipe_endpoint(
+    session: MainSession,
+    recipe_data: dict = Body(...),
+    mode: Optional[UpsertMode] = Query(None, description="Also store the recipe: skip, replace or merge an existing one."),
+    fix_typos: bool = Query(False, description="Rewrite ingredient names within a typo of an existing one to it.")
+):
     """Import a single recipe object into PanaceIA."""
-    return import_single_recipe(recipe_data)
+    if mode is None:
+        return import_single_recipe(recipe_data, fix_typos=fix_typos)
+    return import_bulk_recipes([recipe_data], mode, session, fix_typos)[0]
 
-@router.post("/bulk", status_code=201)
-def import_bulk_endpoint(payload: list[dict] = Body(...)):
-    """Import multiple recipes at once."""
-    return import_bulk_recipes(payload)
+@router.post("/bulk", status_code=201, openapi_extra=_FEED_BODY)
+def import_bulk_endpoint(
+    session: MainSession,
+    body: RawBody,
+    mode: Optional[UpsertMode] = Query(None, description="Also store the recipes: skip, replace or merge existing ones."),
+    fix_typos: bool = Query(False, description="Rewrite ingredient names within a typo of an existing one to it.")
+):
+    """
+    Import multiple recipes at once; with `mode` they are stored in one batch.
+    The JSON array is validated as a whole, with one result per record.
+    """
+    return import_recipe_feed(body, mode, session, fix_typos)
 
 @router.post("/spice", status_code=201)
-def import_single_spice_endpoint(spice: dict = Body(...)):
+def import_single_spice_endpoint(
+    spice_session: SpiceSession,
+    spice: dict = Body(...),
+    mode: Optional[UpsertMode] = Query(None, description="Skip, replace or merge an existing spice instead of failing.")
+):
     """
     Import a single spice entry from an external source.
     """
+    return store_imported_spices([spice], mode, spice_session)[0]
 
-    cleaned = import_single_spice(spice)
-
-    if cleaned["status"] == "error":
-        return cleaned
-
-    data = cleaned["data"]
-
-    db_result = add_spice(data)
-
-    if db_result.get("status") == "success":
-        return {
-            "status": "success",
-            "name": data.get("name"),
-            "message": db_result.get("message", "Spice imported successfully.")
-        }
-    else:
-        return {
-            "status": "error",
-            "name": data.get("name"),
-            "message": db_result.get("message", "Failed to insert spice.")
-        }
-
-@router.post("/bulkspices", status_code=201)
-def import_bulk_spices_endpoint(spices: list[dict] = Body(...)):
+@router.post("/bulkspices", status_code=201, openapi_extra=_FEED_BODY)
+def import_bulk_spices_endpoint(
+    spice_session: SpiceSession,
+    body: RawBody,
+    mode: Optional[UpsertMode] = Query(None, description="Skip, replace or merge existing spices instead of failing.")
+):
     """
-    Import multiple spices in bulk, each validated through the importer.
+    Import multiple spices in bulk: the JSON array is validated as a whole,
+    with one result per record, and stored with one statement per batch.
     """
-    normalized_results = import_bulk_spices(spices)
-
-    final_results = []
-
-    for item in normalized_results:
-        if item["status"] == "error":
-            final_results.append(item)
-            continue
-
-        data = item["data"]
-
-        db_result = add_spice(data)
-
-        if db_result.get("status") == "success":
-            final_results.append({
-                "status": "success",
-                "name": data.get("name"),
-                "message": db_result.get("message", "Spice imported successfully.")
-            })
-        else:
-            final_results.append({
-                "status": "error",
-                "name": data.get("name"),
-                "message": db_result.get("message", "Failed to insert spice.")
-            })
-    return final_results
+    return import_spice_feed(body, mode, spice_session)
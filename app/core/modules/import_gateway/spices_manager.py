@@ -1,9 +1,16 @@
 from typing import List, Dict, Any
-from app.core.modules.spices.spices_manager import add_spice
+from sqlalchemy.orm import Session
+from app.core import db_manager
+from app.core.modules.spices.spices_manager import add_spice, upsert_spices
 from app.core.data_cleaner import normalize_universal_input
+from app.core.modules.import_gateway.import_manager import import_key, known_imports, validate_feed
+from app.core.modules.spices.db.spices_models import SessionLocal, Spice
 from app.core.modules.spices.utils.spice_bridge import link_spice_to_recipe, suggest_spices_for_recipe
 from typing import Dict, Any
+from app.core.profiling import profiled
+from app.core.schemas import SPICE_FEED, ImportSpiceSchema, UpsertMode
 
+@profiled
 def import_single_spice(raw_spice: Dict[str, Any]) -> Dict[str, Any]:
     """
     Normalize and validate a single spice payload.
@@ -47,6 +54,12 @@ def import_single_spice(raw_spice: Dict[str, Any]) -> Dict[str, Any]:
     cleaned = normalize_universal_input(mapped_data)
     return {"status": "success", "data": cleaned}
 
+def _normalize_feed_spice(record: ImportSpiceSchema) -> Dict[str, Any]:
+    """`import_single_spice` for a record `SPICE_FEED` already validated and mapped."""
+    fields = {field: getattr(record, field) for field in ImportSpiceSchema.model_fields}
+    return {"status": "success", "data": normalize_universal_input(fields)}
+
+@profiled
 def import_bulk_spices(spices: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Import multiple spices at once.
@@ -57,4 +70,89 @@ def import_bulk_spices(spices: List[Dict[str, Any]]) -> Dict[str, Any]:
         result = import_single_spice(spice)
         results.append(result)
 
-    return results
\ No newline at end of file
+    return results
+
+_ACTION_MESSAGES = {
+    "created": "Spice '{}' added with full context.",
+    "replaced": "Spice '{}' replaced.",
+    "merged": "Spice '{}' merged with the stored one.",
+}
+
+@profiled
+def store_imported_spices(
+    raw_spices: List[Dict[str, Any]],
+    mode: UpsertMode | None = None,
+    session: Session | None = None
+) -> List[Dict[str, Any]]:
+    """
+    Normalize raw spices and write the valid ones in one batch.
+
+    Without a `mode`, a spice that already exists is reported as an error;
+    otherwise it is skipped, replaced or merged (see `upsert_spices`).
+    Records whose name and `content_hash` match a spice written by an earlier
+    import, and not edited since, are recognized before normalization and
+    reported as "unchanged" (an error without a mode).
+    """
+    keys = [
+        import_key(raw, raw.get("name") or raw.get("title")) if isinstance(raw, dict) else None
+        for raw in raw_spices
+    ]
+    return _store_spices(raw_spices, keys, import_single_spice, mode, session)
+
+def _store_spices(records: list, keys: list, normalize, mode: UpsertMode | None, session: Session | None) -> List[Dict[str, Any]]:
+    with db_manager.session_scope(session, factory=SessionLocal) as session:
+        known = known_imports(Spice, [k for k in keys if k], session)
+        normalized, payloads = [], []
+        for record, key in zip(records, keys):
+            if key in known:
+                normalized.append({"status": "unchanged", "name": key[0]})
+                continue
+            item = normalize(record)
+            normalized.append(item)
+            if item["status"] == "success":
+                payloads.append(dict(item["data"], content_hash=key and key[1]))
+        written = upsert_spices(payloads, mode or "skip", session)
+    outcomes = iter(written["results"])
+
+    final_results = []
+    for item in normalized:
+        if item["status"] == "error":
+            final_results.append(item)
+            continue
+        if item["status"] == "unchanged":
+            name = item["name"]
+            if mode is None:
+                final_results.append({"status": "error", "name": name, "message": f"Spice '{name}' already exists."})
+            else:
+                final_results.append({"status": "success", "name": name, "action": "unchanged",
+                                      "message": f"Spice '{name}' is unchanged since the last import."})
+            continue
+        outcome = next(outcomes)
+        name = item["data"].get("name")
+        if outcome["status"] == "error":
+            final_results.append({"status": "error", "name": name, "message": outcome["message"]})
+        elif outcome["action"] == "skipped" and mode is None:
+            final_results.append({"status": "error", "name": name, "message": f"Spice '{outcome['name']}' already exists."})
+        else:
+            result = {"status": "success", "name": name, "action": outcome["action"]}
+            result["message"] = _ACTION_MESSAGES.get(outcome["action"], "Spice '{}' already exists; skipped.").format(outcome["name"])
+            final_results.append(result)
+    return final_results
+
+
+@profiled
+def import_spice_feed(body: bytes, mode: UpsertMode | None = None, session: Session | None = None) -> List[Dict[str, Any]]:
+    """
+    `store_imported_spices` for a raw JSON request body, validated as a whole
+    by `SPICE_FEED`. Records the schema rejects get their own error result;
+    the others are normalized and written without being mapped or checked again.
+    """
+    checked = validate_feed(SPICE_FEED, body)
+    records = [record for record, errors in checked if errors is None]
+    keys = [import_key(record, record.name) for record in records]
+    stored = iter(_store_spices(records, keys, _normalize_feed_spice, mode, session))
+    return [
+        next(stored) if errors is None
+        else {"status": "error", "message": "Invalid spice structure", "errors": errors}
+        for _, errors in checked
+    ]
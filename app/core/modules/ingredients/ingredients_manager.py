@@ -11,11 +11,25 @@ and consumed directly by FastAPI routes.
 Author: Rafael Kaher
 """
 
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
 from app.core.data_cleaner import normalize_universal_input
-from app.core import db_manager
-from app.core.db_manager import Ingredient, RecipeIngredient, SessionLocal
+from app.core import catalog_events, db_manager, memory_catalog
+from app.core.db_manager import Ingredient, Recipe, RecipeIngredient
+from app.core.fuzzy_index import ingredient_names
+from app.core.profiling import profiled
 
-def add_ingredient(ingredient_data: dict):
+def _forget_import_hashes(session: Session, ingredient_ids) -> None:
+    """
+    Clear `content_hash` on the recipes using these ingredients: their stored
+    names or units no longer match the feed they came from, so re-importing
+    it must not report them as unchanged.
+    """
+    used_by = select(RecipeIngredient.recipe_id).where(RecipeIngredient.ingredient_id.in_(ingredient_ids))
+    session.execute(update(Recipe).where(Recipe.id.in_(used_by)).values(content_hash=None))
+
+@profiled
+def add_ingredient(ingredient_data: dict, session: Session | None = None):
     """
     Add an ingredient to the data base.
     
@@ -24,6 +38,7 @@ def add_ingredient(ingredient_data: dict):
                 - name (str): Ingredient's name.
                 - unit (str): Measurement's unit.
                 - quantity (float): Ingredient's numerical quantity.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: A status message indicating success or failure.
@@ -37,31 +52,31 @@ def add_ingredient(ingredient_data: dict):
         })
         ```
     """
-    session = db_manager.SessionLocal()
-
     clean_ingredient = normalize_universal_input(ingredient_data)
     name = clean_ingredient["name"]
     unit = clean_ingredient["unit"]
 
-    existing = session.query(Ingredient).filter_by(name=name).first()
-    if existing:
-        session.close()
-        return {"status": "error", "message": f"Ingredient '{name}' already exists."}
-
-    try:
-        ingredient = Ingredient(name=name, unit=unit)
-        session.add(ingredient)
-        session.commit()
-        session.close()
-        return {"status": "success", "name": name, "unit": unit}
-    except Exception as e:
-        session.rollback()
-        session.close()
-        return {"status": "error", "message": str(e)}
-
-def list_ingredients():
+    with db_manager.session_scope(session) as session:
+        existing = session.query(Ingredient).filter_by(name=name).first()
+        if existing:
+            return {"status": "error", "message": f"Ingredient '{name}' already exists."}
+
+        try:
+            ingredient = Ingredient(name=name, unit=unit)
+            session.add(ingredient)
+            session.flush()
+            return {"status": "success", "name": name, "unit": unit}
+        except Exception as e:
+            session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@profiled
+def list_ingredients(session: Session | None = None):
     """
-    Retrieve all ingredients from the database.
+    Retrieve all ingredients from the database, or from the memory catalog when enabled.
+
+    Args:
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Contains:
@@ -77,27 +92,33 @@ def list_ingredients():
         # -> {"status": "success", "data": [{"name": "Flour", "quantity": "100.0", "unit":"Mg"}]}
         ```
     """
-    session = db_manager.SessionLocal()
-    ingredients = session.query(Ingredient).all()
-    result = [
-        {"name": i.name, "unit": i.unit}
-        for i in ingredients
-    ]
-    session.close()
+    memory = memory_catalog.active(session)
+    if memory is not None:
+        return memory.ingredients(session)
+
+    with db_manager.session_scope(session) as session:
+        ingredients = session.query(Ingredient).all()
+        result = [
+            {"name": i.name, "unit": i.unit}
+            for i in ingredients
+        ]
     return result
 
-def get_ingredient_name(value: str | dict) -> dict:
+@profiled
+def get_ingredient_name(value: str | dict, session: Session | None = None) -> dict:
     """
     Retrieve an ingredient by name.
 
     Args:
         value (str | dict): Ingredient name (e.g., "eggs") or dict containing {"name": "eggs"}.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Contains:
             - status (str): "success" or "error".
             - data (dict): Ingredient details if found.
             - message (str): Error message if not found.
+            - suggestions (list[str]): Close existing names, when the lookup missed.
 
     Example:
         ```python
@@ -105,8 +126,6 @@ def get_ingredient_name(value: str | dict) -> dict:
         # -> {"status": "success", "data": {"name": "Eggs", "unit": "Unit"}}
         ```
     """
-    session = db_manager.SessionLocal()
-
     if isinstance(value, dict):
         raw_name = value.get("name")
     else:
@@ -114,18 +133,27 @@ def get_ingredient_name(value: str | dict) -> dict:
 
     name = normalize_universal_input(raw_name)
 
-    ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
+    memory = memory_catalog.active(session)
+    data = memory.ingredient(name, session) if memory is not None else None
+    if data is not None:
+        return {"status": "success", "data": data}
+
+    with db_manager.session_scope(session) as session:
+        ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
 
-    if not ingredient:
-        session.close()
-        return {"status": "error", "message": f"'{name}' not found."}
+        if not ingredient:
+            result = {"status": "error", "message": f"'{name}' not found."}
+            suggestions = [match for match, _ in ingredient_names.suggest(name, limit=3, session=session)]
+            if suggestions:
+                result["suggestions"] = suggestions
+            return result
 
-    data = {"name": ingredient.name, "unit": ingredient.unit}
+        data = {"name": ingredient.name, "unit": ingredient.unit}
 
-    session.close()
     return {"status": "success", "data": data}
 
-def update_ingredient_name(ingredient_data: dict):
+@profiled
+def update_ingredient_name(ingredient_data: dict, session: Session | None = None):
     """
     Updates a ingredient's name.
     
@@ -133,6 +161,7 @@ def update_ingredient_name(ingredient_data: dict):
         recipe_data (dict): A dictionary containing:
                 - old_name (str): Ingredient's name.
                 - new_name (str): Measurement's unit.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
     
     Returns:
         dict: A message indicating whether the update succeeded.
@@ -145,8 +174,6 @@ def update_ingredient_name(ingredient_data: dict):
         })
         ```
     """
-    session = db_manager.SessionLocal()
-
     if not isinstance(ingredient_data, dict):
         ingredient_data = ingredient_data.model_dump()
 
@@ -156,28 +183,28 @@ def update_ingredient_name(ingredient_data: dict):
     new_name = clean_data.get("new_name")
     quantity = clean_data.get("quantity")
 
-    ingredient = session.query(Ingredient).filter_by(name=old_name).first()
-    if not ingredient:
-        session.close()
-        return {"status": "error", "message": f"Ingredient '{old_name}' not found."}
+    with db_manager.session_scope(session) as session:
+        ingredient = session.query(Ingredient).filter_by(name=old_name).first()
+        if not ingredient:
+            return {"status": "error", "message": f"Ingredient '{old_name}' not found."}
 
-    if new_name != old_name:
-        existing = session.query(Ingredient).filter_by(name=new_name).first()
-        if existing:
-            session.close()
-            return {"status": "error", "message": f"Ingredient '{new_name}' already exists."}
+        if new_name != old_name:
+            existing = session.query(Ingredient).filter_by(name=new_name).first()
+            if existing:
+                return {"status": "error", "message": f"Ingredient '{new_name}' already exists."}
 
-    ingredient.name = new_name
-    if quantity is not None:
-        ingredient.quantity = quantity
+        _forget_import_hashes(session, [ingredient.id])
+        ingredient.name = new_name
+        if quantity is not None:
+            ingredient.quantity = quantity
 
-    session.commit()
-    session.close()
+        session.flush()
 
     return {"status": "success", "message": f"Ingredient '{old_name}' updated successfully."}
 
 
-def update_ingredient_quantity(ingredient_data: dict):
+@profiled
+def update_ingredient_quantity(ingredient_data: dict, session: Session | None = None):
     """
     Updates a ingredient's quantity.
     
@@ -185,6 +212,7 @@ def update_ingredient_quantity(ingredient_data: dict):
         recipe_data (dict): A dictionary containing:
                 - name(str) : Ingredient's name.
                 - new_quantity (float): Decimal number of quantity.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
     Returns:
         dict: A message indicating whether the update succeeded, with old ingredient's name and new ingredient's name.
     
@@ -197,8 +225,6 @@ def update_ingredient_quantity(ingredient_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     if not isinstance(ingredient_data, dict):
         ingredient_data = ingredient_data.model_dump()
 
@@ -207,16 +233,16 @@ def update_ingredient_quantity(ingredient_data: dict):
     name = clean_ingredient["name"]
     new_quantity = clean_ingredient["new_quantity"]
 
-    ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
-    if not ingredient:
-        session.close()
-        return {"status": "error", "message": f"'{name}' not found."}
-    ingredient.quantity = new_quantity
-    session.commit()
-    session.close()
+    with db_manager.session_scope(session) as session:
+        ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
+        if not ingredient:
+            return {"status": "error", "message": f"'{name}' not found."}
+        ingredient.quantity = new_quantity
+        session.flush()
     return {"status": "success", "ingredient": name, "new_quantity": new_quantity}
 
-def update_ingredient_unit(ingredient_data: dict):
+@profiled
+def update_ingredient_unit(ingredient_data: dict, session: Session | None = None):
     """
     Change ingredients unit's measure.
     
@@ -224,6 +250,7 @@ def update_ingredient_unit(ingredient_data: dict):
         update_data (dict): a dictionary containing:
             - name (str) : Ingredient's name.
             - new_unit (str) : New's unit measure.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
     
     Returns:
         dict: A message indicating whether the update succeeded, with old ingredient's name and new ingredient's unit.
@@ -236,8 +263,6 @@ def update_ingredient_unit(ingredient_data: dict):
         })
         ```
     """
-    session = db_manager.SessionLocal()
-    
     if not isinstance(ingredient_data, dict):
         ingredient_data = ingredient_data.model_dump()
 
@@ -249,22 +274,24 @@ def update_ingredient_unit(ingredient_data: dict):
     name = ingredient_data.get("name")
     new_unit = ingredient_data.get("new_unit")
 
-    ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
-    if not ingredient:
-        session.close()
-        return {"status": "error", "message": f"'{name}' not found."}
+    with db_manager.session_scope(session) as session:
+        ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
+        if not ingredient:
+            return {"status": "error", "message": f"'{name}' not found."}
 
-    ingredient.unit = new_unit
-    session.commit()
-    session.close()
+        _forget_import_hashes(session, [ingredient.id])
+        ingredient.unit = new_unit
+        session.flush()
     return {"status": "success", "ingredient": name, "new_unit": new_unit}
 
-def remove_ingredient(ingredient_data: dict):
+@profiled
+def remove_ingredient(ingredient_data: dict, session: Session | None = None):
     """
     Deletes an ingredient from database.
     
     Args:
         name (str): Ingredient's name.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
     
     Returns:
         dict: A message of sucess or fail, with the name of the deleted ingredient.
@@ -274,19 +301,200 @@ def remove_ingredient(ingredient_data: dict):
         remove_ingredient(eggs)
         ```
     """
-    session = db_manager.SessionLocal()
-    
     if not isinstance(ingredient_data, dict):
         ingredient_data = ingredient_data.model_dump()
 
     clean_ingredient = normalize_universal_input(ingredient_data)
     name = clean_ingredient["name"]
-    ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
-    if not ingredient:
-        session.close()
-        return {"status": "error", "message": f"'{name}' not found."}
-
-    session.delete(ingredient)
-    session.commit()
-    session.close()
+
+    with db_manager.session_scope(session) as session:
+        ingredient = session.query(Ingredient).filter_by(name=name).one_or_none()
+        if not ingredient:
+            return {"status": "error", "message": f"'{name}' not found."}
+
+        _forget_import_hashes(session, [ingredient.id])
+        session.delete(ingredient)
+        session.flush()
     return {"status": "success", "deleted": name}
+
+# ---------------------------------------------------------------------------
+# 🔹 Batch operations
+# ---------------------------------------------------------------------------
+
+def _batch_result(results: list[dict], atomic: bool) -> dict:
+    failed = any(r["status"] == "error" for r in results)
+    if failed and atomic:
+        for r in results:
+            if r["status"] != "error":
+                r["status"], r["message"] = "skipped", "Batch not applied: another item failed."
+    applied = sum(r["status"] not in ("error", "skipped") for r in results)
+    return {"status": "error" if failed else "success", "applied": applied, "results": results}
+
+def _items(items) -> list[dict]:
+    return [i if isinstance(i, dict) else i.model_dump() for i in items]
+
+@profiled
+def add_ingredients_batch(items: list[dict], atomic: bool = False, session: Session | None = None) -> dict:
+    """
+    Create many ingredients in one transaction.
+
+    Existing names are found with one query and the new rows are written with
+    one multi-row INSERT. Each item gets its own result; with `atomic=True`
+    nothing is written if any item fails.
+
+    Args:
+        items (list[dict]): Each with `name` and `unit`.
+        atomic (bool): All-or-nothing instead of best effort.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: `status`, `applied` count and one `results` entry per item, in order.
+
+    Example:
+        ```python
+        add_ingredients_batch([{"name": "eggs", "unit": "unit"}, {"name": "Flour", "unit": "grm"}])
+        # -> {"status": "success", "applied": 2, "results": [{"name": "Eggs", "status": "created"}, ...]}
+        ```
+    """
+    cleaned = [normalize_universal_input(i) for i in _items(items)]
+    names = [c.get("name") for c in cleaned]
+
+    with db_manager.session_scope(session) as session:
+        existing = set(session.scalars(select(Ingredient.name).where(Ingredient.name.in_(set(names) - {None}))))
+
+        results, rows, seen = [], [], set()
+        for data, name in zip(cleaned, names):
+            if not name:
+                results.append({"name": name, "status": "error", "message": "Ingredient name is required."})
+            elif name in existing:
+                results.append({"name": name, "status": "error", "message": f"Ingredient '{name}' already exists."})
+            elif name in seen:
+                results.append({"name": name, "status": "error", "message": f"'{name}' appears twice in the batch."})
+            else:
+                seen.add(name)
+                rows.append({"name": name, "unit": data.get("unit")})
+                results.append({"name": name, "status": "created"})
+
+        outcome = _batch_result(results, atomic)
+        if rows and outcome["applied"]:
+            ids = session.scalars(insert(Ingredient).returning(Ingredient.id), rows).all()
+            catalog_events.mark(session, ingredients=ids)
+    return outcome
+
+@profiled
+def update_ingredients_batch(items: list[dict], atomic: bool = False, session: Session | None = None) -> dict:
+    """
+    Rename ingredients and change their units in one transaction.
+
+    All referenced names are resolved with one query and the changes are
+    written as one executemany UPDATE by primary key.
+
+    Args:
+        items (list[dict]): Each with `name` and at least one of `new_name`, `new_unit`.
+        atomic (bool): All-or-nothing instead of best effort.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: `status`, `applied` count and one `results` entry per item, in order.
+
+    Example:
+        ```python
+        update_ingredients_batch([{"name": "Milk", "new_name": "Oat Milk"}, {"name": "Rice", "new_unit": "Kg"}])
+        ```
+    """
+    cleaned = [normalize_universal_input(i) for i in _items(items)]
+    wanted = {c.get(key) for c in cleaned for key in ("name", "new_name")} - {None}
+
+    with db_manager.session_scope(session) as session:
+        ids = dict(session.execute(select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(wanted))).all())
+
+        results, rows, touched, taken = [], [], set(), set()
+        for data in cleaned:
+            name, new_name, new_unit = data.get("name"), data.get("new_name"), data.get("new_unit")
+            result = {"name": name, "status": "error"}
+            results.append(result)
+            if name not in ids:
+                result["message"] = f"Ingredient '{name}' not found."
+            elif not new_name and not new_unit:
+                result["message"] = "Nothing to update: give new_name and/or new_unit."
+            elif ids[name] in touched:
+                result["message"] = f"'{name}' appears twice in the batch."
+            elif new_name and new_name != name and (new_name in ids or new_name in taken):
+                result["message"] = f"Ingredient '{new_name}' already exists."
+            else:
+                row = {"id": ids[name]}
+                if new_name:
+                    row["name"] = new_name
+                    taken.add(new_name)
+                    result["new_name"] = new_name
+                if new_unit:
+                    row["unit"] = new_unit
+                    result["new_unit"] = new_unit
+                touched.add(ids[name])
+                rows.append(row)
+                result["status"] = "updated"
+
+        outcome = _batch_result(results, atomic)
+        if rows and outcome["applied"]:
+            _forget_import_hashes(session, touched)
+            session.execute(update(Ingredient), rows)
+            catalog_events.mark(session, ingredients=touched)
+    return outcome
+
+@profiled
+def remove_ingredients_batch(names: list[str], atomic: bool = False, session: Session | None = None) -> dict:
+    """
+    Delete many ingredients in one transaction.
+
+    Ingredients still used by a recipe are refused, so no recipe is left
+    pointing at a missing row. Usage is checked with one grouped query and the
+    rest are removed with one DELETE.
+
+    Args:
+        names (list[str]): Ingredient names.
+        atomic (bool): All-or-nothing instead of best effort.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: `status`, `applied` count and one `results` entry per name, in order.
+
+    Example:
+        ```python
+        remove_ingredients_batch(["Saffron", "Flour"])
+        # -> {"status": "error", "applied": 1, "results": [{"name": "Saffron", "status": "deleted"},
+        #     {"name": "Flour", "status": "error", "message": "Ingredient 'Flour' is used by 3 recipe(s)."}]}
+        ```
+    """
+    cleaned = [normalize_universal_input(n) for n in names]
+
+    with db_manager.session_scope(session) as session:
+        ids = dict(session.execute(
+            select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(set(cleaned)))
+        ).all())
+        usage = dict(session.execute(
+            select(RecipeIngredient.ingredient_id, func.count())
+            .where(RecipeIngredient.ingredient_id.in_(ids.values()))
+            .group_by(RecipeIngredient.ingredient_id)
+        ).all())
+
+        results, doomed = [], set()
+        for name in cleaned:
+            if name not in ids:
+                results.append({"name": name, "status": "error", "message": f"'{name}' not found."})
+            elif ids[name] in usage:
+                results.append({
+                    "name": name, "status": "error",
+                    "message": f"Ingredient '{name}' is used by {usage[ids[name]]} recipe(s)."
+                })
+            elif ids[name] in doomed:
+                results.append({"name": name, "status": "error", "message": f"'{name}' appears twice in the batch."})
+            else:
+                doomed.add(ids[name])
+                results.append({"name": name, "status": "deleted"})
+
+        outcome = _batch_result(results, atomic)
+        if doomed and outcome["applied"]:
+            _forget_import_hashes(session, doomed)
+            session.execute(delete(Ingredient).where(Ingredient.id.in_(doomed)))
+            catalog_events.mark(session, ingredients=doomed)
+    return outcome
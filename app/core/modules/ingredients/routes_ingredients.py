@@ -8,6 +8,7 @@ Author: Rafael Kaher
 """
 
 from app.core.decorators import normalize_input
+from app.core.dependencies import MainSession
 from fastapi import APIRouter, Body
 from app.core.modules.ingredients.ingredients_manager import (
     add_ingredient,
@@ -15,15 +16,31 @@ from app.core.modules.ingredients.ingredients_manager import (
     get_ingredient_name,
     update_ingredient_name,
     update_ingredient_quantity,
-    remove_ingredient
+    update_ingredient_unit,
+    remove_ingredient,
+    add_ingredients_batch,
+    update_ingredients_batch,
+    remove_ingredients_batch
 )
-from app.core.schemas import IngredientSchema, UpdateIngredientNameSchema
+from app.core.schemas import (
+    IngredientSchema,
+    UpdateIngredientNameSchema,
+    IngredientBatchSchema,
+    IngredientBatchUpdateSchema,
+    IngredientBatchDeleteSchema
+)
+from app.core.responses import FastJSONResponse, FastJSONRoute
 
-router = APIRouter(prefix="/ingredients", tags=["ingredients"])
+router = APIRouter(
+    prefix="/ingredients",
+    tags=["ingredients"],
+    route_class=FastJSONRoute,
+    default_response_class=FastJSONResponse
+)
 
 @router.post("/", status_code=201)
 @normalize_input
-async def add_recipe_endpoint(request_data: dict):
+async def add_recipe_endpoint(request_data: dict, session: MainSession):
     """
     Add an ingredient to the data base.
     
@@ -45,11 +62,50 @@ async def add_recipe_endpoint(request_data: dict):
         })
         ```
     """
-    return add_ingredient(request_data)
+    return add_ingredient(request_data, session)
+
+@router.post("/batch")
+def add_ingredients_batch_endpoint(batch: IngredientBatchSchema, session: MainSession):
+    """
+    Create many ingredients in one transaction, with a result per item.
+
+    Example:
+        ```python
+        # POST /ingredients/batch {"items": [{"name": "eggs", "unit": "unit"}], "atomic": false}
+        # Returns: {"status": "success", "applied": 1, "results": [{"name": "Eggs", "status": "created"}]}
+        ```
+    """
+    return add_ingredients_batch(batch.items, batch.atomic, session)
+
+@router.put("/batch")
+def update_ingredients_batch_endpoint(batch: IngredientBatchUpdateSchema, session: MainSession):
+    """
+    Rename ingredients or change their units in one transaction, with a result per item.
+
+    Example:
+        ```python
+        # PUT /ingredients/batch {"items": [{"name": "Milk", "new_name": "Oat Milk"}]}
+        # Returns: {"status": "success", "applied": 1, "results": [{"name": "Milk", "status": "updated", "new_name": "Oat Milk"}]}
+        ```
+    """
+    return update_ingredients_batch(batch.items, batch.atomic, session)
+
+@router.delete("/batch")
+def remove_ingredients_batch_endpoint(batch: IngredientBatchDeleteSchema, session: MainSession):
+    """
+    Delete many ingredients in one transaction. Ingredients used by recipes are refused.
+
+    Example:
+        ```python
+        # DELETE /ingredients/batch {"names": ["Saffron"]}
+        # Returns: {"status": "success", "applied": 1, "results": [{"name": "Saffron", "status": "deleted"}]}
+        ```
+    """
+    return remove_ingredients_batch(batch.names, batch.atomic, session)
 
 @router.get("/")
 @normalize_input
-async def list_ingredients_endpoint():
+async def list_ingredients_endpoint(session: MainSession):
     """
     Retrieve all ingredients from the database.
 
@@ -67,11 +123,11 @@ async def list_ingredients_endpoint():
         # -> {"status": "success", "data": [{"name": "Flour", "quantity": "100.0", "unit":"Mg"}]}
         ```
     """
-    return list_ingredients()
+    return list_ingredients(session)
 
 @router.get("/{name}")
 @normalize_input
-def get_ingredient_endpoint(name: str):
+def get_ingredient_endpoint(name: str, session: MainSession):
     """
     Retrieve a ingredient by name.
 
@@ -91,11 +147,11 @@ def get_ingredient_endpoint(name: str):
         get_ingredient_endpoint("eggs")
         ```
     """
-    return get_ingredient_name(name)
+    return get_ingredient_name(name, session)
 
 @router.put("/name", status_code=200)
 @normalize_input
-def update_ingredient_name_endpoint(update_data: UpdateIngredientNameSchema):
+def update_ingredient_name_endpoint(update_data: UpdateIngredientNameSchema, session: MainSession):
     """
     Updates a ingredient's name.
     
@@ -115,11 +171,11 @@ def update_ingredient_name_endpoint(update_data: UpdateIngredientNameSchema):
         })
         ```
     """
-    return update_ingredient_name(update_data)
+    return update_ingredient_name(update_data, session)
 
 @router.put("/quantity", status_code=200)
 @normalize_input
-def update_ingredient_quantity_endpoint(update_data: dict = Body(...)):
+def update_ingredient_quantity_endpoint(session: MainSession, update_data: dict = Body(...)):
     """
     Updates a ingredient's quantity.
     
@@ -138,11 +194,11 @@ def update_ingredient_quantity_endpoint(update_data: dict = Body(...)):
         })
         ```
     """
-    return update_ingredient_quantity(updata_data)
+    return update_ingredient_quantity(update_data, session)
 
 @router.put("/unit", status_code=200)
 @normalize_input
-def update_ingredient_unit_endpoint(update_data:dict = Body(...)):
+def update_ingredient_unit_endpoint(session: MainSession, update_data:dict = Body(...)):
     """
     Change ingredients unit's measure.
     
@@ -162,11 +218,11 @@ def update_ingredient_unit_endpoint(update_data:dict = Body(...)):
         })
         ```
     """
-    return update_ingredient_unit(update_data)
+    return update_ingredient_unit(update_data, session)
 
 @router.delete("/", status_code=200)
 @normalize_input
-def delete_ingredient_endpoint(ingredient_data: dict = Body(...)):
+def delete_ingredient_endpoint(session: MainSession, ingredient_data: dict = Body(...)):
     """
     Deletes an ingredient from database.
     
@@ -181,4 +237,4 @@ def delete_ingredient_endpoint(ingredient_data: dict = Body(...)):
         delete_ingredient_enpoint(eggs)
         ```
     """
-    return remove_ingredient(ingredient_data)
\ No newline at end of file
+    return remove_ingredient(ingredient_data, session)
\ No newline at end of file
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from app.core import metrics, profiling
+
+router = APIRouter(tags=["Monitoring"])
+
+
+# ============================================================
+# 🔹 METRICS
+# ============================================================
+@router.get("/metrics")
+def get_metrics():
+    """Per-route latency, DB time and SQL statement-count histograms."""
+    return {"status": "success", "data": metrics.snapshot()}
+
+
+@router.delete("/metrics")
+def reset_metrics():
+    """Clear the recorded histograms."""
+    metrics.reset()
+    return {"status": "success", "message": "Metrics reset."}
+
+
+# ============================================================
+# 🔹 PROFILES
+# ============================================================
+@router.get("/admin/profiles")
+def get_profiles(route: str | None = None):
+    """Recent request profiles per route, optionally filtered by e.g. `GET /recipes/{name}`."""
+    return {"status": "success", "enabled": profiling.ENABLED, "data": profiling.snapshot(route)}
+
+
+@router.delete("/admin/profiles")
+def reset_profiles():
+    """Empty the profile ring buffers."""
+    profiling.reset()
+    return {"status": "success", "message": "Profiles cleared."}
@@ -11,13 +11,40 @@ and consumed directly by FastAPI routes.
 Author: Rafael Kaher
 """
 
-from app.core import db_manager
-from app.core.db_manager import Recipe, Ingredient, RecipeIngredient
-from app.core.data_cleaner import normalize_universal_input
-from app.core.modules.spices.spices_manager import link_spice_to_recipe
-from app.core.modules.spices.spices_manager import auto_learn_from_recipe
-
-def add_recipe(recipe_data: dict):
+import re
+from collections import Counter, defaultdict
+from typing import get_args
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+from app.core import catalog_events, catalog_image, db_manager, memory_catalog
+from app.core.db_manager import Recipe, Ingredient, RecipeIngredient, RecipeSpice
+from app.core.data_cleaner import normalize_universal_input, validate_and_normalize_recipe
+from app.core.fuzzy_index import ingredient_names
+from app.core.modules.spices.spices_manager import adjust_pairings, enqueue_recipe_learning
+from app.core.profiling import profiled
+from app.core.schemas import UpsertMode
+
+_SEARCH_TERM = re.compile(r"\w+\*?")
+
+_SEARCH_PAGE = text(
+    "SELECT r.name, snippet(recipes_fts, -1, '<mark>', '</mark>', '…', 12) AS snippet, "
+    "bm25(recipes_fts, 10.0, 1.0) AS score "
+    "FROM recipes_fts JOIN recipes AS r ON r.id = recipes_fts.rowid "
+    "WHERE recipes_fts MATCH :query ORDER BY score, r.id LIMIT :limit OFFSET :offset"
+)
+_SEARCH_TOTAL = text("SELECT count(*) FROM recipes_fts WHERE recipes_fts MATCH :query")
+
+# Rows per multi-row statement; keeps bound parameters well under SQLite's limit.
+_UPSERT_CHUNK = 1000
+_DELETE_CHUNK = 10_000
+
+def _chunks(values: list, size: int = _DELETE_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+@profiled
+def add_recipe(recipe_data: dict, session: Session | None = None, fix_typos: bool = False):
     """
     Add a new recipe to the database.
 
@@ -29,9 +56,14 @@ def add_recipe(recipe_data: dict):
                 - name (str): Ingredient name.
                 - quantity (float): Amount used.
                 - unit (str): Unit of measure.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+        fix_typos (bool): Rewrite new ingredient names within a typo of an
+            existing one to it (see `fuzzy_index`).
 
     Returns:
-        dict: A status message indicating success or failure.
+        dict: A status message indicating success or failure. Ingredient names
+        matched to existing ones are listed under `resolved`, new names close
+        to existing ones under `suggestions`.
 
     Example:
         ```python
@@ -44,60 +76,314 @@ def add_recipe(recipe_data: dict):
         })
         ```
     """
-    session = db_manager.SessionLocal()
-    try:
-        if not isinstance(recipe_data, dict):
-            recipe_data = recipe_data.model_dump()
+    if not isinstance(recipe_data, dict):
+        recipe_data = recipe_data.model_dump()
 
-        clean_recipe = normalize_universal_input(recipe_data)
-        clean_recipe["ingredients"] = [
-            normalize_universal_input(i)
-            for i in clean_recipe.get("ingredients", [])
-            if isinstance(i, dict)
-        ]
+    validated = validate_and_normalize_recipe(recipe_data)
+    if validated["status"] == "error":
+        return {"status": "error", "message": validated["message"], "errors": validated["errors"]}
+    clean_recipe = validated["data"]
 
-        name = clean_recipe["name"]
-        steps = clean_recipe["steps"]
+    with db_manager.session_scope(session) as session:
+        try:
+            name = clean_recipe["name"]
+            steps = clean_recipe["steps"]
+
+            existing = session.query(Recipe).filter_by(name=name).one_or_none()
+            if existing:
+                return {"status": "error", "message": f"Recipe '{name}' already exists."}
+
+            recipe = Recipe(name=name, steps=steps)
+            session.add(recipe)
+
+            resolved, suggestions = {}, {}
+            for data in clean_recipe["ingredients"]:
+                ingredient = session.query(Ingredient).filter_by(name=data["name"]).first()
+                if not ingredient:
+                    canonical, close = ingredient_names.match(data["name"], session, fix_typos)
+                    if canonical is not None:
+                        ingredient = session.query(Ingredient).filter_by(name=canonical).first()
+                        if ingredient:
+                            resolved[data["name"]] = canonical
+                    elif close:
+                        suggestions[data["name"]] = close
+                if not ingredient:
+                    ingredient = Ingredient(name=data["name"], unit=data["unit"])
+                    session.add(ingredient)
+                session.add(RecipeIngredient(recipe=recipe, ingredient=ingredient, quantity=data["quantity"]))
+
+            session.flush()
+        except Exception as e:
+            session.rollback()
+            return {"status": "error", "message": str(e)}
 
-        existing = session.query(Recipe).filter_by(name=name).one_or_none()
-        if existing:
-            return {"status": "error", "message": f"Recipe '{name}' already exists."}
+        spices = recipe_data.get("spices", [])
+        db_manager.run_after_commit(session, lambda: enqueue_recipe_learning(name, spices))
 
-        recipe = Recipe(name=name, steps=steps)
-        session.add(recipe)
+    result = {"status": "success", "message": f"Recipe '{name}' created successfully."}
+    if resolved:
+        result["resolved"] = resolved
+    if suggestions:
+        result["suggestions"] = suggestions
+    return result
 
-        for data in clean_recipe["ingredients"]:
-            ingredient = session.query(Ingredient).filter_by(name=data["name"]).first()
-            if not ingredient:
-                ingredient = Ingredient(name=data["name"], unit=data["unit"])
-                session.add(ingredient)
-            session.add(
-                RecipeIngredient(recipe=recipe, ingredient=ingredient, quantity=data.get("quantity", 0.0))
-            )
+def _upsert_ingredients(session: Session, wanted: dict, fix_typos: bool = False) -> tuple[dict, dict, set, dict]:
+    """
+    Ids for the ingredient names in `wanted` (name -> unit), creating the
+    unknown ones, with the names matched to existing ones and the suggestions
+    for new names (see `NameCatalog.match`).
+    """
+    names = list(wanted)
+    ids = {}
+    for chunk in _chunks(names):
+        ids.update(session.execute(select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(chunk))).all())
+
+    resolved, suggestions = {}, {}
+    for name in names:
+        if name not in ids:
+            canonical, close = ingredient_names.match(name, session, fix_typos)
+            if canonical is not None:
+                resolved[name] = canonical
+            elif close:
+                suggestions[name] = close
+    canonicals = [c for c in set(resolved.values()) if c not in ids]
+    for chunk in _chunks(canonicals):
+        ids.update(session.execute(select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(chunk))).all())
+    # The name index can lag behind the session (a name deleted but not yet
+    # committed); such names are stored as given.
+    resolved = {name: canonical for name, canonical in resolved.items() if canonical in ids}
+
+    created = set()
+    new = [{"name": n, "unit": wanted[n]} for n in names if n not in ids and n not in resolved]
+    for chunk in _chunks(new, _UPSERT_CHUNK):
+        rows = session.execute(
+            sqlite_insert(Ingredient).values(chunk).on_conflict_do_nothing().returning(Ingredient.name, Ingredient.id)
+        ).all()
+        ids.update(rows)
+        created.update(iid for _, iid in rows)
+    for name, canonical in resolved.items():
+        ids[name] = ids[canonical]
+    return ids, resolved, created, suggestions
+
+def _pairing_changes(session: Session, updated: dict, batch: dict, ingredient_ids: dict, resolved: dict, merge: bool) -> Counter:
+    """
+    Co-occurrence changes, keyed (spice_id, ingredient name), for existing
+    recipes (id -> name in `updated`) whose ingredient list the batch rewrites
+    while spices stay linked to them.
+    """
+    linked = defaultdict(set)
+    for chunk in _chunks(list(updated)):
+        for rid, sid in session.execute(
+            select(RecipeSpice.recipe_id, RecipeSpice.spice_id).where(RecipeSpice.recipe_id.in_(chunk))
+        ):
+            linked[rid].add(sid)
+
+    before, names = defaultdict(set), {}
+    for chunk in _chunks(list(linked)):
+        for rid, iid, name in session.execute(
+            select(RecipeIngredient.recipe_id, Ingredient.id, Ingredient.name)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(RecipeIngredient.recipe_id.in_(chunk))
+        ):
+            before[rid].add(iid)
+            names[iid] = name
+
+    changes = Counter()
+    for rid, spice_ids in linked.items():
+        after = set()
+        for ingredient in batch[updated[rid]]["ingredients"]:
+            iid = ingredient_ids[ingredient]
+            after.add(iid)
+            names.setdefault(iid, resolved.get(ingredient, ingredient))
+        if merge:
+            after |= before[rid]
+        for iid, delta in [(i, 1) for i in after - before[rid]] + [(i, -1) for i in before[rid] - after]:
+            for sid in spice_ids:
+                changes[sid, names[iid]] += delta
+    return changes
+
+def _recipe_pairings(session: Session, recipe_ids, ingredient_ids=None) -> Counter:
+    """
+    Co-occurrences the recipes contribute, keyed (spice_id, ingredient name),
+    counted like `relearn_catalog` does; only for `ingredient_ids` if given.
+    """
+    counts = Counter()
+    for chunk in _chunks(list(recipe_ids)):
+        query = (
+            select(RecipeSpice.spice_id, Ingredient.name)
+            .join(RecipeIngredient, RecipeIngredient.recipe_id == RecipeSpice.recipe_id)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(RecipeSpice.recipe_id.in_(chunk))
+        )
+        if ingredient_ids is not None:
+            query = query.where(RecipeIngredient.ingredient_id.in_(ingredient_ids))
+        counts.update((spice_id, name) for spice_id, name in session.execute(query))
+    return counts
+
+def _move_pairings(session: Session, before: Counter, after: Counter | None = None) -> None:
+    """Replace the `before` co-occurrences with the `after` ones once the session commits."""
+    changes = Counter(after)
+    changes.subtract(before)
+    if any(changes.values()):
+        db_manager.run_after_commit(session, lambda: adjust_pairings(changes))
+
+@profiled
+def upsert_recipes(
+    recipes: list[dict],
+    mode: UpsertMode = "skip",
+    session: Session | None = None,
+    normalized: bool = False,
+    fix_typos: bool = False
+) -> dict:
+    """
+    Write many recipes with one `INSERT ... ON CONFLICT` statement per chunk.
 
-        session.flush()
-        session.refresh(recipe)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        return {"status": "error", "message": str(e)}
-    finally:
-        session.close()
-
-    for spice in recipe_data.get("spices", []):
-        try:
-            from app.core.modules.spices.spices_manager import link_spice_to_recipe
-            link_spice_to_recipe(name, spice)
-            auto_learn_from_recipe(name)
-        except Exception as e:
-            print(f"⚠️ Warning: could not link spice '{spice}' → {e}")
+    Modes for recipes whose name already exists:
+        - skip: leave the stored recipe untouched.
+        - replace: overwrite the steps and the whole ingredient list.
+        - merge: overwrite the steps, update quantities of shared ingredients
+          and add the new ones; ingredients missing from the payload are kept.
+
+    Args:
+        recipes (list[dict]): Payloads shaped like `add_recipe` input, optionally
+            with the `content_hash` of the payload they came from (merged recipes keep none).
+        mode (str): "skip", "replace" or "merge".
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+        normalized (bool): The payloads already went through `validate_and_normalize_recipe`.
+        fix_typos (bool): Rewrite new ingredient names within a typo of an existing one to it.
 
-    return {"status": "success", "message": f"Recipe '{name}' created successfully."}
+    Returns:
+        dict: `applied` count and one result per recipe, whose `action` is
+        "created", "skipped", "replaced" or "merged".
 
-def list_recipes():
+    Example:
+        ```python
+        upsert_recipes([{"name": "Pancakes", "steps": "Fry", "ingredients": [...]}], mode="merge")
+        # -> {"status": "success", "applied": 1, "results": [{"name": "Pancakes", "status": "success", "action": "merged"}]}
+        ```
+    """
+    if mode not in get_args(UpsertMode):
+        return {"status": "error", "message": f"Unknown mode '{mode}'."}
+
+    results, batch = [], {}
+    for raw in recipes:
+        if not isinstance(raw, dict):
+            raw = raw.model_dump()
+        if not normalized:
+            validated = validate_and_normalize_recipe(raw)
+            if validated["status"] == "error":
+                results.append({"name": raw.get("name"), "status": "error",
+                                "message": validated["message"], "errors": validated["errors"]})
+                continue
+            raw = validated["data"]
+        name = raw["name"]
+        if name in batch:
+            results.append({"name": name, "status": "error", "message": f"Recipe '{name}' appears twice in the batch."})
+            continue
+        batch[name] = {
+            "steps": raw["steps"],
+            "content_hash": raw.get("content_hash"),
+            "ingredients": {i["name"]: (i["unit"], i["quantity"]) for i in raw["ingredients"]},
+            "spices": raw.get("spices") or [],
+        }
+        results.append({"name": name, "status": "success"})
+
+    with db_manager.session_scope(session) as session:
+        existing = {}
+        names = list(batch)
+        for chunk in _chunks(names):
+            existing.update(session.execute(select(Recipe.name, Recipe.id).where(Recipe.name.in_(chunk))).all())
+
+        targets = [n for n in names if mode != "skip" or n not in existing]
+        wanted = {}
+        for name in targets:
+            for ingredient, (unit, _) in batch[name]["ingredients"].items():
+                wanted.setdefault(ingredient, unit)
+        ingredient_ids, resolved, created_ingredients, suggestions = _upsert_ingredients(session, wanted, fix_typos)
+        updated = {existing[n]: n for n in targets if n in existing}
+        pairings = _pairing_changes(session, updated, batch, ingredient_ids, resolved, mode == "merge") if updated else {}
+
+        # A merged recipe no longer equals the payload it came from, so it keeps no hash.
+        hashes = {
+            n: None if mode == "merge" and n in existing else batch[n]["content_hash"] for n in targets
+        }
+
+        # The search index is updated once for the batch instead of by the per-row triggers.
+        recipe_ids = {}
+        conn = session.connection()
+        if mode != "skip":
+            db_manager.index_recipes(conn, [existing[n] for n in targets if n in existing], remove=True)
+        with db_manager.search_triggers_suspended(conn):
+            for chunk in _chunks(targets, _UPSERT_CHUNK):
+                stmt = sqlite_insert(Recipe).values([
+                    {"name": n, "steps": batch[n]["steps"], "content_hash": hashes[n]} for n in chunk
+                ])
+                if mode == "skip":
+                    stmt = stmt.on_conflict_do_nothing(index_elements=[Recipe.name])
+                else:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[Recipe.name],
+                        set_={"steps": stmt.excluded.steps, "content_hash": stmt.excluded.content_hash}
+                    )
+                recipe_ids.update(session.execute(stmt.returning(Recipe.name, Recipe.id)).all())
+        db_manager.index_recipes(conn, recipe_ids.values())
+
+        if mode == "replace":
+            stale = [recipe_ids[n] for n in recipe_ids if n in existing]
+            for chunk in _chunks(stale):
+                session.execute(
+                    delete(RecipeIngredient).where(RecipeIngredient.recipe_id.in_(chunk))
+                    .execution_options(synchronize_session=False)
+                )
+
+        links = {}
+        for name, rid in recipe_ids.items():
+            for ingredient, (_, quantity) in batch[name]["ingredients"].items():
+                links[rid, ingredient_ids[ingredient]] = quantity
+        rows = [{"recipe_id": r, "ingredient_id": i, "quantity": q} for (r, i), q in links.items()]
+        for chunk in _chunks(rows, _UPSERT_CHUNK):
+            stmt = sqlite_insert(RecipeIngredient).values(chunk)
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id],
+                set_={"quantity": stmt.excluded.quantity}
+            ))
+
+        catalog_events.mark(session, recipes=recipe_ids.values(), ingredients=created_ingredients)
+        # Spices already linked to a rewritten recipe follow its ingredient changes;
+        # the learning job only counts spices it newly links, so re-imports add nothing.
+        if pairings:
+            db_manager.run_after_commit(session, lambda: adjust_pairings(pairings))
+        for name in recipe_ids:
+            spices = batch[name]["spices"]
+            if spices:
+                db_manager.run_after_commit(session, lambda name=name, spices=spices: enqueue_recipe_learning(name, spices))
+
+    action = {"replace": "replaced", "merge": "merged"}.get(mode)
+    for result in results:
+        name = result["name"]
+        if result["status"] != "success":
+            continue
+        if name not in recipe_ids:
+            result["action"] = "skipped"
+        else:
+            result["action"] = action if name in existing else "created"
+        renamed = {n: resolved[n] for n in batch[name]["ingredients"] if n in resolved}
+        if renamed and name in recipe_ids:
+            result["resolved"] = renamed
+        close = {n: suggestions[n] for n in batch[name]["ingredients"] if n in suggestions}
+        if close and name in recipe_ids:
+            result["suggestions"] = close
+    applied = sum(1 for r in results if r.get("action") not in (None, "skipped"))
+    return {"status": "success", "applied": applied, "results": results}
+
+@profiled
+def list_recipes(session: Session | None = None):
 
     """
-    Retrieve all recipes from the database.
+    Retrieve all recipes from the database, or from the memory catalog when enabled.
+
+    Args:
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Contains:
@@ -112,21 +398,28 @@ def list_recipes():
         # -> {"status": "success", "data": [{"name": "Pancakes", "steps": "Mix and fry"}]}
         ```
     """
-    
-    session = db_manager.SessionLocal()
-    recipes = session.query(Recipe).all()
-    result = [{"name": r.name, "steps": r.steps} for r in recipes]
-    session.close()
+
+    memory = memory_catalog.active(session)
+    if memory is not None:
+        return {"status": "success", "data": memory.recipes(session)}
+
+    with db_manager.session_scope(session) as session:
+        recipes = session.query(Recipe).all()
+        result = [{"name": r.name, "steps": r.steps} for r in recipes]
     return {"status": "success", "data": result}
 
 
-def get_recipe_by_name(name: str):
+@profiled
+def get_recipe_by_name(name: str, session: Session | None = None):
 
     """
     Retrieve a recipe and its ingredients by name.
+    Served from the memory catalog or the catalog image when one is enabled
+    (see `memory_catalog` and `catalog_image`).
 
     Args:
         name (str): Recipe name.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Contains:
@@ -145,30 +438,211 @@ def get_recipe_by_name(name: str):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     clean_name = normalize_universal_input(name)
-    recipe = session.query(Recipe).filter_by(name=clean_name).one_or_none()
-    if not recipe:
-        session.close()
-        return {"status": "error", "message": f"'{clean_name}' not found."}
-
-    ingredients = [
-        {"name": ri.ingredient.name, "quantity": ri.quantity, "unit": ri.ingredient.unit}
-        for ri in recipe.recipe_ingredients
-    ]
-    data = {"name": recipe.name, "steps": recipe.steps, "ingredients": ingredients}
-    session.close()
+
+    memory = memory_catalog.active(session)
+    if memory is not None:
+        data = memory.recipe(clean_name, session)
+        if data is None:
+            return {"status": "error", "message": f"'{clean_name}' not found."}
+        return {"status": "success", "data": data}
+
+    cached = catalog_image.lookup_recipe(clean_name, session)
+    if cached is not None:
+        return {"status": "success", "data": cached}
+
+    with db_manager.session_scope(session) as session:
+        recipe = session.query(Recipe).filter_by(name=clean_name).one_or_none()
+        if not recipe:
+            return {"status": "error", "message": f"'{clean_name}' not found."}
+
+        ingredients = [
+            {"name": ri.ingredient.name, "quantity": ri.quantity, "unit": ri.ingredient.unit}
+            for ri in recipe.recipe_ingredients
+        ]
+        data = {"name": recipe.name, "steps": recipe.steps, "ingredients": ingredients}
     return {"status": "success", "data": data}
 
 
-def remove_recipe(recipe_data: dict):
+@profiled
+def find_recipes_by_ingredients(
+    include: list[str],
+    exclude: list[str] | None = None,
+    match: str = "all",
+    page: int = 1,
+    page_size: int = 20,
+    session: Session | None = None
+):
+    """
+    Find recipes that use the given ingredients, ranked by coverage.
+
+    Runs as one grouped query over the (ingredient_id, recipe_id) index of
+    `recipe_ingredients`, ties broken by age and the total taken from a window
+    count; names are only fetched for the returned page.
+
+    Args:
+        include (list[str]): Ingredients the recipes should contain.
+        exclude (list[str], optional): Ingredients the recipes must not contain.
+        match (str): "all" keeps recipes with every included ingredient,
+            "any" keeps recipes with at least one.
+        page (int): 1-based page number.
+        page_size (int): Recipes per page.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: Contains:
+            - status (str): "success" or "error".
+            - data (list[dict]): Each has name, matched, coverage (share of the
+              included ingredients found) and ingredient_count, best coverage first
+              and oldest recipe first among ties.
+            - total (int): Matching recipes across all pages.
+
+    Example:
+        ```python
+        find_recipes_by_ingredients(["Flour", "Egg"], exclude=["Milk"])
+        # -> {"status": "success", "data": [{"name": "Pasta", "matched": 2, "coverage": 1.0, ...}], ...}
+        ```
+    """
+    if match not in ("all", "any"):
+        return {"status": "error", "message": "match must be 'all' or 'any'."}
+
+    include = list(dict.fromkeys(normalize_universal_input(n) for n in include if n and n.strip()))
+    exclude = list(dict.fromkeys(normalize_universal_input(n) for n in exclude or [] if n and n.strip()))
+    if not include:
+        return {"status": "error", "message": "At least one ingredient to include is required."}
+
+    empty = {"status": "success", "data": [], "total": 0, "page": page, "page_size": page_size}
+
+    with db_manager.session_scope(session) as session:
+        ids = dict(
+            session.query(Ingredient.name, Ingredient.id)
+            .filter(Ingredient.name.in_(include + exclude))
+        )
+        include_ids = [ids[n] for n in include if n in ids]
+        exclude_ids = [ids[n] for n in exclude if n in ids]
+        if not include_ids or (match == "all" and len(include_ids) < len(include)):
+            return empty
+
+        matched = func.count().label("matched")
+        hits = (
+            select(RecipeIngredient.recipe_id, matched, func.count().over().label("total"))
+            .where(RecipeIngredient.ingredient_id.in_(include_ids))
+            .group_by(RecipeIngredient.recipe_id)
+            .order_by(matched.desc(), RecipeIngredient.recipe_id)
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+        )
+        if exclude_ids:
+            hits = hits.where(RecipeIngredient.recipe_id.not_in(
+                select(RecipeIngredient.recipe_id).where(RecipeIngredient.ingredient_id.in_(exclude_ids))
+            ))
+        if match == "all":
+            hits = hits.having(matched == len(include_ids))
+
+        rows = session.execute(hits).all()
+        if not rows:
+            if page > 1:
+                total = session.scalar(
+                    select(func.count()).select_from(hits.limit(None).offset(None).subquery())
+                )
+                return {**empty, "total": total}
+            return empty
+
+        page_ids = [recipe_id for recipe_id, _, _ in rows]
+        details = {
+            recipe_id: (name, count)
+            for recipe_id, name, count in session.execute(
+                select(Recipe.id, Recipe.name, func.count(RecipeIngredient.ingredient_id))
+                .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+                .where(Recipe.id.in_(page_ids))
+                .group_by(Recipe.id)
+            )
+        }
+
+    data = [
+        {
+            "name": details[recipe_id][0],
+            "matched": matched,
+            "coverage": round(matched / len(include), 4),
+            "ingredient_count": details[recipe_id][1],
+        }
+        for recipe_id, matched, _ in rows
+    ]
+    total = rows[0][2]
+    return {"status": "success", "data": data, "total": total, "page": page, "page_size": page_size}
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 expression: every word is quoted, so
+    operators typed by users are matched literally, and the last word (or any
+    word ending in `*`) is a prefix.
+
+    Example:
+        ```python
+        fts_query("tomato sou")
+        # Returns: '"tomato" "sou"*'
+        ```
+    """
+    terms = _SEARCH_TERM.findall(query or "")
+    return " ".join(
+        f'"{term.rstrip("*")}"' + ("*" if term.endswith("*") or i == len(terms) - 1 else "")
+        for i, term in enumerate(terms)
+    )
+
+@profiled
+def search_recipes(query: str, page: int = 1, page_size: int = 20, session: Session | None = None):
+    """
+    Full-text search over recipe names and steps.
+
+    Backed by the `recipes_fts` FTS5 index: matches are ranked with BM25
+    (a hit in the name weighs ten times one in the steps) and each result
+    carries a highlighted snippet.
+
+    Args:
+        query (str): Free text; the last word is matched as a prefix.
+        page (int): 1-based page number.
+        page_size (int): Recipes per page.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: Contains:
+            - status (str): "success" or "error".
+            - data (list[dict]): Each has name, snippet and score (higher is better).
+            - total (int): Matching recipes across all pages.
+
+    Example:
+        ```python
+        search_recipes("golden pan")
+        # -> {"status": "success", "data": [{"name": "Pancakes", "snippet": "Mix and fry until <mark>golden</mark>", ...}], ...}
+        ```
+    """
+    expression = fts_query(query)
+    if not expression:
+        return {"status": "error", "message": "Search query must contain at least one word."}
+
+    with db_manager.session_scope(session) as session:
+        rows = session.execute(
+            _SEARCH_PAGE, {"query": expression, "limit": page_size, "offset": (page - 1) * page_size}
+        ).all()
+        if page == 1 and len(rows) < page_size:
+            total = len(rows)
+        else:
+            total = session.scalar(_SEARCH_TOTAL, {"query": expression})
+
+    data = [{"name": name, "snippet": snippet, "score": round(-score, 4)} for name, snippet, score in rows]
+    return {"status": "success", "data": data, "total": total, "page": page, "page_size": page_size}
+
+
+@profiled
+def remove_recipe(recipe_data: dict, session: Session | None = None):
     """
     Delete a recipe from the database.
 
     Args:
         recipe_data (dict): Must include:
             - name (str): The recipe name to remove.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: A message indicating success or failure.
@@ -179,22 +653,92 @@ def remove_recipe(recipe_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
     raw_recipe_name = recipe_data.get("name")
     recipe_name = normalize_universal_input(raw_recipe_name)
-    target = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
 
-    if not target:
-        session.close()
-        return {"status": "error", "message": f"'{recipe_name}' not found."}
+    with db_manager.session_scope(session) as session:
+        target = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
+        if not target:
+            return {"status": "error", "message": f"'{recipe_name}' not found."}
 
-    session.delete(target)
-    session.commit()
-    session.close()
+        _move_pairings(session, _recipe_pairings(session, [target.id]))
+        session.delete(target)
+        session.flush()
     return {"status": "success", "deleted": recipe_name}
 
 
-def remove_ingredient_from_recipe(recipe_data: dict):
+def _like_pattern(pattern: str) -> str:
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "%").replace("?", "_")
+
+@profiled
+def remove_recipes(
+    names: list[str] | None = None,
+    name_pattern: str | None = None,
+    dry_run: bool = False,
+    session: Session | None = None
+) -> dict:
+    """
+    Delete many recipes with set-based statements.
+
+    Recipe ids are resolved first (by name, or with a glob-style pattern
+    where `*` matches anything and `?` one character, case-insensitively),
+    then each chunk of ids is removed with one `DELETE ... WHERE recipe_id IN
+    (...)` per link table and one for `recipes`; nothing is loaded into the
+    session. The `recipes_cascade_delete` trigger covers any link table not
+    listed here. In-memory indexes are notified through `catalog_events`.
+
+    Args:
+        names (list[str], optional): Recipe names to delete.
+        name_pattern (str, optional): Pattern such as "Christmas *"; use instead of `names`.
+        dry_run (bool): Only report what would be deleted.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+    Returns:
+        dict: `deleted` (or `matched` on a dry run) count and the `not_found` names.
+
+    Example:
+        ```python
+        remove_recipes(name_pattern="Christmas *")
+        # -> {"status": "success", "deleted": 120, "not_found": []}
+        ```
+    """
+    if (names is None) == (name_pattern is None):
+        return {"status": "error", "message": "Give either names or name_pattern."}
+
+    with db_manager.session_scope(session) as session:
+        if names is not None:
+            wanted = list(dict.fromkeys(normalize_universal_input(n) for n in names))
+            found = {}
+            for chunk in _chunks(wanted):
+                found.update(session.execute(select(Recipe.name, Recipe.id).where(Recipe.name.in_(chunk))).all())
+            ids = list(found.values())
+            not_found = [n for n in wanted if n not in found]
+        else:
+            ids = list(session.scalars(
+                select(Recipe.id).where(Recipe.name.like(_like_pattern(name_pattern.strip()), escape="\\"))
+            ))
+            not_found = []
+
+        if dry_run:
+            return {"status": "success", "dry_run": True, "matched": len(ids), "not_found": not_found}
+
+        _move_pairings(session, _recipe_pairings(session, ids))
+        for chunk in _chunks(ids):
+            for model in (RecipeIngredient, RecipeSpice):
+                session.execute(
+                    delete(model).where(model.recipe_id.in_(chunk)).execution_options(synchronize_session=False)
+                )
+            session.execute(
+                delete(Recipe).where(Recipe.id.in_(chunk)).execution_options(synchronize_session=False)
+            )
+        catalog_events.mark(session, deleted_recipes=ids)
+
+    return {"status": "success", "deleted": len(ids), "not_found": not_found}
+
+
+@profiled
+def remove_ingredient_from_recipe(recipe_data: dict, session: Session | None = None):
 
     """
     Remove a specific ingredient from a recipe.
@@ -203,6 +747,7 @@ def remove_ingredient_from_recipe(recipe_data: dict):
         recipe_data (dict): Must include:
             - name (str): Recipe name.
             - ingredient (str): Ingredient name to remove.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Updated recipe data or an error message.
@@ -216,38 +761,37 @@ def remove_ingredient_from_recipe(recipe_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     raw_recipe_name = recipe_data.get("name")
     raw_ingredient_name = recipe_data.get("ingredient")
 
     cleaned_recipe_name = normalize_universal_input(raw_recipe_name)
     ingredient_name = normalize_universal_input(raw_ingredient_name)
 
-    recipe = session.query(Recipe).filter_by(name=cleaned_recipe_name).one_or_none()
-    if not recipe:
-        session.close()
-        return {"status": "error", "message": f"'{cleaned_recipe_name}' not found."}
-
-    for link in recipe.recipe_ingredients:
-        if link.ingredient.name == ingredient_name:
-            session.delete(link)
-            session.commit()
-            data = {
-                "name": recipe.name,
-                "steps": recipe.steps,
-                "ingredients": [
-                    {"name": ri.ingredient.name, "quantity": ri.quantity, "unit": ri.ingredient.unit}
-                    for ri in recipe.recipe_ingredients if ri.ingredient.name != ingredient_name
-                ]
-            }
-            session.close()
-            return {"status": "success", "data": data}
+    with db_manager.session_scope(session) as session:
+        recipe = session.query(Recipe).filter_by(name=cleaned_recipe_name).one_or_none()
+        if not recipe:
+            return {"status": "error", "message": f"'{cleaned_recipe_name}' not found."}
+
+        for link in recipe.recipe_ingredients:
+            if link.ingredient.name == ingredient_name:
+                recipe.content_hash = None
+                _move_pairings(session, _recipe_pairings(session, [recipe.id], [link.ingredient_id]))
+                session.delete(link)
+                session.flush()
+                data = {
+                    "name": recipe.name,
+                    "steps": recipe.steps,
+                    "ingredients": [
+                        {"name": ri.ingredient.name, "quantity": ri.quantity, "unit": ri.ingredient.unit}
+                        for ri in recipe.recipe_ingredients if ri.ingredient.name != ingredient_name
+                    ]
+                }
+                return {"status": "success", "data": data}
 
-    session.close()
     return {"status": "error", "message": f"Ingredient '{ingredient_name}' not found in recipe."}
 
-def update_recipe_name(recipe_data: dict):
+@profiled
+def update_recipe_name(recipe_data: dict, session: Session | None = None):
 
     """
     Update a recipe’s name in the database.
@@ -256,6 +800,7 @@ def update_recipe_name(recipe_data: dict):
         recipe_data (dict): Must include:
             - old_name (str): Current recipe name.
             - new_name (str): New name to assign.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: A message indicating whether the update succeeded.
@@ -269,23 +814,22 @@ def update_recipe_name(recipe_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     clean_recipe = normalize_universal_input(recipe_data)
 
     old_name = clean_recipe["old_name"]
     new_name = clean_recipe["new_name"]
 
-    target = session.query(Recipe).filter_by(name=old_name).one_or_none()
-    if not target:
-        session.close()
-        return {"status": "error", "message": f"'{old_name}' not found."}
-    target.name = new_name
-    session.commit()
-    session.close()
+    with db_manager.session_scope(session) as session:
+        target = session.query(Recipe).filter_by(name=old_name).one_or_none()
+        if not target:
+            return {"status": "error", "message": f"'{old_name}' not found."}
+        target.name = new_name
+        target.content_hash = None
+        session.flush()
     return {"status": "success", "updated": old_name, "new_name": new_name}
 
-def update_recipe_ingredient_name(recipe_data: dict):
+@profiled
+def update_recipe_ingredient_name(recipe_data: dict, session: Session | None = None):
 
     """
     Update the name of an ingredient inside a recipe.
@@ -295,6 +839,7 @@ def update_recipe_ingredient_name(recipe_data: dict):
             - recipe_name (str): Recipe name.
             - old_ingredient (str): Ingredient to rename.
             - new_ingredient (str): New ingredient name.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Success message or error if ingredient not found.
@@ -309,35 +854,35 @@ def update_recipe_ingredient_name(recipe_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     clean_recipe = normalize_universal_input(recipe_data)
 
     old_ingredient = clean_recipe["old_ingredient"]
     new_ingredient = clean_recipe["new_ingredient"]
     recipe_name = clean_recipe["recipe_name"]
 
-    recipe = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
-    if not recipe:
-        session.close()
-        return {"status": "error", "message": f"'{recipe_name}' not found."}
+    with db_manager.session_scope(session) as session:
+        recipe = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
+        if not recipe:
+            return {"status": "error", "message": f"'{recipe_name}' not found."}
+
+        for link in recipe.recipe_ingredients:
+            if link.ingredient.name == old_ingredient:
+                new_ing_obj = session.query(Ingredient).filter_by(name=new_ingredient).one_or_none()
+                if not new_ing_obj:
+                    new_ing_obj = Ingredient(name=new_ingredient, unit=recipe_data.get("unit", ""))
+                    session.add(new_ing_obj)
+
+                before = _recipe_pairings(session, [recipe.id], [link.ingredient_id])
+                link.ingredient = new_ing_obj
+                recipe.content_hash = None
+                session.flush()
+                _move_pairings(session, before, _recipe_pairings(session, [recipe.id], [new_ing_obj.id]))
+                return {"status": "success", "updated": old_ingredient, "new_ingredient": new_ingredient}
 
-    for link in recipe.recipe_ingredients:
-        if link.ingredient.name == old_ingredient:
-            new_ing_obj = session.query(Ingredient).filter_by(name=new_ingredient).one_or_none()
-            if not new_ing_obj:
-                new_ing_obj = Ingredient(name=new_ingredient, unit=recipe_data.get("unit", ""))
-                session.add(new_ing_obj)
-
-            link.ingredient = new_ing_obj
-            session.commit()
-            session.close()
-            return {"status": "success", "updated": old_ingredient, "new_ingredient": new_ingredient}
-
-    session.close()
     return {"status": "error", "message": f"Ingredient '{old_ingredient}' not found in '{recipe_name}'."}
 
-def update_recipe_quantity(recipe_data: dict):
+@profiled
+def update_recipe_quantity(recipe_data: dict, session: Session | None = None):
 
     """
     Update the quantity of a specific ingredient in a recipe.
@@ -347,6 +892,7 @@ def update_recipe_quantity(recipe_data: dict):
             - recipe_name (str): Target recipe name.
             - ingredient (str): Ingredient to modify.
             - new_quantity (float): Updated quantity value.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
 
     Returns:
         dict: Confirmation message or error message.
@@ -361,25 +907,279 @@ def update_recipe_quantity(recipe_data: dict):
         ```
     """
 
-    session = db_manager.SessionLocal()
-
     clean_recipe = normalize_universal_input(recipe_data)
 
     recipe_name = clean_recipe["recipe_name"]
     ingredient_name = clean_recipe["ingredient"]
     new_quantity = clean_recipe["new_quantity"]
 
-    recipe = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
-    if not recipe:
-        session.close()
-        return {"status": "error", "message": f"'{recipe_name}' not found."}
+    with db_manager.session_scope(session) as session:
+        recipe = session.query(Recipe).filter_by(name=recipe_name).one_or_none()
+        if not recipe:
+            return {"status": "error", "message": f"'{recipe_name}' not found."}
 
-    for link in recipe.recipe_ingredients:
-        if link.ingredient.name == ingredient_name:
-            link.quantity = new_quantity
-            session.commit()
-            session.close()
-            return {"status": "success", "updated": ingredient_name, "new_quantity": new_quantity}
+        for link in recipe.recipe_ingredients:
+            if link.ingredient.name == ingredient_name:
+                link.quantity = new_quantity
+                recipe.content_hash = None
+                session.flush()
+                return {"status": "success", "updated": ingredient_name, "new_quantity": new_quantity}
 
-    session.close()
     return {"status": "error", "message": f"Ingredient '{ingredient_name}' not found in '{recipe_name}'."}
+
+# ---------------------------------------------------------------------------
+# 🔹 Multi-operation patches
+# ---------------------------------------------------------------------------
+
+def _operation_names(op: dict) -> list[str]:
+    return [op[key] for key in ("name", "old", "new") if key in op]
+
+def _plan_patch(recipe: Recipe, operations: list[dict]):
+    """
+    Replay `operations` on a plain copy of `recipe`.
+
+    Returns:
+        tuple: (plan, None) with the final name, steps and ingredients, or
+        (None, error dict) naming the first operation that cannot apply.
+    """
+    plan = {
+        "name": recipe.name,
+        "steps": recipe.steps,
+        "ingredients": {
+            link.ingredient.name: {"quantity": link.quantity, "unit": link.ingredient.unit}
+            for link in recipe.recipe_ingredients
+        },
+    }
+    items = plan["ingredients"]
+    for index, op in enumerate(operations):
+        kind, problem = op["op"], None
+        if kind == "rename":
+            plan["name"] = op["new_name"]
+        elif kind == "set_steps":
+            plan["steps"] = op["steps"]
+        elif kind == "add_ingredient":
+            if op["name"] in items:
+                problem = f"'{op['name']}' is already in the recipe."
+            else:
+                items[op["name"]] = {"quantity": op["quantity"], "unit": op["unit"]}
+        elif kind == "replace_ingredient":
+            if op["old"] not in items:
+                problem = f"'{op['old']}' is not in the recipe."
+            elif op["new"] in items:
+                problem = f"'{op['new']}' is already in the recipe."
+            else:
+                items[op["new"]] = {"quantity": items.pop(op["old"])["quantity"], "unit": op["unit"]}
+        elif op["name"] not in items:
+            problem = f"'{op['name']}' is not in the recipe."
+        elif kind == "remove_ingredient":
+            del items[op["name"]]
+        else:
+            items[op["name"]]["quantity"] = op["quantity"]
+
+        if problem:
+            return None, {
+                "status": "error",
+                "message": f"Operation {index + 1} ({kind}): {problem}",
+                "operation": index,
+            }
+    return plan, None
+
+def _load_patch_targets(session: Session, names: set[str], operations: list[dict]):
+    recipes = {
+        r.name: r for r in session.scalars(
+            select(Recipe)
+            .where(Recipe.name.in_(names))
+            .options(selectinload(Recipe.recipe_ingredients).selectinload(RecipeIngredient.ingredient))
+        )
+    }
+    wanted = {n for op in operations for n in _operation_names(op)}
+    ingredients = {i.name: i for i in session.scalars(select(Ingredient).where(Ingredient.name.in_(wanted)))}
+    return recipes, ingredients
+
+_ADDED_NAME = {"add_ingredient": "name", "replace_ingredient": "new"}
+
+def _resolve_added_names(session: Session, operations: list[dict], ingredients: dict, fix_typos: bool):
+    """
+    Rewrite the ingredient names `operations` add to the stored names they
+    match (see `NameCatalog.match`), before planning, so the duplicate checks
+    compare the names that will actually be linked.
+
+    Returns:
+        tuple: (resolved, suggestions) for the result of the patch.
+    """
+    resolved, suggestions = {}, {}
+    for op in operations:
+        key = _ADDED_NAME.get(op["op"])
+        if key is None or op[key] in ingredients:
+            continue
+        name = op[key]
+        canonical, close = ingredient_names.match(name, session, fix_typos)
+        if canonical is not None and canonical != name:
+            stored = ingredients.get(canonical) or session.scalars(select(Ingredient).filter_by(name=canonical)).first()
+            if stored is not None:
+                ingredients[canonical] = stored
+                resolved[name] = op[key] = canonical
+        elif close:
+            suggestions[name] = close
+    return resolved, suggestions
+
+def _ingredient_for(session: Session, name: str, unit: str, ingredients: dict) -> Ingredient:
+    if name not in ingredients:
+        ingredients[name] = Ingredient(name=name, unit=unit)
+        session.add(ingredients[name])
+    return ingredients[name]
+
+def _apply_plan(session: Session, recipe: Recipe, plan: dict, ingredients: dict) -> dict:
+    recipe.name, recipe.steps = plan["name"], plan["steps"]
+    recipe.content_hash = None
+    current = {link.ingredient.name: link for link in recipe.recipe_ingredients}
+    for name, link in current.items():
+        if name not in plan["ingredients"]:
+            recipe.recipe_ingredients.remove(link)
+        elif link.quantity != plan["ingredients"][name]["quantity"]:
+            link.quantity = plan["ingredients"][name]["quantity"]
+    for name, item in plan["ingredients"].items():
+        if name not in current:
+            ingredient = _ingredient_for(session, name, item["unit"], ingredients)
+            recipe.recipe_ingredients.append(
+                RecipeIngredient(ingredient=ingredient, quantity=item["quantity"])
+            )
+    data = {
+        "name": recipe.name,
+        "steps": recipe.steps,
+        "ingredients": [
+            {"name": link.ingredient.name, "quantity": link.quantity, "unit": link.ingredient.unit}
+            for link in recipe.recipe_ingredients
+        ],
+    }
+    return {"status": "success", "data": data}
+
+def _clean_operations(operations) -> list[dict]:
+    cleaned = []
+    for op in operations:
+        op = dict(op) if isinstance(op, dict) else op.model_dump()
+        for key in ("new_name", "name", "old", "new"):
+            if key in op:
+                op[key] = normalize_universal_input(op[key])
+        if isinstance(op.get("steps"), str):
+            op["steps"] = op["steps"].strip()
+        if op.get("unit"):
+            op["unit"] = normalize_universal_input({"unit": op["unit"]})["unit"]
+        cleaned.append(op)
+    return cleaned
+
+def _taken_names(session: Session, plans: dict) -> set[str]:
+    renamed = {plan["name"] for original, plan in plans.items() if plan["name"] != original}
+    if not renamed:
+        return set()
+    # Names still held by another recipe, even one renamed in this batch:
+    # swaps would collide mid-flush on the unique constraint.
+    return set(session.scalars(select(Recipe.name).where(Recipe.name.in_(renamed))))
+
+@profiled
+def patch_recipes(
+    patches: list[dict],
+    atomic: bool = False,
+    session: Session | None = None,
+    fix_typos: bool = False
+) -> dict:
+    """
+    Apply ordered operations to many recipes in one transaction.
+
+    Every recipe and every ingredient named in the patches is loaded up front
+    (two queries plus eager loading), each patch is replayed on a plain copy
+    first, and only patches that fully apply touch the ORM objects, so a
+    failing patch leaves its recipe untouched. Everything is flushed once.
+
+    Supported operations (`op`): rename, set_steps, add_ingredient,
+    remove_ingredient, replace_ingredient, set_quantity.
+
+    Args:
+        patches (list[dict]): Each with `name` and `operations`.
+        atomic (bool): Apply nothing if any patch fails.
+        session (Session, optional): Request-scoped session; a private one is used if omitted.
+        fix_typos (bool): Rewrite added ingredient names within a typo of an existing one to it.
+
+    Returns:
+        dict: `status`, `applied` count and one `results` entry per patch, in order.
+
+    Example:
+        ```python
+        patch_recipes([
+            {"name": "Pancakes", "operations": [{"op": "set_quantity", "name": "Flour", "quantity": 250}]},
+            {"name": "Omelette", "operations": [{"op": "remove_ingredient", "name": "Milk"}]},
+        ])
+        ```
+    """
+    patches = [p if isinstance(p, dict) else p.model_dump() for p in patches]
+    work = [(normalize_universal_input(p["name"]), _clean_operations(p["operations"])) for p in patches]
+
+    with db_manager.session_scope(session) as session:
+        recipes, ingredients = _load_patch_targets(
+            session, {name for name, _ in work}, [op for _, ops in work for op in ops]
+        )
+
+        results, plans, notes = [], {}, {}
+        for name, operations in work:
+            if name not in recipes:
+                results.append({"name": name, "status": "error", "message": f"'{name}' not found."})
+            elif name in plans:
+                results.append({"name": name, "status": "error", "message": f"'{name}' appears twice in the batch."})
+            else:
+                notes[name] = _resolve_added_names(session, operations, ingredients, fix_typos)
+                plan, error = _plan_patch(recipes[name], operations)
+                results.append({"name": name, **(error or {"status": "pending"})})
+                if plan:
+                    plans[name] = plan
+
+        taken, claimed = _taken_names(session, plans), set()
+        for result in results:
+            plan = plans.get(result["name"]) if result["status"] == "pending" else None
+            if plan and plan["name"] != result["name"] and (plan["name"] in taken or plan["name"] in claimed):
+                result.update(status="error", message=f"Recipe '{plan['name']}' already exists.")
+            elif plan:
+                claimed.add(plan["name"])
+
+        failed = any(r["status"] == "error" for r in results)
+        patched = [recipes[r["name"]].id for r in results if r["status"] == "pending" and not (failed and atomic)]
+        before = _recipe_pairings(session, patched)
+        for result in results:
+            if result["status"] != "pending":
+                continue
+            if failed and atomic:
+                result.update(status="skipped", message="Batch not applied: another patch failed.")
+            else:
+                name = result["name"]
+                result.update(_apply_plan(session, recipes[name], plans[name], ingredients))
+                resolved, suggestions = notes[name]
+                if resolved:
+                    result["resolved"] = resolved
+                if suggestions:
+                    result["suggestions"] = suggestions
+        session.flush()
+        _move_pairings(session, before, _recipe_pairings(session, patched))
+
+    applied = sum(r["status"] == "success" for r in results)
+    return {"status": "error" if failed else "success", "applied": applied, "results": results}
+
+@profiled
+def patch_recipe(name: str, operations: list[dict], session: Session | None = None, fix_typos: bool = False) -> dict:
+    """
+    Apply ordered operations to one recipe, all or none, with a single flush.
+
+    Returns:
+        dict: The updated recipe under `data`, or the first failing operation.
+
+    Example:
+        ```python
+        patch_recipe("Pancakes", [
+            {"op": "replace_ingredient", "old": "Milk", "new": "Oat Milk"},
+            {"op": "set_quantity", "name": "Flour", "quantity": 250},
+        ])
+        # -> {"status": "success", "data": {"name": "Pancakes", "steps": "...", "ingredients": [...]}}
+        ```
+    """
+    outcome = patch_recipes([{"name": name, "operations": operations}], session=session, fix_typos=fix_typos)
+    result = outcome["results"][0]
+    result.pop("name", None)
+    return result
@@ -12,25 +12,45 @@ Author: Rafael Kaher
 """
 
 
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Query
 from typing import List
 from app.core.modules.recipes.recipes_manager import (
     add_recipe,
     list_recipes,
     get_recipe_by_name,
+    find_recipes_by_ingredients,
+    search_recipes,
     remove_recipe,
+    remove_recipes,
     remove_ingredient_from_recipe,
     update_recipe_name,
     update_recipe_ingredient_name,
-    update_recipe_quantity
+    update_recipe_quantity,
+    patch_recipe,
+    patch_recipes
 )
+from app.core.pantry_matcher import match_pantry
 from app.core.decorators import normalize_input
-from app.core.schemas import RecipeSchema, IngredientSchema
+from app.core.dependencies import MainSession
+from app.core.schemas import (
+    RecipeSchema,
+    IngredientSchema,
+    PantrySchema,
+    RecipePatchSchema,
+    RecipeBatchPatchSchema,
+    RecipeBulkDeleteSchema
+)
+from app.core.responses import FastJSONResponse, FastJSONRoute
 
-router = APIRouter(prefix="/recipes", tags=["recipes"])
+router = APIRouter(
+    prefix="/recipes",
+    tags=["recipes"],
+    route_class=FastJSONRoute,
+    default_response_class=FastJSONResponse
+)
 
 @router.get("/")
-def list_all_recipes_endpoint():
+def list_all_recipes_endpoint(session: MainSession):
     """
     Retrieve all recipes stored in the database.
 
@@ -49,11 +69,11 @@ def list_all_recipes_endpoint():
     #   ]
     # }
     """
-    return list_recipes()
+    return list_recipes(session)
 
 @router.post("/", status_code=201)
 @normalize_input
-def add_recipe_endpoint(update_data: RecipeSchema):
+def add_recipe_endpoint(update_data: RecipeSchema, session: MainSession, fix_typos: bool = Query(False, description="Rewrite ingredient names within a typo of an existing one to it.")):
     """
     Create a new recipe record in the database.
     Input data is automatically cleaned and normalized before storage.
@@ -82,11 +102,83 @@ def add_recipe_endpoint(update_data: RecipeSchema):
         ]
     })
     """
-    return add_recipe(update_data)
+    return add_recipe(update_data, session, fix_typos)
+
+def _split_csv(values: List[str]) -> List[str]:
+    return [part for value in values for part in value.split(",")]
+
+@router.get("/by-ingredients")
+def recipes_by_ingredients_endpoint(
+    session: MainSession,
+    include: List[str] = Query(..., description="Ingredient names; repeat the parameter or separate with commas."),
+    exclude: List[str] = Query(default=[]),
+    match: str = Query("all", pattern="^(all|any)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Find recipes by the ingredients they use, best coverage first.
+
+    Example:
+        ```python
+        # GET /recipes/by-ingredients?include=flour,eggs&exclude=milk&match=all
+        # Returns:
+        # {
+        #   "status": "success",
+        #   "data": [{"name": "Pasta", "matched": 2, "coverage": 1.0, "ingredient_count": 3}],
+        #   "total": 1, "page": 1, "page_size": 20
+        # }
+        ```
+    """
+    return find_recipes_by_ingredients(
+        _split_csv(include), _split_csv(exclude), match, page, page_size, session
+    )
+
+@router.get("/search")
+def search_recipes_endpoint(
+    session: MainSession,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in recipe names and steps."),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Full-text search over recipe names and steps, best match first.
+
+    Example:
+        ```python
+        # GET /recipes/search?q=golden%20pan
+        # Returns:
+        # {
+        #   "status": "success",
+        #   "data": [{"name": "Pancakes", "snippet": "Mix and fry until <mark>golden</mark>.", "score": 3.21}],
+        #   "total": 1, "page": 1, "page_size": 20
+        # }
+        ```
+    """
+    return search_recipes(q, page, page_size, session)
+
+@router.post("/pantry")
+def pantry_endpoint(query: PantrySchema, session: MainSession):
+    """
+    Rank recipes by what can be cooked with the given pantry: fewest missing
+    ingredients first, then most ingredients used.
+
+    Example:
+        ```python
+        # POST /recipes/pantry {"ingredients": ["Flour", "Egg", "Milk"], "max_missing": 1}
+        # Returns:
+        # {
+        #   "status": "success",
+        #   "data": [{"name": "Pancakes", "present": 3, "missing": 0, "required": 3, "missing_ingredients": []}],
+        #   "unknown": []
+        # }
+        ```
+    """
+    return match_pantry(query.ingredients, query.max_missing, query.limit, session)
 
 @router.get("/{name}")
 @normalize_input
-def get_recipe_endpoint(name: str):
+def get_recipe_endpoint(name: str, session: MainSession):
     """
     Retrieve a specific recipe and its ingredient details by name.
 
@@ -102,11 +194,47 @@ def get_recipe_endpoint(name: str):
         get_recipe_endpoint("Pancakes")
         ```
     """
-    return get_recipe_by_name(name)
+    return get_recipe_by_name(name, session)
+
+@router.patch("/")
+def patch_recipes_endpoint(batch: RecipeBatchPatchSchema, session: MainSession, fix_typos: bool = Query(False, description="Rewrite ingredient names within a typo of an existing one to it.")):
+    """
+    Apply ordered operations to many recipes in one transaction, with a result per recipe.
+    Each recipe's patch applies fully or not at all; `atomic` extends that to the batch.
+
+    Example:
+        ```python
+        # PATCH /recipes/
+        # {"patches": [{"name": "Pancakes", "operations": [{"op": "set_quantity", "name": "Flour", "quantity": 250}]}]}
+        # Returns: {"status": "success", "applied": 1, "results": [{"name": "Pancakes", "status": "success", "data": {...}}]}
+        ```
+    """
+    return patch_recipes(batch.patches, batch.atomic, session, fix_typos)
+
+@router.patch("/{name}")
+def patch_recipe_endpoint(name: str, patch: RecipePatchSchema, session: MainSession, fix_typos: bool = Query(False, description="Rewrite ingredient names within a typo of an existing one to it.")):
+    """
+    Apply ordered operations to one recipe and commit once; if any operation
+    fails, none is applied.
+
+    Operations: rename, set_steps, add_ingredient, remove_ingredient,
+    replace_ingredient, set_quantity.
+
+    Example:
+        ```python
+        # PATCH /recipes/Pancakes
+        # {"operations": [
+        #     {"op": "replace_ingredient", "old": "Milk", "new": "Oat Milk"},
+        #     {"op": "set_quantity", "name": "Flour", "quantity": 250}
+        # ]}
+        # Returns: {"status": "success", "data": {"name": "Pancakes", "steps": "...", "ingredients": [...]}}
+        ```
+    """
+    return patch_recipe(name, patch.operations, session, fix_typos)
 
 @router.delete("/", status_code=200)
 @normalize_input
-def delete_recipe_endpoint(recipe_data: dict = Body(...)):
+def delete_recipe_endpoint(session: MainSession, recipe_data: dict = Body(...)):
     """
     Delete a recipe record from the database by name.
 
@@ -122,11 +250,26 @@ def delete_recipe_endpoint(recipe_data: dict = Body(...)):
         delete_recipe_endpoint({"name": "Pancakes"})
         ```
     """
-    return remove_recipe(recipe_data)
+    return remove_recipe(recipe_data, session)
+
+@router.delete("/batch", status_code=200)
+def delete_recipes_endpoint(query: RecipeBulkDeleteSchema, session: MainSession):
+    """
+    Delete many recipes at once, by name or by pattern, with set-based statements.
+    Their ingredient and spice links go with them.
+
+    Example:
+        ```python
+        # DELETE /recipes/batch
+        # {"name_pattern": "Christmas *"}
+        # Returns: {"status": "success", "deleted": 120, "not_found": []}
+        ```
+    """
+    return remove_recipes(query.names, query.name_pattern, query.dry_run, session)
 
 @router.delete("/ingredient", status_code=200)
 @normalize_input
-def delete_ingredient_from_recipe_endpoint(recipe_data: dict = Body(...)):
+def delete_ingredient_from_recipe_endpoint(session: MainSession, recipe_data: dict = Body(...)):
     """
     Remove a specific ingredient from a given recipe.
 
@@ -147,11 +290,11 @@ def delete_ingredient_from_recipe_endpoint(recipe_data: dict = Body(...)):
         })
         ```
     """
-    return remove_ingredient_from_recipe(recipe_data)
+    return remove_ingredient_from_recipe(recipe_data, session)
 
 @router.put("/name", status_code=200)
 @normalize_input
-def update_recipe_name_endpoint(recipe_data: dict = Body(...)):
+def update_recipe_name_endpoint(session: MainSession, recipe_data: dict = Body(...)):
     """
     Update the name of an existing recipe.
 
@@ -171,11 +314,11 @@ def update_recipe_name_endpoint(recipe_data: dict = Body(...)):
         })
         ```
     """
-    return update_recipe_name(recipe_data)
+    return update_recipe_name(recipe_data, session)
 
 @router.put("/ingredient", status_code=200)
 @normalize_input
-def update_recipe_ingredient_endpoint(recipe_data: dict = Body(...)):
+def update_recipe_ingredient_endpoint(session: MainSession, recipe_data: dict = Body(...)):
     """
     Replace one ingredient in a recipe with another.
 
@@ -197,11 +340,11 @@ def update_recipe_ingredient_endpoint(recipe_data: dict = Body(...)):
         })
         ```
     """
-    return update_recipe_ingredient(recipe_data)
+    return update_recipe_ingredient_name(recipe_data, session)
 
 @router.put("/quantity", status_code=200)
 @normalize_input
-def update_recipe_quantity_endpoint(recipe_data: dict = Body(...)):
+def update_recipe_quantity_endpoint(session: MainSession, recipe_data: dict = Body(...)):
     """
     Update the quantity of an ingredient in a recipe.
 
@@ -223,4 +366,4 @@ def update_recipe_quantity_endpoint(recipe_data: dict = Body(...)):
         })
         ```
     """
-    return update_recipe_quantity(recipe_data)
+    return update_recipe_quantity(recipe_data, session)
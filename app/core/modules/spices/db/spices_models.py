@@ -7,30 +7,46 @@ Ensures both databases communicate correctly in tests and production.
 
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from app.core.db_manager import Base
-import os
+from sqlalchemy import create_engine, func, Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import declarative_base, relationship
+from app.core.db_manager import Base, LazySessionmaker, database_url, session_scope
+import threading
 
 
-if "PYTEST_CURRENT_TEST" in os.environ:
-    """
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the spices engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(
+                database_url("spices.db"),
+                connect_args={"check_same_thread": False}
+            )
+    return _engine
+
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+SessionLocal = LazySessionmaker(get_engine)
 
-    This condition check if its running test mode to set up a shared memory cache
-    or use the local database for spices.
+def init_db():
+    """Create any missing tables in the spices database and apply pending migrations."""
+    from app.core.migrations import migrate
+    Base.metadata.create_all(bind=get_engine())
+    migrate(get_engine())
 
+def get_session():
     """
-    engine = create_engine(
-        "sqlite:///file::memory:?cache=shared",
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        "sqlite:///spices.db",
-        connect_args={"check_same_thread": False}
-    )
-
-SessionLocal = sessionmaker(bind=engine)
+    FastAPI dependency providing one spices-DB session per request,
+    committed once after the endpoint returns.
+    """
+    with session_scope(factory=SessionLocal) as session:
+        yield session
 
 class Spice(Base):
 
@@ -45,6 +61,7 @@ class Spice(Base):
         - recommended_quantity: e.g. "1 tsp per 500g meat"
         - pairs_with_ingredients: comma-separated list (stored as text)
         - pairs_with_recipes: comma-separated list (optional)
+        - content_hash: hash of the payload it was last imported from, if any
         
     """
 
@@ -56,5 +73,29 @@ class Spice(Base):
     recommended_quantity = Column(String)
     pairs_with_ingredients = Column(String)
     pairs_with_recipes = Column(String)
+    content_hash = Column(String, index=True)
     
     recipe_links = relationship("RecipeSpice", back_populates="spice")
+
+class SpicePairing(Base):
+
+    """
+
+    Learned co-occurrence between a spice and an ingredient.
+    Rows are upserted in one statement per recipe by the auto-learning step.
+
+    Args:
+    spice_id: Identification number of the spice
+    ingredient: Normalized ingredient name (ingredients live in the main DB)
+    co_occurrences: How many recipes used the spice together with the ingredient
+
+    """
+
+    __tablename__ = "spice_ingredient_pairs"
+
+    spice_id = Column(Integer, ForeignKey("spices.id"), primary_key=True)
+    ingredient = Column(String, primary_key=True)
+    co_occurrences = Column(Integer, nullable=False, default=0)
+
+Index("ix_spices_name_lower", func.lower(Spice.name))
+Index("ix_spice_pairs_ingredient", func.lower(SpicePairing.ingredient), SpicePairing.spice_id)
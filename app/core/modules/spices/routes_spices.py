@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.core.decorators import normalize_input
+from app.core.dependencies import MainSession, SpiceSession
 from app.core.modules.spices.spices_manager import (
     add_spice,
     update_spice,
@@ -7,11 +8,18 @@ from app.core.modules.spices.spices_manager import (
     link_spice_to_recipe,
     unlink_spice_from_recipe,
     suggest_spices_for_recipe,
+    relearn_catalog,
 )
 from app.core.schemas import SpiceSchema, LinkSpiceSchema
+from app.core.responses import FastJSONResponse, FastJSONRoute
 from app.core.modules.spices.utils.spice_bridge import get_recipe_from_main
 
-router = APIRouter(prefix="/spices", tags=["Spices"])
+router = APIRouter(
+    prefix="/spices",
+    tags=["Spices"],
+    route_class=FastJSONRoute,
+    default_response_class=FastJSONResponse
+)
 
 
 # ============================================================
@@ -19,17 +27,17 @@ router = APIRouter(prefix="/spices", tags=["Spices"])
 # ============================================================
 @router.post("/", status_code=201)
 @normalize_input
-def add_new_spice(data: SpiceSchema):
+def add_new_spice(data: SpiceSchema, spice_session: SpiceSession):
     """Create a new spice entry."""
-    return add_spice(data.model_dump())
+    return add_spice(data.model_dump(), spice_session)
 
 # ============================================================
 # 🔹 LIST
 # ============================================================
 @router.get("/", status_code=200)
-def list_all_spices():
+def list_all_spices(spice_session: SpiceSession):
     """Return a plain list of spices, not wrapped in {'data': ...}."""
-    return list_spices()
+    return list_spices(spice_session)
 
 
 # ============================================================
@@ -37,9 +45,9 @@ def list_all_spices():
 # ============================================================
 @router.put("/", status_code=200)
 @normalize_input
-def update_spice_endpoint(data: SpiceSchema):
+def update_spice_endpoint(data: SpiceSchema, spice_session: SpiceSession):
     """Update spice attributes."""
-    return update_spice(data.model_dump())
+    return update_spice(data.model_dump(), spice_session)
 
 
 # ============================================================
@@ -47,13 +55,13 @@ def update_spice_endpoint(data: SpiceSchema):
 # ============================================================
 @router.post("/link", status_code=201)
 @normalize_input
-def link_spice(data: LinkSpiceSchema):
+def link_spice(data: LinkSpiceSchema, main_session: MainSession, spice_session: SpiceSession):
     """Link an existing spice to a recipe (bridging recipe from main DB)."""
-    recipe = get_recipe_from_main(data.recipe_name)
+    recipe = get_recipe_from_main(data.recipe_name, main_session)
     if not recipe:
         return {"status": "error", "message": f"Recipe '{data.recipe_name}' not found in main DB."}
 
-    return link_spice_to_recipe(data.recipe_name, data.spice_name)
+    return link_spice_to_recipe(data.recipe_name, data.spice_name, main_session, spice_session)
 
 
 # ============================================================
@@ -61,31 +69,38 @@ def link_spice(data: LinkSpiceSchema):
 # ============================================================
 @router.post("/unlink", status_code=200)
 @normalize_input
-def unlink_spice(data: LinkSpiceSchema):
+def unlink_spice(data: LinkSpiceSchema, main_session: MainSession, spice_session: SpiceSession):
     """Unlink a spice from a recipe."""
-    return unlink_spice_from_recipe(data.recipe_name, data.spice_name)
+    return unlink_spice_from_recipe(data.recipe_name, data.spice_name, main_session, spice_session)
+
+
+# ============================================================
+# 🔹 LEARN
+# ============================================================
+@router.post("/learn", status_code=200)
+def relearn_spice_pairings():
+    """Re-learn every spice-ingredient pairing from the whole catalog in one pass."""
+    return relearn_catalog()
 
 
 # ============================================================
 # 🔹 SUGGEST
 # ============================================================
 @router.get("/suggest/{recipe_name}", status_code=200)
-def suggest_spices(recipe_name: str):
+def suggest_spices(recipe_name: str, main_session: MainSession, spice_session: SpiceSession):
     """
     Suggest spices based on recipe in main DB.
     Returns a plain list (tests expect a list).
     """
-    recipe = get_recipe_from_main(recipe_name)
+    recipe = get_recipe_from_main(recipe_name, main_session)
     if not recipe:
         return {"status": "error", "message": f"Recipe '{recipe_name}' not found."}
 
-    suggestions = suggest_spices_for_recipe(recipe_name)
+    suggestions = suggest_spices_for_recipe(recipe_name, main_session, spice_session)
 
     if isinstance(suggestions, dict):
         for key in ("suggestions", "data"):
             if key in suggestions:
                 return suggestions[key]
 
-        return suggest_spices_for_recipe(recipe_name)
-
-    return suggest_spices_for_recipe(recipe_name)
\ No newline at end of file
+    return suggestions
\ No newline at end of file
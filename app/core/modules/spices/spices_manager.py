@@ -5,23 +5,38 @@ Handles CRUD and suggestion logic for spices.
 Integrates with the database via the Spice and RecipeSpice models.
 """
 
-from app.core.db_manager import Recipe, RecipeSpice
-from app.core.modules.spices.db.spices_models import SessionLocal, Spice
+from typing import get_args
+from app.core import catalog_events, db_manager, memory_catalog
+from app.core.db_manager import Recipe, RecipeSpice, Ingredient, RecipeIngredient
+from app.core.modules.spices.db.spices_models import SessionLocal, Spice, SpicePairing
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 from app.core.data_cleaner import normalize_string
-from collections import Counter
+from collections import Counter, defaultdict
+from app.core.job_queue import JobQueue
+from app.core.memory_catalog import SPICE_FIELDS
 from app.core.modules.spices.utils.spice_bridge import link_spice_to_recipe as bridge_link_spice_to_recipe
 from app.core.modules.spices.utils.spice_bridge import unlink_spice_from_recipe as bridge_unlink_spice_from_recipe
 from app.core.modules.spices.utils.spice_bridge import suggest_spices_for_recipe as bridge_suggest_spices_for_recipe
+from app.core.profiling import profiled
+from app.core.schemas import UpsertMode
 
-def suggest_spices_for_recipe(recipe_name: str):
+@profiled
+def suggest_spices_for_recipe(
+    recipe_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
     """
     Suggest spices that pair well with a recipe.
     Delegates to the cross-database bridge.
     """
-    result = bridge_suggest_spices_for_recipe(recipe_name)
+    result = bridge_suggest_spices_for_recipe(recipe_name, main_session, spice_session)
     return result
 
-def add_spice(spice_data: dict):
+@profiled
+def add_spice(spice_data: dict, session: Session | None = None):
     """
         Add a spice with extended attributes:
         - flavor_profile: short text describing its taste
@@ -29,123 +44,429 @@ def add_spice(spice_data: dict):
         - pairs_with_ingredients: comma-separated list (stored as text)
         - pairs_with_recipes: comma-separated list (optional)
     """
-    session = SessionLocal()
-
     if not isinstance(spice_data, dict):
         spice_data = spice_data.model_dump()
 
     name = normalize_string(spice_data.get("name"))
 
-    existing = session.query(Spice).filter_by(name=name).one_or_none()
-    if existing:
-        session.close()
-        return {"status": "error", "message": f"Spice '{name}' already exists."}
-
-    flavor_profile = spice_data.get("flavor_profile", "")
-    recommended_quantity = spice_data.get("recommended_quantity", "")
-    pairs_with_ingredients = ",".join(spice_data.get("pairs_with_ingredients", []))
-    pairs_with_recipes = ",".join(spice_data.get("pairs_with_recipes", []))
-
-    spice = Spice(
-        name=name,
-        flavor_profile=flavor_profile,
-        recommended_quantity=recommended_quantity,
-        pairs_with_ingredients=pairs_with_ingredients,
-        pairs_with_recipes=pairs_with_recipes
-    )
-    session.add(spice)
-    session.commit()
-    session.close()
+    with db_manager.session_scope(session, factory=SessionLocal) as session:
+        existing = session.query(Spice).filter_by(name=name).one_or_none()
+        if existing:
+            return {"status": "error", "message": f"Spice '{name}' already exists."}
+
+        flavor_profile = spice_data.get("flavor_profile", "")
+        recommended_quantity = spice_data.get("recommended_quantity", "")
+        pairs_with_ingredients = ",".join(spice_data.get("pairs_with_ingredients", []))
+        pairs_with_recipes = ",".join(spice_data.get("pairs_with_recipes", []))
+
+        spice = Spice(
+            name=name,
+            flavor_profile=flavor_profile,
+            recommended_quantity=recommended_quantity,
+            pairs_with_ingredients=pairs_with_ingredients,
+            pairs_with_recipes=pairs_with_recipes
+        )
+        session.add(spice)
+        session.flush()
     return {"status": "success", "message": f"Spice '{name}' added with full context."}
 
 
-def list_spices():
-    """List all spices in the database."""
-    session = SessionLocal()
-    spices = session.query(Spice).all()
-    session.close()
+_UPSERT_CHUNK = 1000
 
-    result = []
-    for s in spices:
-        spice_dict = {k: v for k, v in vars(s).items() if not k.startswith("_")}
-        result.append(spice_dict)
-    return result
+def _merge_csv(old: str | None, new: str) -> str:
+    items = [v for v in (old or "").split(",") if v]
+    seen = {v.lower() for v in items}
+    for value in new.split(","):
+        if value and value.lower() not in seen:
+            items.append(value)
+            seen.add(value.lower())
+    return ",".join(items)
 
-def link_spice_to_recipe(recipe_name: str, spice_name: str):
+@profiled
+def upsert_spices(spices: list[dict], mode: UpsertMode = "skip", session: Session | None = None) -> dict:
+    """
+    Write many spices with one `INSERT ... ON CONFLICT` statement per chunk.
+
+    Modes for spices whose name already exists:
+        - skip: leave the stored spice untouched.
+        - replace: overwrite every attribute.
+        - merge: add new pairings to the stored ones and fill in the
+          flavor profile and quantity when given.
+
+    Returns:
+        dict: `applied` count and one result per spice, whose `action` is
+        "created", "skipped", "replaced" or "merged".
+
+    Example:
+        ```python
+        upsert_spices([{"name": "Cinnamon", "pairs_with_ingredients": ["Apple"]}], mode="merge")
+        ```
+    """
+    if mode not in get_args(UpsertMode):
+        return {"status": "error", "message": f"Unknown mode '{mode}'."}
+
+    results, rows = [], {}
+    for spice_data in spices:
+        if not isinstance(spice_data, dict):
+            spice_data = spice_data.model_dump()
+        name = normalize_string(spice_data.get("name"))
+        if not name:
+            results.append({"name": name, "status": "error", "message": "Spice name is required."})
+            continue
+        if name in rows:
+            results.append({"name": name, "status": "error", "message": f"Spice '{name}' appears twice in the batch."})
+            continue
+        rows[name] = {
+            "name": name,
+            "flavor_profile": spice_data.get("flavor_profile") or "",
+            "recommended_quantity": spice_data.get("recommended_quantity") or "",
+            "pairs_with_ingredients": ",".join(spice_data.get("pairs_with_ingredients") or []),
+            "pairs_with_recipes": ",".join(spice_data.get("pairs_with_recipes") or []),
+            "content_hash": spice_data.get("content_hash"),
+        }
+        results.append({"name": name, "status": "success"})
+
+    with db_manager.session_scope(session, factory=SessionLocal) as session:
+        names = list(rows)
+        existing = {}
+        for start in range(0, len(names), _UPSERT_CHUNK):
+            found = session.execute(
+                select(Spice.name, Spice.flavor_profile, Spice.recommended_quantity,
+                       Spice.pairs_with_ingredients, Spice.pairs_with_recipes)
+                .where(Spice.name.in_(names[start:start + _UPSERT_CHUNK]))
+            )
+            existing.update((row.name, row) for row in found)
+
+        if mode == "merge":
+            for name, stored in existing.items():
+                row = rows[name]
+                row["flavor_profile"] = row["flavor_profile"] or stored.flavor_profile or ""
+                row["recommended_quantity"] = row["recommended_quantity"] or stored.recommended_quantity or ""
+                for key in ("pairs_with_ingredients", "pairs_with_recipes"):
+                    row[key] = _merge_csv(getattr(stored, key), row[key])
+                row["content_hash"] = None
+
+        targets = [rows[n] for n in names if mode != "skip" or n not in existing]
+        written = {}
+        for start in range(0, len(targets), _UPSERT_CHUNK):
+            stmt = sqlite_insert(Spice).values(targets[start:start + _UPSERT_CHUNK])
+            if mode == "skip":
+                stmt = stmt.on_conflict_do_nothing(index_elements=[Spice.name])
+            else:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Spice.name],
+                    set_={key: stmt.excluded[key] for key in targets[0] if key != "name"}
+                )
+            written.update(session.execute(
+                stmt.returning(Spice.name, Spice.id)
+            ).all())
+        catalog_events.mark(session, spices=written.values())
+
+    action = {"replace": "replaced", "merge": "merged"}.get(mode)
+    for result in results:
+        if result["status"] == "success":
+            name = result["name"]
+            if name not in written:
+                result["action"] = "skipped"
+            else:
+                result["action"] = action if name in existing else "created"
+    applied = sum(1 for r in results if r.get("action") not in (None, "skipped"))
+    return {"status": "success", "applied": applied, "results": results}
+
+_SPICE_COLUMNS = (
+    Spice.id, Spice.name, Spice.flavor_profile, Spice.recommended_quantity,
+    Spice.pairs_with_ingredients, Spice.pairs_with_recipes,
+)
+
+@profiled
+def list_spices(session: Session | None = None):
+    """List all spices in the database, as plain dicts read straight from the columns."""
+    memory = memory_catalog.active(session)
+    if memory is not None:
+        return [{key: getattr(s, key) for key in SPICE_FIELDS} for s in memory.spices(session)]
+    with db_manager.session_scope(session, factory=SessionLocal) as session:
+        rows = session.execute(select(*_SPICE_COLUMNS).order_by(Spice.id)).all()
+    keys = [column.key for column in _SPICE_COLUMNS]
+    return [dict(zip(keys, row)) for row in rows]
+
+@profiled
+def link_spice_to_recipe(
+    recipe_name: str,
+    spice_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
     """
     Link an existing spice to a recipe and learn from it.
     Delegates to the cross-database bridge to ensure both
     recipe and spice are validated across their databases.
     """
-    result = bridge_link_spice_to_recipe(spice_name, recipe_name)
+    result = bridge_link_spice_to_recipe(spice_name, recipe_name, main_session, spice_session)
 
     if result.get("status") == "success":
         return {"status": "success", "message": result.get("message", "Linked successfully.")}
     return {"status": "error", "message": result.get("message", "Link failed.")}
 
-def unlink_spice_from_recipe(recipe_name: str, spice_name: str):
+@profiled
+def unlink_spice_from_recipe(
+    recipe_name: str,
+    spice_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
     """
     Unlink an existing spice from a recipe across databases.
     Delegates to the cross-database bridge.
     """
-    result = bridge_unlink_spice_from_recipe(spice_name=spice_name, recipe_name=recipe_name)
+    result = bridge_unlink_spice_from_recipe(
+        spice_name=spice_name,
+        recipe_name=recipe_name,
+        main_session=main_session,
+        spice_session=spice_session
+    )
 
     if result.get("status") == "success":
         return {"status": "success", "message": result.get("message", "Unlinked successfully.")}
     return {"status": "error", "message": result.get("message", "Unlink failed.")}
 
-def update_spice(spice_data: dict):
+@profiled
+def update_spice(spice_data: dict, session: Session | None = None):
     """
     Update an existing spice's details.
     You can update its flavor profile, recommended quantity,
     or add new compatible ingredients and recipes.
     """
-    session = SessionLocal()
-
     if not isinstance(spice_data, dict):
         spice_data = spice_data.model_dump()
 
     name = normalize_string(spice_data.get("name"))
-    spice = session.query(Spice).filter_by(name=name).one_or_none()
-    if not spice:
-        session.close()
-        return {"status": "error", "message": f"Spice '{name}' not found."}
 
-    if "flavor_profile" in spice_data:
-        spice.flavor_profile = spice_data["flavor_profile"]
-    if "recommended_quantity" in spice_data:
-        spice.recommended_quantity = spice_data["recommended_quantity"]
+    with db_manager.session_scope(session, factory=SessionLocal) as session:
+        spice = session.query(Spice).filter_by(name=name).one_or_none()
+        if not spice:
+            return {"status": "error", "message": f"Spice '{name}' not found."}
+
+        if "flavor_profile" in spice_data:
+            spice.flavor_profile = spice_data["flavor_profile"]
+        if "recommended_quantity" in spice_data:
+            spice.recommended_quantity = spice_data["recommended_quantity"]
 
-    if "pairs_with_ingredients" in spice_data:
-        new_ings = set(spice.pairs_with_ingredients.split(",")) | set(spice_data["pairs_with_ingredients"])
-        spice.pairs_with_ingredients = ",".join(filter(None, new_ings))
+        if "pairs_with_ingredients" in spice_data:
+            new_ings = set(spice.pairs_with_ingredients.split(",")) | set(spice_data["pairs_with_ingredients"])
+            spice.pairs_with_ingredients = ",".join(filter(None, new_ings))
 
-    if "pairs_with_recipes" in spice_data:
-        new_recs = set(spice.pairs_with_recipes.split(",")) | set(spice_data["pairs_with_recipes"])
-        spice.pairs_with_recipes = ",".join(filter(None, new_recs))
+        if "pairs_with_recipes" in spice_data:
+            new_recs = set(spice.pairs_with_recipes.split(",")) | set(spice_data["pairs_with_recipes"])
+            spice.pairs_with_recipes = ",".join(filter(None, new_recs))
 
-    session.commit()
-    session.close()
+        spice.content_hash = None
+        session.flush()
     return {"status": "success", "message": f"Spice '{name}' updated successfully."}
 
-def auto_learn_from_recipe(recipe_name: str):
+def auto_learn_from_recipe(recipe_name: str, spice_names: list[str] | None = None):
     """
-    Learn new spice-ingredient associations automatically from the recipe content.
+    Learn spice-ingredient associations automatically from the recipe content.
     This is PanaceIA's 'rudimentary AI' mechanism.
+
+    Every (spice, ingredient) pair of the recipe is upserted into
+    `spice_ingredient_pairs` with a single statement, bumping its co-occurrence
+    count. When `spice_names` is omitted, the spices linked to the recipe are used.
+    """
+    return auto_learn_from_recipes([(recipe_name, spice_names)])
+
+def auto_learn_from_recipes(jobs: list[tuple[str, list[str] | None]], main_session: Session | None = None):
     """
+    Batch form of `auto_learn_from_recipe`.
+
+    Args:
+        jobs (list[tuple]): (recipe_name, spice_names) pairs; spice_names may be None
+            to use the spices linked to the recipe.
+        main_session (Session, optional): Session to read the recipes with, so
+            links it has not committed yet count; a private one is used if omitted.
+
+    Returns:
+        dict: {"status": "success", "learned": <pairs upserted>} or an error message.
+    """
+    names = {normalize_string(recipe_name) for recipe_name, _ in jobs}
+
+    with db_manager.session_scope(main_session) as main_session:
+        ingredients = defaultdict(set)
+        for recipe, ingredient in (
+            main_session.query(Recipe.name, Ingredient.name)
+            .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .filter(Recipe.name.in_(names))
+        ):
+            ingredients[recipe].add(ingredient)
+
+        linked = defaultdict(set)
+        for recipe, spice_id in (
+            main_session.query(Recipe.name, RecipeSpice.spice_id)
+            .join(RecipeSpice, RecipeSpice.recipe_id == Recipe.id)
+            .filter(Recipe.name.in_({normalize_string(r) for r, spices in jobs if spices is None}))
+        ):
+            linked[recipe].add(spice_id)
+
     session = SessionLocal()
-    clean_name = normalize_string(recipe_name)
-    recipe = session.query(Recipe).filter_by(name=clean_name).one_or_none()
-    if not recipe:
+    try:
+        wanted = {
+            n.strip().lower()
+            for _, spices in jobs if spices
+            for n in spices if isinstance(n, str) and n.strip()
+        }
+        spice_ids = dict(
+            session.query(func.lower(Spice.name), Spice.id)
+            .filter(func.lower(Spice.name).in_(wanted))
+        ) if wanted else {}
+
+        counts = Counter()
+        for recipe_name, spices in jobs:
+            name = normalize_string(recipe_name)
+            if spices is None:
+                recipe_spices = linked[name]
+            else:
+                recipe_spices = {
+                    spice_ids[n.strip().lower()] for n in spices
+                    if isinstance(n, str) and n.strip().lower() in spice_ids
+                }
+            for spice_id in recipe_spices:
+                for ingredient in ingredients[name]:
+                    counts[(spice_id, ingredient)] += 1
+
+        if counts:
+            stmt = sqlite_insert(SpicePairing)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SpicePairing.spice_id, SpicePairing.ingredient],
+                set_={"co_occurrences": SpicePairing.co_occurrences + stmt.excluded.co_occurrences}
+            )
+            session.execute(stmt, [
+                {"spice_id": spice_id, "ingredient": ingredient, "co_occurrences": total}
+                for (spice_id, ingredient), total in counts.items()
+            ])
+            session.commit()
+        return {"status": "success", "learned": len(counts)}
+    except Exception as e:
+        session.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
         session.close()
-        return
 
-    recipe_ingredients = [ri.ingredient.name for ri in recipe.recipe_ingredients]
-    spices_linked = [link.spice for link in recipe.spice_links]
+def process_learning_batch(jobs: list[tuple[str, list[str]]]):
+    """
+    Worker handler for `learning_queue`: link every queued spice to its recipe,
+    then learn from the whole batch with a single upsert.
+
+    Only spices newly linked to their recipe are learned from, so re-importing
+    a recipe never counts its pairings twice. The links are committed only
+    after the pairings, so a batch whose learning fails is retried from
+    scratch rather than finding its links already made. Links and pairings
+    live in different databases: a crash between the two commits can still
+    count a batch twice, which `relearn_catalog` repairs. Ingredient changes
+    of recipes whose spices were already linked go through `adjust_pairings`.
+    """
+    with db_manager.session_scope() as main_session, \
+            db_manager.session_scope(factory=SessionLocal) as spice_session:
+        fresh = []
+        for recipe_name, spices in jobs:
+            linked = [
+                spice for spice in spices
+                if bridge_link_spice_to_recipe(spice, recipe_name, main_session, spice_session).get("created")
+            ]
+            if linked:
+                fresh.append((recipe_name, linked))
+
+        if fresh:
+            result = auto_learn_from_recipes(fresh, main_session)
+            if result.get("status") == "error":
+                raise RuntimeError(result["message"])
 
-    for spice in spices_linked:
-        existing_pairs = set(spice.pairs_with_ingredients.split(",")) if spice.pairs_with_ingredients else set()
-        new_pairs = set(recipe_ingredients)
-        spice.pairs_with_ingredients = ",".join(existing_pairs | new_pairs)
-    session.commit()
-    session.close()
\ No newline at end of file
+def adjust_pairings(changes: Counter):
+    """
+    Apply co-occurrence changes, keyed (spice_id, ingredient name), for recipes
+    whose ingredients changed or that were deleted while their spices stayed
+    linked. Pairings that drop to zero are removed, as `relearn_catalog` would
+    leave them out. Renaming an ingredient keeps its pairings under the old
+    name until `relearn_catalog` runs.
+
+    Returns:
+        dict: {"status": "success", "adjusted": <pairs changed>} or an error message.
+    """
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return {"status": "success", "adjusted": 0}
+
+    session = SessionLocal()
+    try:
+        known = {
+            spice_id for (spice_id,) in
+            session.query(Spice.id).filter(Spice.id.in_({spice_id for spice_id, _ in changes}))
+        }
+        rows = [
+            {"spice_id": spice_id, "ingredient": ingredient, "co_occurrences": delta}
+            for (spice_id, ingredient), delta in changes.items()
+            if spice_id in known
+        ]
+        if rows:
+            stmt = sqlite_insert(SpicePairing)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SpicePairing.spice_id, SpicePairing.ingredient],
+                set_={"co_occurrences": SpicePairing.co_occurrences + stmt.excluded.co_occurrences}
+            )
+            session.execute(stmt, rows)
+            session.execute(delete(SpicePairing).where(SpicePairing.co_occurrences <= 0))
+            session.commit()
+        return {"status": "success", "adjusted": len(rows)}
+    except Exception as e:
+        session.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        session.close()
+
+learning_queue = JobQueue(process_learning_batch, name="spice-learning")
+
+def enqueue_recipe_learning(recipe_name: str, spices: list[str]):
+    """
+    Schedule linking and learning for a freshly committed recipe.
+    Call `learning_queue.flush()` to wait for it.
+    """
+    if spices:
+        learning_queue.enqueue((recipe_name, list(spices)))
+
+@profiled
+def relearn_catalog():
+    """
+    Rebuild every learned spice-ingredient pairing from scratch in a single pass.
+
+    Co-occurrences are aggregated by one grouped query over the persisted
+    recipe-spice links, and the pairing table is replaced in one transaction.
+    """
+    main_session = db_manager.SessionLocal()
+    try:
+        counts = (
+            main_session.query(RecipeSpice.spice_id, Ingredient.name, func.count())
+            .join(RecipeIngredient, RecipeIngredient.recipe_id == RecipeSpice.recipe_id)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .group_by(RecipeSpice.spice_id, Ingredient.name)
+            .all()
+        )
+    finally:
+        main_session.close()
+
+    session = SessionLocal()
+    try:
+        known = {spice_id for (spice_id,) in session.query(Spice.id)}
+        pairs = [
+            {"spice_id": spice_id, "ingredient": ingredient, "co_occurrences": total}
+            for spice_id, ingredient, total in counts
+            if spice_id in known
+        ]
+        session.execute(delete(SpicePairing))
+        if pairs:
+            session.execute(insert(SpicePairing), pairs)
+        session.commit()
+        return {"status": "success", "pairs": len(pairs)}
+    except Exception as e:
+        session.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        session.close()
@@ -5,12 +5,19 @@ Bridge between the main recipes DB and the spices DB.
 Ensures both databases communicate correctly in tests and production.
 """
 
-from app.core import db_manager
+from app.core import catalog_image, db_manager, memory_catalog
 from app.core.modules.spices.db.spices_models import (
     Spice,
+    SpicePairing,
     SessionLocal as SpiceSessionLocal,
 )
-from sqlalchemy import func
+from sqlalchemy import func, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.logger import get_logger
+from app.core.fuzzy_index import spice_names
+
+logger = get_logger(__name__)
 
 # ------------------------------------------------------
 # 🧠 Sessions for both DBs
@@ -30,123 +37,173 @@ def get_spice_session():
 # 🔗 Bridge Logic
 # ------------------------------------------------------
 
-def get_recipe_from_main(recipe_name: str):
-    """Fetch a recipe from the main database by name."""
+def get_recipe_from_main(recipe_name: str, session: Session | None = None):
+    """
+    Fetch a recipe from the main database by name.
+    Without an injected session the recipe is returned detached.
+    """
     from app.core.db_manager import Recipe
-    session = get_main_session()
+    owns_session = session is None
     try:
-        recipe = session.query(Recipe).filter_by(name=recipe_name).first()
-        if not recipe:
-            print(f"❌ Recipe '{recipe_name}' not found in main DB.")
-            return None
-        print(f"✅ Found recipe '{recipe_name}' in main DB.")
-        return recipe
+        with db_manager.session_scope(session) as session:
+            recipe = session.query(Recipe).filter_by(name=recipe_name).first()
+            if not recipe:
+                logger.debug("❌ Recipe '%s' not found in main DB.", recipe_name)
+                return None
+            logger.debug("✅ Found recipe '%s' in main DB.", recipe_name)
+            if owns_session:
+                session.expunge(recipe)
+            return recipe
     except Exception as e:
-        print(f"⚠️ Error fetching recipe '{recipe_name}': {e}")
+        logger.warning("⚠️ Error fetching recipe '%s': %s", recipe_name, e)
         return None
-    finally:
-        session.close()
-
-def link_spice_to_recipe(spice_name: str, recipe_name: str):
-    """Validate both spice and recipe exist across their DBs."""
-    print(f"🔗 Linking spice '{spice_name}' → recipe '{recipe_name}'")
-
-    recipe = get_recipe_from_main(recipe_name)
-    if not recipe:
-        print(f"❌ Recipe '{recipe_name}' not found in main DB.")
-        return {"status": "error", "message": f"Recipe '{recipe_name}' not found."}
-
-    spice_session = get_spice_session()
-    spices = spice_session.query(Spice).all()
-
-    print("\n🧂 [DEBUG] SPICES SNAPSHOT:")
-    for s in spices:
-        print(f"   -> id={s.id}, name={s.name!r}, type={type(s.name)}, flavor_profile={s.flavor_profile!r}")
-
-    spice = next((s for s in spices if s.name.strip().lower() == spice_name.strip().lower()), None)
-
-    if not spice:
-        print(f"❌ Spice '{spice_name}' not found in spice DB.")
-        spice_session.close()
-        return {"status": "error", "message": f"Spice '{spice_name}' not found."}
-
-    spice_session.close()
-    print(f"✅ Linked spice '{spice.name}' → recipe '{recipe.name}' successfully.")
-    return {
-        "status": "success",
-        "message": f"Linked spice '{spice.name}' → recipe '{recipe.name}'."
-    }
-
-def unlink_spice_from_recipe(spice_name: str, recipe_name: str):
-    """Simulate unlinking a spice from a recipe."""
-    print(f"🔗 Unlinking spice '{spice_name}' ← recipe '{recipe_name}'")
-
-    recipe = get_recipe_from_main(recipe_name)
-    if not recipe:
-        print(f"❌ Recipe '{recipe_name}' not found in main DB.")
-        return {"status": "error", "message": f"Recipe '{recipe_name}' not found."}
-
-    spice_session = get_spice_session()
-    spices = spice_session.query(Spice).all()
-
-    spice = next((s for s in spices if s.name.strip().lower() == spice_name.strip().lower()), None)
-    if not spice:
-        print(f"❌ Spice '{spice_name}' not found in spice DB.")
-        spice_session.close()
-        return {"status": "error", "message": f"Spice '{spice_name}' not found."}
-
-    print(f"✅ Unlinked spice '{spice.name}' ← recipe '{recipe.name}' successfully.")
-    spice_session.close()
-    return {
-        "status": "success",
-        "message": f"Unlinked spice '{spice.name}' ← recipe '{recipe.name}' successfully."
-    }
-
-
-def suggest_spices_for_recipe(recipe_name: str):
-    """Suggest spices that pair well with a given recipe."""
-    print(f"🧠 Suggesting spices for recipe '{recipe_name}'")
-
-    recipe = get_recipe_from_main(recipe_name)
-    if not recipe:
-        print(f"❌ Recipe '{recipe_name}' not found in main DB.")
-        return []
-
-    spice_session = get_spice_session()
-    spices = spice_session.query(Spice).all()
-
-    print("🧂 [DEBUG] Checking spices for matching pairs...")
-    suggestions = []
-
-    for s in spices:
-        
-        pairs_with_recipes = []
-        pairs_with_ingredients = []
-
-        if isinstance(s.pairs_with_recipes, str):
-            pairs_with_recipes = [r.strip().lower() for r in s.pairs_with_recipes.split(",") if r.strip()]
-        elif isinstance(s.pairs_with_recipes, list):
-            pairs_with_recipes = [r.strip().lower() for r in s.pairs_with_recipes]
-
-        if isinstance(s.pairs_with_ingredients, str):
-            pairs_with_ingredients = [i.strip().lower() for i in s.pairs_with_ingredients.split(",") if i.strip()]
-        elif isinstance(s.pairs_with_ingredients, list):
-            pairs_with_ingredients = [i.strip().lower() for i in s.pairs_with_ingredients]
-        recipe_match = recipe_name.lower() in pairs_with_recipes
-        ingredient_match = any(
-            ing.name.lower() in pairs_with_ingredients
-            for ing in getattr(recipe, "ingredients", [])
+
+def find_spice(spice_name: str, spice_session: Session):
+    """
+    Resolve `spice_name` to a stored spice, ignoring case, surrounding spaces
+    and small typos (see `fuzzy_index`).
+    """
+    canonical = spice_names.resolve(spice_name.strip(), spice_session)
+    if canonical is None:
+        return None
+    if canonical.lower() != spice_name.strip().lower():
+        logger.debug("🔎 Resolved spice '%s' → '%s'", spice_name, canonical)
+    return spice_session.query(Spice).filter_by(name=canonical).first()
+
+def link_spice_to_recipe(
+    spice_name: str,
+    recipe_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
+    """Validate both spice and recipe exist across their DBs and record the link."""
+    logger.debug("🔗 Linking spice '%s' → recipe '%s'", spice_name, recipe_name)
+
+    with db_manager.session_scope(main_session) as main_session:
+        recipe = get_recipe_from_main(recipe_name, main_session)
+        if not recipe:
+            logger.debug("❌ Recipe '%s' not found in main DB.", recipe_name)
+            return {"status": "error", "message": f"Recipe '{recipe_name}' not found."}
+
+        with db_manager.session_scope(spice_session, factory=SpiceSessionLocal) as spice_session:
+            spice = find_spice(spice_name, spice_session)
+            if not spice:
+                logger.debug("❌ Spice '%s' not found in spice DB.", spice_name)
+                return {"status": "error", "message": f"Spice '{spice_name}' not found."}
+            spice_id, spice_label = spice.id, spice.name
+
+        inserted = main_session.execute(
+            sqlite_insert(db_manager.RecipeSpice)
+            .values(recipe_id=recipe.id, spice_id=spice_id)
+            .on_conflict_do_nothing()
+        ).rowcount
+
+        logger.debug("✅ Linked spice '%s' → recipe '%s' successfully.", spice_label, recipe.name)
+        return {
+            "status": "success",
+            "message": f"Linked spice '{spice_label}' → recipe '{recipe.name}'.",
+            "created": inserted == 1
+        }
+
+def unlink_spice_from_recipe(
+    spice_name: str,
+    recipe_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
+    """Remove the link between a spice and a recipe."""
+    logger.debug("🔗 Unlinking spice '%s' ← recipe '%s'", spice_name, recipe_name)
+
+    with db_manager.session_scope(main_session) as main_session:
+        recipe = get_recipe_from_main(recipe_name, main_session)
+        if not recipe:
+            logger.debug("❌ Recipe '%s' not found in main DB.", recipe_name)
+            return {"status": "error", "message": f"Recipe '{recipe_name}' not found."}
+
+        with db_manager.session_scope(spice_session, factory=SpiceSessionLocal) as spice_session:
+            spice = find_spice(spice_name, spice_session)
+            if not spice:
+                logger.debug("❌ Spice '%s' not found in spice DB.", spice_name)
+                return {"status": "error", "message": f"Spice '{spice_name}' not found."}
+            spice_id, spice_label = spice.id, spice.name
+
+        main_session.execute(
+            delete(db_manager.RecipeSpice)
+            .where(db_manager.RecipeSpice.recipe_id == recipe.id)
+            .where(db_manager.RecipeSpice.spice_id == spice_id)
         )
 
-        if recipe_match or ingredient_match:
-            print(f"✅ Matched spice '{s.name}'")
-            suggestions.append({
-                "name": s.name,
-                "flavor_profile": s.flavor_profile,
-                "recommended_quantity": s.recommended_quantity
-            })
+        logger.debug("✅ Unlinked spice '%s' ← recipe '%s' successfully.", spice_label, recipe.name)
+        return {
+            "status": "success",
+            "message": f"Unlinked spice '{spice_label}' ← recipe '{recipe.name}' successfully."
+        }
 
-    spice_session.close()
 
-    print(f"🎯 Final suggestions: {[s['name'] for s in suggestions]}")
-    return suggestions
\ No newline at end of file
+def suggest_spices_for_recipe(
+    recipe_name: str,
+    main_session: Session | None = None,
+    spice_session: Session | None = None
+):
+    """Suggest spices that pair well with a given recipe."""
+    logger.debug("🧠 Suggesting spices for recipe '%s'", recipe_name)
+
+    memory = memory_catalog.active(main_session)
+    if memory is not None:
+        cached = memory.recipe(recipe_name, main_session)
+    else:
+        cached = catalog_image.lookup_recipe(recipe_name, main_session)
+    if cached is not None:
+        recipe_ingredients = {ing["name"].lower() for ing in cached["ingredients"]}
+    else:
+        with db_manager.session_scope(main_session) as main_session:
+            recipe = get_recipe_from_main(recipe_name, main_session)
+            if not recipe:
+                logger.debug("❌ Recipe '%s' not found in main DB.", recipe_name)
+                return []
+
+            recipe_ingredients = {
+                name.lower() for (name,) in main_session.query(db_manager.Ingredient.name)
+                .join(db_manager.RecipeIngredient, db_manager.RecipeIngredient.ingredient_id == db_manager.Ingredient.id)
+                .filter(db_manager.RecipeIngredient.recipe_id == recipe.id)
+            }
+
+    with db_manager.session_scope(spice_session, factory=SpiceSessionLocal) as spice_session:
+        memory = memory_catalog.active(spice_session)
+        spices = memory.spices(spice_session) if memory is not None else spice_session.query(Spice).all()
+        learned = {
+            spice_id for (spice_id,) in spice_session.query(SpicePairing.spice_id)
+            .filter(func.lower(SpicePairing.ingredient).in_(recipe_ingredients))
+            .distinct()
+        } if recipe_ingredients else set()
+
+        logger.debug("🧂 Checking spices for matching pairs...")
+        suggestions = []
+
+        for s in spices:
+
+            pairs_with_recipes = []
+            pairs_with_ingredients = []
+
+            if isinstance(s.pairs_with_recipes, str):
+                pairs_with_recipes = [r.strip().lower() for r in s.pairs_with_recipes.split(",") if r.strip()]
+            elif isinstance(s.pairs_with_recipes, list):
+                pairs_with_recipes = [r.strip().lower() for r in s.pairs_with_recipes]
+
+            if isinstance(s.pairs_with_ingredients, str):
+                pairs_with_ingredients = [i.strip().lower() for i in s.pairs_with_ingredients.split(",") if i.strip()]
+            elif isinstance(s.pairs_with_ingredients, list):
+                pairs_with_ingredients = [i.strip().lower() for i in s.pairs_with_ingredients]
+            recipe_match = recipe_name.lower() in pairs_with_recipes
+            ingredient_match = s.id in learned or not recipe_ingredients.isdisjoint(pairs_with_ingredients)
+
+            if recipe_match or ingredient_match:
+                logger.debug("✅ Matched spice '%s'", s.name)
+                suggestions.append({
+                    "name": s.name,
+                    "flavor_profile": s.flavor_profile,
+                    "recommended_quantity": s.recommended_quantity
+                })
+
+    logger.debug("🎯 Final suggestions: %s", [s["name"] for s in suggestions])
+    return suggestions
@@ -0,0 +1,318 @@
+"""
+pantry_matcher.py
+
+"What can I cook?" — ranks recipes against a pantry of ingredients.
+
+Every recipe is a bitset over a dense ingredient bit space, stored word-major
+(`bits[word, row]`, uint64). A pantry becomes a handful of mask words, and only
+those words are ANDed against the catalog and popcounted, so a query costs
+O(words touched × recipes) vectorized operations: a few milliseconds for 100k
+recipes.
+
+The index is built from the database on first use. After that it follows
+`catalog_events`: committed writes only queue the touched recipe ids, and they
+are re-read in one query before the next match. Writes made by other processes
+are not seen until `matcher.invalidate()` is called.
+
+Author: Rafael Kaher
+"""
+
+import threading
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import catalog_events, db_manager
+from app.core.db_manager import Ingredient, Recipe, RecipeIngredient
+from app.core.data_cleaner import normalize_universal_input
+from app.core.profiling import profiled
+
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words)
+else:
+    _POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        counts = _POPCOUNT_8[words.view(np.uint8)]
+        return counts.reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+class PantryMatcher:
+    """
+    Bitset index of recipe ingredients with vectorized pantry scoring.
+
+    Example:
+        ```python
+        matcher = PantryMatcher()
+        matcher.match(["Flour", "Egg", "Milk"], max_missing=1)
+        # Returns: {"status": "success", "data": [{"name": "Pancakes", "present": 3, "missing": 0, ...}], ...}
+        ```
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._pending_recipes = set()
+        self._pending_deleted = set()
+        self._pending_ingredients = set()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def invalidate(self):
+        """Drop the index; it is rebuilt on the next match."""
+        with self._lock:
+            self._built = False
+
+    def on_catalog_change(self, changes: catalog_events.CatalogChanges):
+        with self._lock:
+            if not self._built:
+                return
+            self._pending_recipes |= changes.recipes
+            self._pending_deleted |= changes.deleted_recipes
+            self._pending_ingredients |= changes.ingredients
+
+    def _build(self, session: Session):
+        ingredients = session.execute(select(Ingredient.id, Ingredient.name).order_by(Ingredient.id)).all()
+        recipes = session.execute(select(Recipe.id, Recipe.name).order_by(Recipe.id)).all()
+        pairs = np.array(
+            session.execute(select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)).all(),
+            dtype=np.int64
+        ).reshape(-1, 2)
+
+        self._ingredient_ids = [iid for iid, _ in ingredients]
+        self._bit_of = {iid: bit for bit, iid in enumerate(self._ingredient_ids)}
+        self._ingredient_names = {iid: name for iid, name in ingredients}
+        self._by_name = {name.lower(): iid for iid, name in ingredients}
+
+        self._recipe_ids = np.array([rid for rid, _ in recipes], dtype=np.int64)
+        self._names = [name for _, name in recipes]
+        self._row_of = {rid: row for row, rid in enumerate(self._recipe_ids.tolist())}
+        self._size = len(recipes)
+        capacity = max(16, self._size)
+
+        self._bits = np.zeros((self._words_for(len(self._ingredient_ids)), capacity), dtype=np.uint64)
+        self._required = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:self._size] = True
+        self._recipe_ids = np.resize(self._recipe_ids, capacity)
+
+        if len(pairs):
+            rows = np.searchsorted(self._recipe_ids[:self._size], pairs[:, 0])
+            bits = np.searchsorted(np.array(self._ingredient_ids, dtype=np.int64), pairs[:, 1])
+            masks = np.left_shift(np.uint64(1), (bits % WORD_BITS).astype(np.uint64))
+            np.bitwise_or.at(self._bits, (bits // WORD_BITS, rows), masks)
+            self._required[:self._size] = np.bincount(rows, minlength=self._size)
+
+        self._pending_recipes.clear()
+        self._pending_deleted.clear()
+        self._pending_ingredients.clear()
+        self._built = True
+
+    @staticmethod
+    def _words_for(bit_count: int) -> int:
+        return max(1, -(-bit_count // WORD_BITS))
+
+    def _ensure_capacity(self, rows: int, bits: int):
+        words, capacity = self._bits.shape
+        need_words = self._words_for(bits)
+        if rows <= capacity and need_words <= words:
+            return
+        new_capacity = max(capacity, rows if rows <= capacity else max(rows, capacity * 2))
+        grown = np.zeros((max(words, need_words), new_capacity), dtype=np.uint64)
+        grown[:words, :capacity] = self._bits
+        self._bits = grown
+        for attr, dtype in (("_required", np.int32), ("_alive", bool), ("_recipe_ids", np.int64)):
+            old = getattr(self, attr)
+            new = np.zeros(new_capacity, dtype=dtype)
+            new[:capacity] = old
+            setattr(self, attr, new)
+
+    def _add_ingredients(self, rows):
+        for iid, name in rows:
+            old = self._ingredient_names.get(iid)
+            if old is not None and self._by_name.get(old.lower()) == iid:
+                del self._by_name[old.lower()]
+            self._ingredient_names[iid] = name
+            self._by_name[name.lower()] = iid
+            if iid not in self._bit_of:
+                self._bit_of[iid] = len(self._ingredient_ids)
+                self._ingredient_ids.append(iid)
+        self._ensure_capacity(self._size, len(self._ingredient_ids))
+
+    def _clear_row(self, row: int):
+        self._bits[:, row] = 0
+        self._required[row] = 0
+        self._alive[row] = False
+
+    def _apply_pending(self, session: Session):
+        recipes, deleted, ingredients = self._pending_recipes, self._pending_deleted, self._pending_ingredients
+        if not (recipes or deleted or ingredients):
+            return
+        self._pending_recipes, self._pending_deleted, self._pending_ingredients = set(), set(), set()
+
+        if ingredients:
+            found = session.execute(
+                select(Ingredient.id, Ingredient.name).where(Ingredient.id.in_(ingredients))
+            ).all()
+            for iid in ingredients - {iid for iid, _ in found}:
+                name = self._ingredient_names.pop(iid, None)
+                if name is not None and self._by_name.get(name.lower()) == iid:
+                    del self._by_name[name.lower()]
+            self._add_ingredients(found)
+
+        for rid in deleted:
+            row = self._row_of.get(rid)
+            if row is not None:
+                self._clear_row(row)
+
+        if not recipes:
+            return
+        names = dict(session.execute(select(Recipe.id, Recipe.name).where(Recipe.id.in_(recipes))).all())
+        links = session.execute(
+            select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+            .where(RecipeIngredient.recipe_id.in_(recipes))
+        ).all()
+        unknown = {iid for _, iid in links if iid not in self._bit_of}
+        if unknown:
+            self._add_ingredients(session.execute(
+                select(Ingredient.id, Ingredient.name).where(Ingredient.id.in_(unknown))
+            ).all())
+
+        for rid in recipes:
+            row = self._row_of.get(rid)
+            if rid not in names:
+                if row is not None:
+                    self._clear_row(row)
+                continue
+            if row is None:
+                row = self._size
+                self._ensure_capacity(row + 1, len(self._ingredient_ids))
+                self._row_of[rid] = row
+                self._recipe_ids[row] = rid
+                self._names.append(names[rid])
+                self._size += 1
+            else:
+                self._names[row] = names[rid]
+            self._clear_row(row)
+            self._alive[row] = True
+
+        for rid, iid in links:
+            row, bit = self._row_of[rid], self._bit_of[iid]
+            self._bits[bit // WORD_BITS, row] |= np.uint64(1 << (bit % WORD_BITS))
+            self._required[row] += 1
+
+    def _ready(self, session: Session):
+        if not self._built:
+            self._build(session)
+        else:
+            self._apply_pending(session)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def match(
+        self,
+        pantry: list[str],
+        max_missing: int | None = None,
+        limit: int = 20,
+        session: Session | None = None
+    ) -> dict:
+        """
+        Rank recipes by how few required ingredients are missing from `pantry`,
+        then by how many are present.
+
+        Args:
+            pantry (list[str]): Ingredient names the user has.
+            max_missing (int, optional): Drop recipes missing more than this.
+            limit (int): Maximum recipes returned.
+            session (Session, optional): Request-scoped session; a private one is used if omitted.
+
+        Returns:
+            dict: `data` lists name, present, missing, required and the missing
+            ingredient names; `unknown` lists pantry items not in the catalog.
+        """
+        with db_manager.session_scope(session) as session, self._lock:
+            self._ready(session)
+
+            wanted, unknown = set(), []
+            for raw in pantry:
+                name = normalize_universal_input(raw)
+                iid = self._by_name.get(name.lower()) if isinstance(name, str) else None
+                if iid is None:
+                    unknown.append(raw)
+                else:
+                    wanted.add(self._bit_of[iid])
+
+            n = self._size
+            if not wanted or not n:
+                return {"status": "success", "data": [], "unknown": unknown}
+
+            masks = {}
+            for bit in wanted:
+                masks[bit // WORD_BITS] = masks.get(bit // WORD_BITS, 0) | (1 << (bit % WORD_BITS))
+            words = np.fromiter(masks, dtype=np.intp, count=len(masks))
+            word_masks = np.array(list(masks.values()), dtype=np.uint64)
+
+            present = popcount(self._bits[words, :n] & word_masks[:, None]).sum(axis=0, dtype=np.int32)
+            missing = self._required[:n] - present
+
+            keep = self._alive[:n] & (present > 0)
+            if max_missing is not None:
+                keep &= missing <= max_missing
+            candidates = np.flatnonzero(keep)
+
+            key = (missing[candidates].astype(np.int64) << 40) - (present[candidates].astype(np.int64) << 24) + candidates
+            if len(candidates) > limit:
+                top = np.argpartition(key, limit - 1)[:limit]
+                candidates, key = candidates[top], key[top]
+            ranked = candidates[np.argsort(key, kind="stable")]
+
+            full_mask = np.zeros(self._bits.shape[0], dtype=np.uint64)
+            full_mask[words] = word_masks
+            data = [
+                {
+                    "name": self._names[row],
+                    "present": int(present[row]),
+                    "missing": int(missing[row]),
+                    "required": int(self._required[row]),
+                    "missing_ingredients": self._missing_names(row, full_mask),
+                }
+                for row in ranked.tolist()
+            ]
+        return {"status": "success", "data": data, "unknown": unknown}
+
+    def _missing_names(self, row: int, pantry_mask: np.ndarray) -> list[str]:
+        names = []
+        lacking = self._bits[:, row] & ~pantry_mask
+        for word in np.flatnonzero(lacking).tolist():
+            value = int(lacking[word])
+            while value:
+                low = value & -value
+                bit = word * WORD_BITS + low.bit_length() - 1
+                names.append(self._ingredient_names[self._ingredient_ids[bit]])
+                value ^= low
+        return sorted(names)
+
+
+matcher = PantryMatcher()
+catalog_events.subscribe(matcher.on_catalog_change)
+
+
+@profiled
+def match_pantry(pantry: list[str], max_missing: int | None = None, limit: int = 20, session: Session | None = None):
+    """
+    Rank the catalog against a pantry with the shared matcher.
+
+    Example:
+        ```python
+        match_pantry(["Flour", "Egg"], max_missing=2)
+        ```
+    """
+    return matcher.match(pantry, max_missing, limit, session)
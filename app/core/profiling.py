@@ -0,0 +1,196 @@
+"""
+profiling.py
+
+Opt-in, per-request cProfile for the manager and data_cleaner layers.
+
+Profiling is switched on by PANACEIA_PROFILING=1 when the app is imported.
+When it is off, `profiled` returns the decorated function itself and no
+middleware is installed, so production pays nothing.
+
+When it is on, `ProfilingMiddleware` selects requests, either a sampled fraction
+(PANACEIA_PROFILE_SAMPLE_RATE, e.g. 0.01) or those that send `X-Profile`. The
+header must match PANACEIA_PROFILE_TOKEN when a token is set. During a selected
+request, the outermost `profiled` call on each thread runs under its own
+cProfile. This covers the threadpool threads that sync endpoints run on. The
+merged top-N functions are kept per route in a ring buffer served by
+`GET /admin/profiles`.
+
+Author: Rafael Kaher
+"""
+
+import cProfile
+import functools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+
+from app.core.metrics import route_key
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+ENABLED = _env_flag("PANACEIA_PROFILING")
+SAMPLE_RATE = float(os.environ.get("PANACEIA_PROFILE_SAMPLE_RATE", "0") or 0)
+TOKEN = os.environ.get("PANACEIA_PROFILE_TOKEN") or None
+TOP_N = int(os.environ.get("PANACEIA_PROFILE_TOP", "25"))
+BUFFER_SIZE = int(os.environ.get("PANACEIA_PROFILE_BUFFER", "20"))
+
+_collector: ContextVar[list | None] = ContextVar("panaceia_profile_collector", default=None)
+_thread = threading.local()
+
+_profiles: dict[str, deque] = {}
+_lock = threading.Lock()
+
+
+def instrument(fn):
+    """
+    Wrap `fn` so it runs under cProfile while a profiled request is active.
+    Nested instrumented calls on the same thread share the outer profile.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        collector = _collector.get()
+        if collector is None or getattr(_thread, "active", False) or sys.getprofile() is not None:
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        _thread.active = True
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            _thread.active = False
+            collector.append(profile)
+
+    return wrapper
+
+
+def profiled(fn):
+    """
+    Mark a manager or cleaner entry point for request profiling.
+    A no-op unless PANACEIA_PROFILING was set when the module was imported.
+
+    Example:
+        ```python
+        @profiled
+        def list_recipes(session=None):
+            ...
+        ```
+    """
+    return instrument(fn) if ENABLED else fn
+
+
+def _label(key) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name
+    path = Path(filename)
+    try:
+        path = path.resolve().relative_to(Path.cwd())
+    except ValueError:
+        path = Path(*path.parts[-2:])
+    return f"{name} ({path}:{line})"
+
+
+def summarize(profiles: list, top: int = TOP_N) -> list[dict]:
+    """
+    Merge cProfile runs and return the `top` functions by cumulative time.
+
+    Returns:
+        list[dict]: `function`, `calls`, `total_ms` and `cumulative_ms` per entry.
+    """
+    stats = pstats.Stats(*profiles).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": _label(key),
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for key, (_, calls, total, cumulative, _) in ranked
+        if "_lsprof.Profiler" not in key[2]
+    ][:top]
+
+
+def record(route: str, entry: dict):
+    with _lock:
+        buffer = _profiles.get(route)
+        if buffer is None:
+            buffer = _profiles[route] = deque(maxlen=BUFFER_SIZE)
+        buffer.append(entry)
+
+
+def snapshot(route: str | None = None) -> dict:
+    """Return the buffered profiles, newest last, optionally for one route."""
+    with _lock:
+        return {
+            key: list(buffer)
+            for key, buffer in sorted(_profiles.items())
+            if route is None or key == route
+        }
+
+
+def reset():
+    with _lock:
+        _profiles.clear()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware selecting which requests get profiled.
+
+    Args:
+        app: The wrapped ASGI app.
+        sample_rate (float): Fraction of requests profiled without the header.
+        token (str, optional): Required `X-Profile` header value.
+        top (int): Functions kept per profile.
+    """
+
+    def __init__(self, app, sample_rate: float = SAMPLE_RATE, token: str | None = TOKEN, top: int = TOP_N):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token
+        self.top = top
+
+    def _trigger(self, scope) -> str | None:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                if self.token is None or value.decode("latin-1") == self.token:
+                    return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiles = []
+        token = _collector.set(profiles)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _collector.reset(token)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if profiles:
+                route = route_key(scope)
+                record(route, {
+                    "route": route,
+                    "path": scope.get("path"),
+                    "trigger": trigger,
+                    "timestamp": time.time(),
+                    "duration_ms": round(duration_ms, 3),
+                    "top": summarize(profiles, self.top),
+                })
@@ -0,0 +1,89 @@
+"""
+responses.py
+
+Fast JSON responses for routes that return large payloads.
+
+FastAPI passes a plain dict or list returned by an endpoint through
+`jsonable_encoder`, which walks every value in Python, and then through
+`json.dumps`. For lists of tens of thousands of recipes the encoder costs more
+than the query. `FastJSONResponse` serializes with orjson when it is
+installed (falling back to the standard library), and `FastJSONRoute` wraps
+a router's endpoints so what they return goes straight to it, skipping
+`jsonable_encoder`. Routers opt in with:
+
+    router = APIRouter(prefix="/recipes", route_class=FastJSONRoute,
+                       default_response_class=FastJSONResponse)
+
+Values orjson cannot serialize natively are handed to `jsonable_encoder`
+one at a time, so responses stay identical to FastAPI's.
+
+Author: Rafael Kaher
+"""
+
+import inspect
+import json
+from functools import wraps
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize `content` to JSON bytes the way `FastJSONResponse` does."""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=jsonable_encoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    `JSONResponse` rendered with orjson.
+
+    Example:
+        ```python
+        return FastJSONResponse({"status": "success", "data": rows})
+        ```
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route whose endpoint results are rendered by `FastJSONResponse` directly.
+
+    Endpoints with a `response_model` (or a return annotation FastAPI turns
+    into one) keep FastAPI's own Pydantic serialization.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # Wrapped before FastAPI sees it: included routers rebuild their
+        # handlers from `route.endpoint`, and `__wrapped__` keeps the signature.
+        super().__init__(path, _render_fast(endpoint, self), **kwargs)
+
+
+def _render_fast(endpoint, route: APIRoute):
+    def respond(result):
+        if isinstance(result, Response) or route.response_field is not None:
+            return result
+        return FastJSONResponse(result, status_code=route.status_code or 200)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return respond(await endpoint(*args, **kwargs))
+    else:
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            return respond(endpoint(*args, **kwargs))
+    return wrapper
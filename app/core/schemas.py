@@ -11,8 +11,11 @@ Author: Rafael Kaher
 
 """
 
-from pydantic import BaseModel, StrictStr, StrictFloat, Field
-from typing import List, Optional
+from pydantic import AliasChoices, BaseModel, BeforeValidator, StrictStr, StrictFloat, Field, StringConstraints, TypeAdapter
+from typing import Annotated, List, Literal, Optional, Union
+
+UpsertMode = Literal["skip", "replace", "merge"]
+"""What an import does with a record whose name already exists."""
 
 class IngredientSchema(BaseModel):
     """
@@ -66,6 +69,113 @@ class RecipeSchema(BaseModel):
     ingredients: List[IngredientSchema]
     spices: List[StrictStr] = []
 
+class PantrySchema(BaseModel):
+    """
+    Defines the schema for a "what can I cook" query.
+
+    Attributes:
+        ingredients (List[StrictStr]): Ingredient names available in the pantry.
+        max_missing (int, optional): Only return recipes missing at most this many ingredients.
+        limit (int): Maximum number of recipes returned (1–100).
+
+    Usage Example:
+        ```python
+        PantrySchema(ingredients=["Flour", "Egg", "Milk"], max_missing=1)
+        ```
+    """
+
+    ingredients: List[StrictStr] = Field(..., min_length=1)
+    max_missing: Optional[int] = Field(default=None, ge=0)
+    limit: int = Field(default=20, ge=1, le=100)
+
+class RenameRecipeOp(BaseModel):
+    """Patch operation: give the recipe a new name."""
+    op: Literal["rename"]
+    new_name: StrictStr
+
+class SetStepsOp(BaseModel):
+    """Patch operation: replace the preparation steps."""
+    op: Literal["set_steps"]
+    steps: StrictStr
+
+class AddIngredientOp(BaseModel):
+    """Patch operation: add an ingredient that is not in the recipe yet."""
+    op: Literal["add_ingredient"]
+    name: StrictStr
+    quantity: float
+    unit: StrictStr = ""
+
+class RemoveIngredientOp(BaseModel):
+    """Patch operation: drop an ingredient from the recipe."""
+    op: Literal["remove_ingredient"]
+    name: StrictStr
+
+class ReplaceIngredientOp(BaseModel):
+    """Patch operation: swap an ingredient for another, keeping its quantity."""
+    op: Literal["replace_ingredient"]
+    old: StrictStr
+    new: StrictStr
+    unit: StrictStr = ""
+
+class SetQuantityOp(BaseModel):
+    """Patch operation: change the quantity of an ingredient in the recipe."""
+    op: Literal["set_quantity"]
+    name: StrictStr
+    quantity: float
+
+RecipeOperation = Annotated[
+    Union[RenameRecipeOp, SetStepsOp, AddIngredientOp, RemoveIngredientOp, ReplaceIngredientOp, SetQuantityOp],
+    Field(discriminator="op")
+]
+
+class RecipePatchSchema(BaseModel):
+    """
+    Body of `PATCH /recipes/{name}`: operations applied in order, all or none.
+
+    Usage Example:
+        ```python
+        RecipePatchSchema(operations=[
+            {"op": "set_quantity", "name": "Flour", "quantity": 250},
+            {"op": "replace_ingredient", "old": "Milk", "new": "Oat Milk"},
+            {"op": "rename", "new_name": "Vegan Pancakes"}
+        ])
+        ```
+    """
+    operations: List[RecipeOperation] = Field(..., min_length=1, max_length=500)
+
+class NamedRecipePatchSchema(RecipePatchSchema):
+    """One recipe's patch inside a batch."""
+    name: StrictStr
+
+class RecipeBatchPatchSchema(BaseModel):
+    """
+    Body of `PATCH /recipes/`: one patch per recipe.
+
+    Attributes:
+        patches (List[NamedRecipePatchSchema]): Recipe names with their operations.
+        atomic (bool): Apply nothing if any patch fails.
+    """
+    patches: List[NamedRecipePatchSchema] = Field(..., min_length=1, max_length=1000)
+    atomic: bool = False
+
+class RecipeBulkDeleteSchema(BaseModel):
+    """
+    Body of `DELETE /recipes/batch`; give either `names` or `name_pattern`.
+
+    Attributes:
+        names (List[StrictStr], optional): Recipes to delete (up to 50000).
+        name_pattern (StrictStr, optional): Glob-style pattern, e.g. "Christmas *".
+        dry_run (bool): Only count what would be deleted.
+
+    Usage Example:
+        ```python
+        RecipeBulkDeleteSchema(name_pattern="Christmas *", dry_run=True)
+        ```
+    """
+    names: Optional[List[StrictStr]] = Field(default=None, min_length=1, max_length=50000)
+    name_pattern: Optional[StrictStr] = Field(default=None, min_length=1)
+    dry_run: bool = False
+
 class UpdateIngredientNameSchema(BaseModel):
     """
     Schema used for updating an ingredient’s name in the system.
@@ -87,6 +197,68 @@ class UpdateIngredientNameSchema(BaseModel):
     old_name: str
     new_name: str
 
+class NewIngredientSchema(BaseModel):
+    """
+    An ingredient to create through the batch endpoint.
+
+    Attributes:
+        name (StrictStr): Ingredient name.
+        unit (StrictStr): Measurement unit.
+    """
+    name: StrictStr
+    unit: StrictStr
+
+class IngredientChangeSchema(BaseModel):
+    """
+    One change in a batch update; at least one of `new_name` and `new_unit` is expected.
+
+    Attributes:
+        name (StrictStr): Current ingredient name.
+        new_name (StrictStr, optional): Name to assign.
+        new_unit (StrictStr, optional): Unit to assign.
+    """
+    name: StrictStr
+    new_name: Optional[StrictStr] = None
+    new_unit: Optional[StrictStr] = None
+
+class IngredientBatchSchema(BaseModel):
+    """
+    Body of `POST /ingredients/batch`.
+
+    Attributes:
+        items (List[NewIngredientSchema]): Ingredients to create (up to 5000).
+        atomic (bool): Apply nothing if any item fails.
+
+    Usage Example:
+        ```python
+        IngredientBatchSchema(items=[NewIngredientSchema(name="Flour", unit="Grm")], atomic=True)
+        ```
+    """
+    items: List[NewIngredientSchema] = Field(..., min_length=1, max_length=5000)
+    atomic: bool = False
+
+class IngredientBatchUpdateSchema(BaseModel):
+    """
+    Body of `PUT /ingredients/batch`.
+
+    Attributes:
+        items (List[IngredientChangeSchema]): Changes to apply (up to 5000).
+        atomic (bool): Apply nothing if any item fails.
+    """
+    items: List[IngredientChangeSchema] = Field(..., min_length=1, max_length=5000)
+    atomic: bool = False
+
+class IngredientBatchDeleteSchema(BaseModel):
+    """
+    Body of `DELETE /ingredients/batch`.
+
+    Attributes:
+        names (List[StrictStr]): Ingredients to delete (up to 5000).
+        atomic (bool): Delete nothing if any name fails.
+    """
+    names: List[StrictStr] = Field(..., min_length=1, max_length=5000)
+    atomic: bool = False
+
 class SpiceSchema(BaseModel):
     """
     Represents a spice object with all contextual attributes used for learning and suggestions.
@@ -104,6 +276,60 @@ class SpiceSchema(BaseModel):
     pairs_with_ingredients: List[StrictStr] = Field(default_factory=list)
     pairs_with_recipes: List[StrictStr] = Field(default_factory=list)
 
+# Import feeds are checked entirely by the schema (see `data_cleaner.normalize_feed_recipe`):
+# names must not be blank and come stripped, steps must hold some text.
+FeedName = Annotated[StrictStr, StringConstraints(strip_whitespace=True, min_length=1)]
+FeedText = Annotated[StrictStr, StringConstraints(pattern=r"\S")]
+
+class ImportIngredientSchema(IngredientSchema):
+    """
+    An ingredient as partner feeds send it: the quantity may be a numeric
+    string ("200") and the unit may be missing.
+    """
+    name: FeedName
+    quantity: float = Field(allow_inf_nan=False)
+    unit: str = ""
+
+class ImportRecipeSchema(RecipeSchema):
+    """A recipe record of an import feed (see `RECIPE_FEED`)."""
+    name: FeedName
+    steps: FeedText
+    ingredients: List[ImportIngredientSchema] = []
+
+def _split_csv(value):
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [] if value is None else value
+
+FeedList = Annotated[List[StrictStr], BeforeValidator(_split_csv)]
+
+class ImportSpiceSchema(SpiceSchema):
+    """
+    A spice record of an import feed (see `SPICE_FEED`). Accepts the field
+    names partners use (`title`, `flavor`, `dosage`, `recipes`, ...) and
+    comma-separated pairing lists.
+    """
+    name: StrictStr = Field(validation_alias=AliasChoices("name", "title"))
+    flavor_profile: Optional[StrictStr] = Field(
+        default=None, validation_alias=AliasChoices("flavor_profile", "flavor", "taste")
+    )
+    recommended_quantity: Optional[StrictStr] = Field(
+        default=None, validation_alias=AliasChoices("recommended_quantity", "dosage")
+    )
+    pairs_with_ingredients: FeedList = Field(
+        default_factory=list,
+        validation_alias=AliasChoices("pairs_with_ingredients", "combines_ingredients", "pairings_ingredients")
+    )
+    pairs_with_recipes: FeedList = Field(
+        default_factory=list,
+        validation_alias=AliasChoices("pairs_with_recipes", "recipes", "pairings_recipes")
+    )
+
+# Compiled validators for whole import feeds: `RECIPE_FEED.validate_json(body)`
+# checks every record inside pydantic-core, straight from the request bytes.
+RECIPE_FEED = TypeAdapter(List[ImportRecipeSchema])
+SPICE_FEED = TypeAdapter(List[ImportSpiceSchema])
+
 class LinkSpiceSchema(BaseModel):
     """
     Schema used for linking spice to recipe.
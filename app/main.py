@@ -1,19 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from app.core.logger import configure_logging
+from app.core.metrics import MetricsMiddleware
+from app.core import db_manager, profiling
+from app.core.modules.spices.db import spices_models
 from app.core.modules.ingredients.routes_ingredients import router as ingredients_router
 from app.core.modules.recipes.routes_recipes import router as recipes_router
 from app.core.modules.spices.routes_spices import router as spices_router
 from app.core.modules.import_gateway.routes_import import router as import_router
+from app.core.modules.monitoring.routes_monitoring import router as monitoring_router
+from app.core.modules.spices.spices_manager import learning_queue
+
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db_manager.init_db()
+    spices_models.init_db()
+    yield
+    learning_queue.flush(timeout=10)
 
 app = FastAPI(
     title="PanaceIA API",
     description="A modular, AI-ready recipe management system 🍳",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+if profiling.ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(ingredients_router)
 app.include_router(recipes_router)
 app.include_router(spices_router)
 app.include_router(import_router)
+app.include_router(monitoring_router)
 
 @app.get("/", tags=["root"])
 def root():
@@ -0,0 +1,17 @@
+"""
+benchmarks
+
+Reproducible performance benchmarks for the PanaceIA managers and API.
+
+Run the whole suite with the standalone runner:
+
+    python -m benchmarks.run --sizes 1k,10k --output bench.json
+    python -m benchmarks.run --sizes 1k --baseline bench.json --threshold 0.2
+
+or through pytest, which picks up the `bench_*.py` modules only when the
+`benchmarks` directory is passed explicitly:
+
+    PANACEIA_BENCH_SIZES=1k python -m pytest benchmarks -q
+
+Author: Rafael Kaher
+"""
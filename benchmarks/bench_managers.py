@@ -0,0 +1,239 @@
+"""
+bench_managers.py
+
+Benchmarks for the manager and data-cleaning hot paths.
+
+Each case takes the pytest-benchmark `benchmark` fixture and a `catalog`
+already bound to the managers (see `benchmarks.catalog.use_catalog`).
+
+Author: Rafael Kaher
+"""
+
+import json
+import random
+import tempfile
+import tracemalloc
+from itertools import count
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from sqlalchemy.orm import selectinload
+
+from app.core import catalog_image, db_manager, memory_catalog
+from app.core.catalog_snapshot import export_snapshot, load_snapshot
+from app.core.data_cleaner import normalize_universal_input, validate_and_normalize_recipe
+from app.core.fuzzy_index import FuzzyIndex
+from app.core.modules.import_gateway.import_manager import import_bulk_recipes, import_recipe_feed, validate_feed
+from app.core.modules.recipes.recipes_manager import (
+    add_recipe,
+    find_recipes_by_ingredients,
+    get_recipe_by_name,
+    list_recipes,
+    search_recipes,
+    upsert_recipes,
+)
+from app.core.modules.spices.spices_manager import suggest_spices_for_recipe
+from app.core.db_manager import Recipe, RecipeIngredient
+from app.core.pantry_matcher import match_pantry
+from app.core.responses import FastJSONResponse
+from app.core.schemas import RECIPE_FEED
+
+IMPORT_BATCH = 100
+UPSERT_BATCH = 5_000
+RESPONSE_ITEMS = 50_000
+
+
+def messy(payload: dict) -> dict:
+    """Return `payload` the way external sources tend to send it."""
+    return {
+        "name": f"  {payload['name'].upper()} ",
+        "steps": payload["steps"].lower(),
+        "ingredients": [
+            {"name": f" {ing['name'].lower()}", "quantity": str(ing["quantity"]), "unit": "gramas"}
+            for ing in payload["ingredients"]
+        ],
+    }
+
+
+def test_add_recipe(benchmark, catalog):
+    serial = count()
+
+    def new_recipe():
+        payload = catalog.recipe(next(serial) % catalog.size)
+        payload["name"] = f"Bench {payload['name']} {next(serial)}"
+        return (payload,), {}
+
+    result = benchmark.pedantic(add_recipe, setup=new_recipe, rounds=50, warmup_rounds=2)
+    assert result["status"] == "success"
+
+
+def test_get_recipe_by_name(benchmark, catalog):
+    result = benchmark(get_recipe_by_name, catalog.recipe_name(catalog.size // 2))
+    assert result["status"] == "success"
+
+
+def test_get_recipe_by_name_image(benchmark, catalog):
+    with tempfile.TemporaryDirectory(prefix="panaceia-image-") as root:
+        catalog_image.publish(root)
+        previous, catalog_image.image = catalog_image.image, catalog_image.CatalogImage(root)
+        try:
+            result = benchmark(get_recipe_by_name, catalog.recipe_name(catalog.size // 2))
+            assert catalog_image.image.version is not None
+        finally:
+            catalog_image.image = previous
+    assert result["status"] == "success"
+
+
+def test_get_recipe_by_name_memory(benchmark, catalog):
+    previous, memory_catalog.catalog = memory_catalog.catalog, memory_catalog.MemoryCatalog()
+    try:
+        result = benchmark(get_recipe_by_name, catalog.recipe_name(catalog.size // 2))
+    finally:
+        memory_catalog.catalog = previous
+    assert result["status"] == "success"
+
+
+def test_build_memory_catalog(benchmark, catalog):
+    tracemalloc.start()
+    try:
+        memory = memory_catalog.MemoryCatalog()
+        memory.recipes()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert retained / catalog.size < 1_000  # bytes per recipe, ~600 at 100k
+
+    def build():
+        memory = memory_catalog.MemoryCatalog()
+        return len(memory.recipes())
+
+    assert benchmark.pedantic(build, rounds=3) == catalog.size
+
+
+def test_list_recipes(benchmark, catalog):
+    result = benchmark.pedantic(list_recipes, rounds=5, warmup_rounds=1)
+    assert len(result["data"]) == catalog.size
+
+
+def test_render_list_response(benchmark, catalog):
+    payload = {"status": "success", "data": list_recipes()["data"][:RESPONSE_ITEMS]}
+    response = benchmark.pedantic(lambda: JSONResponse(jsonable_encoder(payload)), rounds=5, warmup_rounds=1)
+    assert response.body
+
+
+def test_render_list_response_fast(benchmark, catalog):
+    payload = {"status": "success", "data": list_recipes()["data"][:RESPONSE_ITEMS]}
+    response = benchmark.pedantic(FastJSONResponse, args=(payload,), rounds=5, warmup_rounds=1)
+    assert response.body
+
+
+def test_hydrate_catalog_orm(benchmark, catalog):
+    def hydrate():
+        with db_manager.session_scope() as session:
+            recipes = session.query(Recipe).options(
+                selectinload(Recipe.recipe_ingredients).joinedload(RecipeIngredient.ingredient)
+            ).all()
+            return sum(len(recipe.recipe_ingredients) for recipe in recipes)
+
+    assert benchmark.pedantic(hydrate, rounds=1) > catalog.size
+
+
+def test_export_catalog_snapshot(benchmark, catalog):
+    with tempfile.TemporaryDirectory(prefix="panaceia-snapshot-") as path:
+        manifest = benchmark.pedantic(export_snapshot, args=(path,), rounds=3)
+    assert manifest["counts"]["recipes"] == catalog.size
+
+
+def test_load_catalog_snapshot(benchmark, catalog):
+    with tempfile.TemporaryDirectory(prefix="panaceia-snapshot-") as path:
+        export_snapshot(path)
+
+        def load():
+            snapshot = load_snapshot(path)
+            return int(snapshot["links.ingredient_id"].sum()), snapshot.recipe(catalog.size // 2)["name"]
+
+        _, name = benchmark(load)
+    assert name == catalog.recipe_name(catalog.size // 2)
+
+
+def test_suggest_spices_for_recipe(benchmark, catalog):
+    result = benchmark(suggest_spices_for_recipe, catalog.recipe_name(catalog.size // 3))
+    assert isinstance(result, list)
+
+
+def test_import_bulk_recipes(benchmark, catalog):
+    raws = [messy(catalog.recipe(i)) for i in range(min(IMPORT_BATCH, catalog.size))]
+    results = benchmark(import_bulk_recipes, raws)
+    assert all(r["status"] == "success" for r in results)
+
+
+def test_reimport_recipes(benchmark, catalog):
+    raws = [messy(catalog.recipe(i)) for i in range(min(IMPORT_BATCH, catalog.size))]
+    for raw in raws:
+        raw["name"] = f"Feed {raw['name']}"
+    import_bulk_recipes(raws, "replace")  # the first delivery of the feed
+    results = benchmark(import_bulk_recipes, raws, "replace")
+    assert all(r.get("action") == "unchanged" for r in results)
+
+
+def test_upsert_recipes_batch(benchmark, catalog):
+    payloads = [validate_and_normalize_recipe(catalog.recipe(i))["data"] for i in range(min(UPSERT_BATCH, catalog.size))]
+    for payload in payloads:
+        payload["name"] = f"Batch {payload['name']}"
+    result = benchmark.pedantic(upsert_recipes, args=(payloads, "replace"), kwargs={"normalized": True}, rounds=5)
+    assert result["applied"] == len(payloads)
+
+
+def test_normalize_universal_input(benchmark, catalog):
+    raw = messy(catalog.recipe(0))
+    benchmark(normalize_universal_input, raw)
+
+
+def test_validate_and_normalize_recipe(benchmark, catalog):
+    raw = messy(catalog.recipe(0))
+    result = benchmark(validate_and_normalize_recipe, raw)
+    assert result["status"] == "success"
+
+
+def test_validate_recipe_feed(benchmark, catalog):
+    body = json.dumps([messy(catalog.recipe(i)) for i in range(min(IMPORT_BATCH, catalog.size))]).encode()
+    checked = benchmark(validate_feed, RECIPE_FEED, body)
+    assert all(errors is None for _, errors in checked)
+
+
+def test_import_recipe_feed(benchmark, catalog):
+    body = json.dumps([messy(catalog.recipe(i)) for i in range(min(IMPORT_BATCH, catalog.size))]).encode()
+    results = benchmark(import_recipe_feed, body)
+    assert all(r["status"] == "success" for r in results)
+
+
+def test_find_recipes_by_ingredients(benchmark, catalog):
+    include = catalog.ingredients[1:3]
+    result = benchmark(find_recipes_by_ingredients, include, [catalog.ingredients[0]], "any")
+    assert result["status"] == "success"
+
+
+def test_search_recipes(benchmark, catalog):
+    result = benchmark(search_recipes, "ris")
+    assert result["status"] == "success" and result["total"] > 0
+
+
+def test_match_pantry(benchmark, catalog):
+    pantry = catalog.ingredients[:15]
+    match_pantry(pantry)  # first call builds the index
+    result = benchmark(match_pantry, pantry, 3)
+    assert result["status"] == "success"
+
+
+def test_fuzzy_resolve(benchmark, catalog):
+    rng = random.Random(catalog.seed)
+    names = set()
+    while len(names) < catalog.size:
+        names.add(f"{rng.choice(catalog.ingredients)} {rng.choice(catalog.ingredients)}")
+    index = FuzzyIndex(names)
+    typos = [name[:3] + name[4:] for name in rng.sample(sorted(names), 100)]
+    lookups = iter(typos * 1_000)
+
+    result = benchmark(lambda: index.resolve(next(lookups)))
+    assert result is not None
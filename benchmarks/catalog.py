@@ -0,0 +1,275 @@
+"""
+catalog.py
+
+Deterministic synthetic catalogs for the benchmarks.
+
+A catalog is defined by its size and seed only: every recipe is generated from
+its own seeded RNG, so any recipe can be rebuilt by index without keeping the
+whole catalog in memory. Ingredient popularity follows a Zipf-like curve and
+each recipe has 4–12 ingredients and 0–3 spices, close to what real imports
+look like.
+
+`build_database()` writes a catalog into a pair of SQLite files (recipes and
+spices) using bulk Core inserts and caches them by size and seed;
+`use_catalog()` points the managers at a private copy of those files.
+
+Author: Rafael Kaher
+"""
+
+import random
+import shutil
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import accumulate
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+
+from app.core import db_manager
+from app.core.migrations import migrate
+from app.core.db_manager import Base, Ingredient, Recipe, RecipeIngredient, RecipeSpice, bulk_load_search_index
+from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import Spice, SpicePairing
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+BASE_INGREDIENTS = [
+    "Flour", "Milk", "Egg", "Butter", "Sugar", "Salt", "Tomato", "Onion", "Garlic",
+    "Chicken", "Beef", "Pork", "Rice", "Potato", "Carrot", "Celery", "Pepper", "Lemon",
+    "Lime", "Olive Oil", "Cream", "Cheese", "Yogurt", "Spinach", "Mushroom", "Bean",
+    "Lentil", "Chickpea", "Corn", "Pea", "Zucchini", "Eggplant", "Cabbage", "Broccoli",
+    "Cauliflower", "Pumpkin", "Apple", "Banana", "Orange", "Strawberry", "Honey",
+    "Vinegar", "Soy Sauce", "Ginger", "Shrimp", "Salmon", "Tuna", "Cod", "Oat",
+    "Almond", "Walnut", "Coconut", "Chocolate", "Pasta", "Bread", "Noodle", "Tofu",
+    "Leek", "Radish", "Beet",
+]
+QUALIFIERS = ["", "Fresh", "Smoked", "Dried", "Ground", "Roasted", "Organic", "Wild", "Baby", "Red", "Green"]
+FORMS = ["", "Puree", "Powder", "Slices"]
+DISHES = ["Stew", "Soup", "Salad", "Pie", "Curry", "Roast", "Bake", "Risotto", "Tart", "Stir Fry", "Casserole", "Bowl"]
+UNITS = ["Grm", "Mls", "Unit", "Kg", "Cls Sopa", "Xca"]
+SPICES = [
+    "Basil", "Oregano", "Thyme", "Rosemary", "Sage", "Parsley", "Cilantro", "Dill",
+    "Mint", "Bay Leaf", "Cumin", "Coriander", "Paprika", "Smoked Paprika", "Turmeric",
+    "Cinnamon", "Nutmeg", "Clove", "Cardamom", "Star Anise", "Fennel Seed", "Mustard Seed",
+    "Black Pepper", "White Pepper", "Chili Flakes", "Cayenne", "Saffron", "Vanilla",
+    "Allspice", "Tarragon", "Chives", "Marjoram", "Sumac", "Za'Atar", "Garam Masala",
+    "Curry Powder", "Five Spice", "Herbes De Provence", "Lemongrass", "Juniper",
+]
+FLAVORS = ["Earthy", "Warm", "Fresh", "Smoky", "Sweet", "Pungent", "Citrusy", "Bitter"]
+
+
+def parse_size(label: str) -> int:
+    """
+    Turn a size label into a recipe count.
+
+    Example:
+        ```python
+        parse_size("10k")
+        # Returns: 10000
+        ```
+    """
+    label = label.strip().lower()
+    if label in SIZES:
+        return SIZES[label]
+    if label.endswith("k"):
+        return int(float(label[:-1]) * 1_000)
+    return int(label)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """
+    A synthetic catalog of `size` recipes generated from `seed`.
+
+    Example:
+        ```python
+        catalog = Catalog(1_000)
+        catalog.recipe(42)["name"]
+        # Returns: 'Bake 000042'
+        ```
+    """
+
+    size: int
+    seed: int = 1
+
+    @property
+    def label(self) -> str:
+        for label, size in SIZES.items():
+            if size == self.size:
+                return label
+        return str(self.size)
+
+    @cached_property
+    def ingredients(self) -> list[str]:
+        vocabulary = [
+            " ".join(part for part in (qualifier, base, form) if part)
+            for form in FORMS
+            for qualifier in QUALIFIERS
+            for base in BASE_INGREDIENTS
+        ]
+        return vocabulary[:min(len(vocabulary), max(200, self.size // 25))]
+
+    @cached_property
+    def _ingredient_weights(self) -> list[float]:
+        return list(accumulate(1 / (rank + 1) for rank in range(len(self.ingredients))))
+
+    @cached_property
+    def spices(self) -> list[dict]:
+        rng = random.Random(self.seed)
+        return [
+            {
+                "name": name,
+                "flavor_profile": rng.choice(FLAVORS),
+                "recommended_quantity": f"{rng.randint(1, 3)} tsp per 500g",
+                "pairs_with_ingredients": ",".join(rng.sample(self.ingredients[:100], 5)),
+                "pairs_with_recipes": "",
+            }
+            for name in SPICES
+        ]
+
+    def recipe_name(self, index: int) -> str:
+        return f"{DISHES[index % len(DISHES)]} {index:06d}"
+
+    def recipe(self, index: int) -> dict:
+        """Rebuild recipe `index` in the payload format accepted by `add_recipe`."""
+        rng = random.Random(self.seed * 1_000_003 + index)
+        wanted = rng.randint(4, 12)
+        picked = []
+        while len(picked) < wanted:
+            (name,) = rng.choices(self.ingredients, cum_weights=self._ingredient_weights)
+            if name not in picked:
+                picked.append(name)
+        return {
+            "name": self.recipe_name(index),
+            "steps": "Prepare the ingredients, combine them and cook until done.",
+            "ingredients": [
+                {"name": name, "quantity": float(rng.randint(1, 500)), "unit": rng.choice(UNITS)}
+                for name in picked
+            ],
+            "spices": rng.sample(SPICES, rng.choices((0, 1, 2, 3), weights=(2, 3, 3, 2))[0]),
+        }
+
+    def iter_recipes(self):
+        for index in range(self.size):
+            yield self.recipe(index)
+
+
+@dataclass(frozen=True)
+class CatalogFiles:
+    recipes: Path
+    spices: Path
+
+
+def _sqlite_engine(path: Path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def build_database(catalog: Catalog, directory: str | Path, chunk: int = 5_000) -> CatalogFiles:
+    """
+    Write `catalog` into SQLite files under `directory`, reusing them if present.
+
+    Returns:
+        CatalogFiles: Paths of the recipes and spices databases.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"catalog-{catalog.label}-{catalog.seed}"
+    files = CatalogFiles(directory / f"{stem}-recipes.db", directory / f"{stem}-spices.db")
+    if files.recipes.exists() and files.spices.exists():
+        return files
+
+    partial = CatalogFiles(files.recipes.with_suffix(".tmp"), files.spices.with_suffix(".tmp"))
+    for path in (partial.recipes, partial.spices):
+        path.unlink(missing_ok=True)
+
+    ingredient_ids = {name: i + 1 for i, name in enumerate(catalog.ingredients)}
+    spice_ids = {spice["name"]: i + 1 for i, spice in enumerate(catalog.spices)}
+    pairs = Counter()
+
+    main, spice = _sqlite_engine(partial.recipes), _sqlite_engine(partial.spices)
+    try:
+        for engine in (main, spice):
+            Base.metadata.create_all(bind=engine)
+
+        with main.begin() as conn, bulk_load_search_index(conn):
+            conn.execute(insert(Ingredient), [
+                {"id": i, "name": name, "unit": "Grm"} for name, i in ingredient_ids.items()
+            ])
+            recipes, links, recipe_spices = [], [], []
+            for index, payload in enumerate(catalog.iter_recipes(), start=1):
+                recipes.append({"id": index, "name": payload["name"], "steps": payload["steps"]})
+                for ing in payload["ingredients"]:
+                    links.append({
+                        "recipe_id": index,
+                        "ingredient_id": ingredient_ids[ing["name"]],
+                        "quantity": ing["quantity"],
+                    })
+                for name in payload["spices"]:
+                    recipe_spices.append({"recipe_id": index, "spice_id": spice_ids[name]})
+                    pairs.update((spice_ids[name], ing["name"]) for ing in payload["ingredients"])
+                if len(recipes) >= chunk:
+                    _flush_rows(conn, recipes, links, recipe_spices)
+            _flush_rows(conn, recipes, links, recipe_spices)
+
+        with spice.begin() as conn:
+            conn.execute(insert(Spice), [{"id": spice_ids[s["name"]], **s} for s in catalog.spices])
+            conn.execute(insert(SpicePairing), [
+                {"spice_id": spice_id, "ingredient": ingredient, "co_occurrences": count}
+                for (spice_id, ingredient), count in pairs.items()
+            ])
+    finally:
+        main.dispose()
+        spice.dispose()
+
+    partial.recipes.replace(files.recipes)
+    partial.spices.replace(files.spices)
+    return files
+
+
+def _flush_rows(conn, recipes, links, recipe_spices):
+    for model, rows in ((Recipe, recipes), (RecipeIngredient, links), (RecipeSpice, recipe_spices)):
+        if rows:
+            conn.execute(insert(model), rows)
+            rows.clear()
+
+
+@contextmanager
+def use_catalog(files: CatalogFiles):
+    """
+    Bind every manager to a private copy of a built catalog.
+
+    The copy lives in a temporary directory, so write benchmarks never change
+    the cached files, and is migrated to the current schema first. Background
+    learning jobs are flushed and in-memory indexes dropped around the switch.
+    """
+    from app.core.modules.spices.spices_manager import learning_queue
+    from app.core.fuzzy_index import ingredient_names, spice_names
+    from app.core.pantry_matcher import matcher
+
+    main_factory, spice_factory = db_manager.SessionLocal, spices_models.SessionLocal
+    main_bind, spice_bind = main_factory.kw.get("bind"), spice_factory.kw.get("bind")
+
+    with tempfile.TemporaryDirectory(prefix="panaceia-bench-") as tmp:
+        recipes_copy = Path(shutil.copy(files.recipes, tmp))
+        spices_copy = Path(shutil.copy(files.spices, tmp))
+        main, spice = _sqlite_engine(recipes_copy), _sqlite_engine(spices_copy)
+        migrate(main)
+        migrate(spice)
+        main_factory.configure(bind=main)
+        spice_factory.configure(bind=spice)
+        indexes = (matcher, ingredient_names, spice_names)
+        for index in indexes:
+            index.invalidate()
+        try:
+            yield
+        finally:
+            learning_queue.flush(timeout=60)
+            main_factory.configure(bind=main_bind)
+            spice_factory.configure(bind=spice_bind)
+            for index in indexes:
+                index.invalidate()
+            main.dispose()
+            spice.dispose()
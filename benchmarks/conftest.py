@@ -0,0 +1,77 @@
+"""
+Benchmark fixtures for pytest.
+
+`bench_*.py` modules are only collected when the `benchmarks` directory (or
+one of its files) is passed on the command line, so the regular test run never
+picks them up. Catalog sizes come from PANACEIA_BENCH_SIZES (default "1k").
+
+When pytest-benchmark is installed its `benchmark` fixture is used; otherwise
+the local harness provides a compatible one and prints a summary table.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from benchmarks.catalog import Catalog, build_database, parse_size, use_catalog
+from benchmarks.harness import Benchmark, format_table, result_key, write_results
+
+BENCH_DIR = Path(__file__).parent
+SIZES = [s for s in os.environ.get("PANACEIA_BENCH_SIZES", "1k").split(",") if s.strip()]
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+_results = {}
+
+
+def _requested(config) -> bool:
+    for arg in config.args:
+        path = Path(arg.split("::")[0]).resolve()
+        if path == BENCH_DIR or BENCH_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_collect_file(file_path, parent):
+    if (
+        file_path.suffix == ".py"
+        and file_path.name.startswith("bench_")
+        and not parent.session.isinitpath(file_path)
+        and _requested(parent.config)
+    ):
+        return pytest.Module.from_parent(parent, path=file_path)
+
+
+@pytest.fixture(scope="session", params=SIZES)
+def catalog_files(request, tmp_path_factory):
+    catalog = Catalog(parse_size(request.param))
+    cache = os.environ.get("PANACEIA_BENCH_CACHE") or tmp_path_factory.mktemp("catalogs")
+    return catalog, build_database(catalog, cache)
+
+
+@pytest.fixture
+def catalog(catalog_files):
+    catalog, files = catalog_files
+    with use_catalog(files):
+        yield catalog
+
+
+if not HAS_PYTEST_BENCHMARK:
+    @pytest.fixture
+    def benchmark(request, catalog_files):
+        bench = Benchmark(result_key(request.node.originalname, catalog_files[0].label))
+        yield bench
+        if bench.timings:
+            _results[bench.name] = bench.stats
+
+    def pytest_terminal_summary(terminalreporter):
+        if _results:
+            terminalreporter.write_line(format_table(_results))
+            output = os.environ.get("PANACEIA_BENCH_OUTPUT")
+            if output:
+                write_results(output, _results, {"sizes": SIZES})
@@ -0,0 +1,179 @@
+"""
+harness.py
+
+Timing, result files and regression checks for the benchmarks.
+
+`Benchmark` mirrors the calling convention of the pytest-benchmark fixture
+(`benchmark(fn, *args)` and `benchmark.pedantic(...)`), so the same benchmark
+functions run under pytest and under `benchmarks.run`. Results are plain JSON
+keyed by `<case>[<size>]`, which keeps them diffable between releases.
+
+Author: Rafael Kaher
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+DEFAULT_THRESHOLD = 0.2
+
+
+class Benchmark:
+    """
+    Times a callable over several rounds and keeps summary statistics.
+
+    Args:
+        name (str): Result key, e.g. `get_recipe_by_name[10k]`.
+        min_rounds (int): Rounds always run by `__call__`.
+        min_time (float): Seconds `__call__` keeps adding rounds for.
+        max_rounds (int): Upper bound on rounds run by `__call__`.
+        warmup_rounds (int): Untimed calls made first.
+
+    Example:
+        ```python
+        benchmark = Benchmark("normalize[1k]")
+        benchmark(normalize_universal_input, {"name": " panCAkes "})
+        benchmark.stats["median"]
+        ```
+    """
+
+    def __init__(self, name, min_rounds=5, min_time=0.2, max_rounds=1_000, warmup_rounds=1):
+        self.name = name
+        self.min_rounds = min_rounds
+        self.min_time = min_time
+        self.max_rounds = max_rounds
+        self.warmup_rounds = warmup_rounds
+        self.timings = []
+
+    def __call__(self, fn, *args, **kwargs):
+        for _ in range(self.warmup_rounds):
+            fn(*args, **kwargs)
+        started = perf_counter()
+        result = None
+        while len(self.timings) < self.max_rounds and (
+            len(self.timings) < self.min_rounds or perf_counter() - started < self.min_time
+        ):
+            result = self._timed(fn, args, kwargs)
+        return result
+
+    def pedantic(self, target, args=(), kwargs=None, setup=None, rounds=1, iterations=1, warmup_rounds=0):
+        """Run exactly `rounds` timed rounds; `setup()` may return fresh `(args, kwargs)`."""
+        result = None
+        for round_number in range(warmup_rounds + rounds):
+            call_args, call_kwargs = args, kwargs or {}
+            if setup is not None:
+                prepared = setup()
+                if prepared is not None:
+                    call_args, call_kwargs = prepared
+            if round_number < warmup_rounds:
+                target(*call_args, **call_kwargs)
+                continue
+            started = perf_counter()
+            for _ in range(iterations):
+                result = target(*call_args, **call_kwargs)
+            self.timings.append((perf_counter() - started) / iterations)
+        return result
+
+    def _timed(self, fn, args, kwargs):
+        started = perf_counter()
+        result = fn(*args, **kwargs)
+        self.timings.append(perf_counter() - started)
+        return result
+
+    @property
+    def stats(self) -> dict:
+        """Summary in seconds: rounds, min, max, mean, median, stddev and p95."""
+        timings = sorted(self.timings)
+        if not timings:
+            return {"rounds": 0}
+        return {
+            "rounds": len(timings),
+            "min": timings[0],
+            "max": timings[-1],
+            "mean": statistics.fmean(timings),
+            "median": statistics.median(timings),
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "p95": timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))],
+        }
+
+
+def result_key(case: str, size_label: str) -> str:
+    """Key under which a case is stored, e.g. `list_recipes[10k]`."""
+    return f"{case.removeprefix('test_')}[{size_label}]"
+
+
+def machine_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "commit": commit,
+    }
+
+
+def write_results(path: str | Path, results: dict, meta: dict | None = None):
+    """Write `{"meta": ..., "benchmarks": {key: stats}}` as sorted, indented JSON."""
+    document = {"meta": {**machine_info(), **(meta or {})}, "benchmarks": results}
+    Path(path).write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+
+
+def load_results(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text())["benchmarks"]
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Compare medians of the benchmarks present in both result sets.
+
+    Args:
+        current (dict): Stats keyed by result key.
+        baseline (dict): Stats from a previous run.
+        threshold (float): Allowed slowdown, 0.2 meaning 20% slower.
+
+    Returns:
+        list[dict]: One row per shared key with `change` and `regression` flags.
+
+    Example:
+        ```python
+        compare({"a[1k]": {"median": 1.3}}, {"a[1k]": {"median": 1.0}})
+        # Returns: [{"name": "a[1k]", ..., "change": 0.3, "regression": True}]
+        ```
+    """
+    rows = []
+    for name in sorted(current.keys() & baseline.keys()):
+        before, after = baseline[name].get("median"), current[name].get("median")
+        if not before or after is None:
+            continue
+        change = after / before - 1
+        rows.append({
+            "name": name,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def format_table(results: dict, comparison: list[dict] | None = None) -> str:
+    changes = {row["name"]: row for row in comparison or []}
+    lines = [f"{'benchmark':<40} {'median ms':>11} {'p95 ms':>10} {'rounds':>7} {'change':>9}"]
+    for name, stats in sorted(results.items()):
+        row = changes.get(name)
+        change = f"{row['change']:+.1%}{' !' if row['regression'] else ''}" if row else "-"
+        lines.append(
+            f"{name:<40} {stats['median'] * 1000:>11.3f} {stats['p95'] * 1000:>10.3f} "
+            f"{stats['rounds']:>7} {change:>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,270 @@
+"""
+loadtest.py
+
+HTTP load generator for the PanaceIA API.
+
+Virtual users pick scenarios from a weighted read/write mix and fire them
+back to back against the FastAPI `app`:
+
+    - browse:  GET  /recipes/
+    - detail:  GET  /recipes/{name}
+    - suggest: GET  /spices/suggest/{recipe_name}
+    - import:  POST /import/recipe, then POST /recipes/ with the cleaned payload
+
+By default requests go through `httpx.ASGITransport`, in-process, against a
+synthetic catalog; `--uvicorn` serves the same app on a local port and `--url`
+targets a server that is already running. The report gives throughput and
+p50/p95/p99 latency per route.
+
+    python -m benchmarks.loadtest --users 20 --duration 15 --size 10k
+    python -m benchmarks.loadtest --mix browse=1,detail=6,suggest=2,import=1 --output load.json
+
+Author: Rafael Kaher
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager, nullcontext
+from itertools import count
+from pathlib import Path
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.bench_managers import messy
+from benchmarks.catalog import Catalog, build_database, parse_size, use_catalog
+
+DEFAULT_MIX = {"browse": 2, "detail": 5, "suggest": 2, "import": 1}
+
+
+def parse_mix(spec: str) -> dict:
+    """
+    Parse a scenario mix such as `browse=1,detail=4`.
+
+    Example:
+        ```python
+        parse_mix("detail=3, import=1")
+        # Returns: {"detail": 3.0, "import": 1.0}
+        ```
+    """
+    mix = {}
+    for entry in spec.split(","):
+        name, _, weight = entry.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario '{name}', expected one of {sorted(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class LoadRun:
+    """
+    One load-test run: the scenarios, their shared state and the raw samples.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app or to a server.
+        names (list[str]): Recipe names used by detail and suggest.
+        catalog (Catalog): Source of payloads for the import scenario.
+        seed (int): Seed for scenario choice and data picks.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, names: list[str], catalog: Catalog, seed: int = 1):
+        self.client = client
+        self.names = names
+        self.catalog = catalog
+        self.rng = random.Random(seed)
+        self.serial = count()
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def _request(self, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        self.samples.setdefault(route, []).append(time.perf_counter() - started)
+        if failed:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        return response
+
+    async def browse(self):
+        await self._request("GET /recipes/", "GET", "/recipes/")
+
+    async def detail(self):
+        name = quote(self.rng.choice(self.names), safe="")
+        await self._request("GET /recipes/{name}", "GET", f"/recipes/{name}")
+
+    async def suggest(self):
+        name = quote(self.rng.choice(self.names), safe="")
+        await self._request("GET /spices/suggest/{recipe_name}", "GET", f"/spices/suggest/{name}")
+
+    async def import_recipe(self):
+        serial = next(self.serial)
+        payload = self.catalog.recipe(self.rng.randrange(self.catalog.size))
+        payload["name"] = f"Load {payload['name']} {serial} {self.rng.getrandbits(32):08x}"
+        imported = await self._request("POST /import/recipe", "POST", "/import/recipe", json=messy(payload))
+        if imported is None or imported.status_code >= 400:
+            return
+        body = imported.json()
+        if body.get("status") == "success":
+            await self._request("POST /recipes/", "POST", "/recipes/", json=body["data"])
+
+    async def run(self, mix: dict, users: int, duration: float | None = None, max_requests: int | None = None) -> dict:
+        """
+        Drive `users` concurrent virtual users until `duration` seconds have passed
+        or `max_requests` scenarios have been started, then return the report.
+        """
+        scenarios = {
+            "browse": self.browse,
+            "detail": self.detail,
+            "suggest": self.suggest,
+            "import": self.import_recipe,
+        }
+        names = [name for name, weight in mix.items() if weight > 0]
+        weights = [mix[name] for name in names]
+        started = time.perf_counter()
+        deadline = started + duration if duration else math.inf
+        budget = count()
+
+        async def user():
+            while time.perf_counter() < deadline:
+                if max_requests is not None and next(budget) >= max_requests:
+                    return
+                (choice,) = self.rng.choices(names, weights=weights)
+                await scenarios[choice]()
+
+        await asyncio.gather(*(user() for _ in range(users)))
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            routes[route] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(route, 0),
+                "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p95_ms": percentile(ordered, 95) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "elapsed_s": elapsed,
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "routes": routes,
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_s']:.1f}s "
+        f"→ {report['throughput_rps']:.1f} req/s, {report['errors']} errors",
+        f"{'route':<36} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for route, stats in report["routes"].items():
+        lines.append(
+            f"{route:<36} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def serve_with_uvicorn(app):
+    """Serve `app` on a free local port from a background thread; yield its base URL."""
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="loadtest-uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+async def _main(args) -> dict:
+    from app.main import app
+
+    catalog = Catalog(parse_size(args.size), args.seed)
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    limits = httpx.Limits(max_connections=args.users)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            listed = (await client.get("/recipes/")).json().get("data", [])
+            names = [recipe["name"] for recipe in listed] or [catalog.recipe_name(0)]
+            return await LoadRun(client, names, catalog, args.seed).run(mix, args.users, args.duration, args.requests)
+
+    print(f"→ preparing {catalog.label} catalog", file=sys.stderr)
+    files = build_database(catalog, args.cache_dir)
+    names = [catalog.recipe_name(i) for i in range(catalog.size)]
+
+    with use_catalog(files):
+        server = serve_with_uvicorn(app) if args.uvicorn else nullcontext(None)
+        async with server as base_url:
+            client_args = (
+                {"base_url": base_url}
+                if base_url else
+                {"transport": httpx.ASGITransport(app=app), "base_url": "http://panaceia"}
+            )
+            async with httpx.AsyncClient(limits=limits, timeout=60, **client_args) as client:
+                run = LoadRun(client, names, catalog, args.seed)
+                return await run.run(mix, args.users, args.duration, args.requests)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run a mixed HTTP workload against the PanaceIA API.")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, help="seconds to run (default 10 unless --requests)")
+    parser.add_argument("--requests", type=int, help="stop after this many scenarios instead")
+    parser.add_argument("--mix", help="scenario weights, e.g. browse=2,detail=5,suggest=2,import=1")
+    parser.add_argument("--size", default="1k", help="catalog size for in-process runs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--uvicorn", action="store_true", help="serve the app on a local uvicorn port")
+    parser.add_argument("--url", help="target an already running server instead")
+    parser.add_argument("--cache-dir", default=str(Path(__file__).parent.parent / ".benchmarks"))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+
+    report = asyncio.run(_main(args))
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+run.py
+
+Standalone benchmark runner.
+
+    python -m benchmarks.run --sizes 1k,10k --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 0.15
+
+Every `test_*` function of the `benchmarks/bench_*.py` modules is run once per
+catalog size. With `--baseline`, medians are compared and the process exits
+with status 1 when any benchmark is slower than the threshold allows.
+
+Author: Rafael Kaher
+"""
+
+import argparse
+import importlib
+import inspect
+import os
+import sys
+from pathlib import Path
+
+from benchmarks.catalog import Catalog, build_database, parse_size, use_catalog
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD,
+    Benchmark,
+    compare,
+    format_table,
+    load_results,
+    result_key,
+    write_results,
+)
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_CACHE = BENCH_DIR.parent / ".benchmarks"
+
+
+def discover(pattern: str | None = None):
+    """Yield `(module_name, case_name, function)` for every benchmark case."""
+    for path in sorted(BENCH_DIR.glob("bench_*.py")):
+        module = importlib.import_module(f"benchmarks.{path.stem}")
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("test_") and fn.__module__ == module.__name__:
+                if pattern is None or pattern in name:
+                    yield path.stem, name, fn
+
+
+def run_suite(sizes, cache_dir=DEFAULT_CACHE, pattern=None, seed=1) -> dict:
+    """Run every discovered case against each catalog size and return stats by key."""
+    results = {}
+    cases = list(discover(pattern))
+    for label in sizes:
+        catalog = Catalog(parse_size(label), seed)
+        print(f"→ preparing {catalog.label} catalog", file=sys.stderr)
+        files = build_database(catalog, cache_dir)
+        for _, name, fn in cases:
+            key = result_key(name, catalog.label)
+            benchmark = Benchmark(key)
+            print(f"  • {key}", file=sys.stderr)
+            with use_catalog(files):
+                fixtures = {"benchmark": benchmark, "catalog": catalog}
+                fn(**{p: fixtures[p] for p in inspect.signature(fn).parameters})
+            results[key] = benchmark.stats
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the PanaceIA benchmark suite.")
+    parser.add_argument("--sizes", default=os.environ.get("PANACEIA_BENCH_SIZES", "1k"),
+                        help="comma-separated catalog sizes, e.g. 1k,10k,100k")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE))
+    args = parser.parse_args(argv)
+
+    sizes = [s for s in args.sizes.split(",") if s.strip()]
+    results = run_suite(sizes, args.cache_dir, args.pattern, args.seed)
+
+    if args.output:
+        write_results(args.output, results, {"sizes": sizes, "seed": args.seed})
+
+    comparison = compare(results, load_results(args.baseline), args.threshold) if args.baseline else []
+    print(format_table(results, comparison))
+
+    regressions = [row for row in comparison if row["regression"]]
+    for row in regressions:
+        print(f"✗ {row['name']} regressed {row['change']:+.1%} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,8 +21,12 @@ from sqlalchemy.orm import sessionmaker, Session, close_all_sessions
 from fastapi.testclient import TestClient
 from app.main import app
 from app.core import db_manager
+from app.core.pantry_matcher import matcher as pantry_matcher
+from app.core.fuzzy_index import ingredient_names, spice_names
 from app.core.db_manager import Base, engine as main_engine
 from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import engine as spice_engine
+from app.core.modules.spices.spices_manager import learning_queue
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -46,7 +50,6 @@ def setup_test_dbs(monkeypatch):
     Base.metadata.create_all(bind=main_engine)
 
     # 3️⃣ Reset spices DB schema
-    spice_engine = spices_models.engine
     SpiceSessionLocal = sessionmaker(bind=spice_engine)
     spices_models.Base.metadata.drop_all(bind=spice_engine)
     spices_models.Base.metadata.create_all(bind=spice_engine)
@@ -59,9 +62,14 @@ def setup_test_dbs(monkeypatch):
         override_spice_session
     )
 
+    # The schema reset bypasses the ORM, so in-memory indexes start over
+    for index in (pantry_matcher, ingredient_names, spice_names):
+        index.invalidate()
+
     try:
         yield
     finally:
+        learning_queue.flush(timeout=10)
         close_all_sessions()
 
 
@@ -0,0 +1,29 @@
+from benchmarks.catalog import Catalog, parse_size
+from benchmarks.harness import Benchmark, compare
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    baseline = {"a[1k]": {"median": 1.0}, "b[1k]": {"median": 1.0}, "gone[1k]": {"median": 1.0}}
+    current = {"a[1k]": {"median": 1.1}, "b[1k]": {"median": 1.5}, "new[1k]": {"median": 9.0}}
+
+    rows = {row["name"]: row for row in compare(current, baseline, threshold=0.2)}
+
+    assert set(rows) == {"a[1k]", "b[1k]"}
+    assert not rows["a[1k]"]["regression"]
+    assert rows["b[1k]"]["regression"]
+
+
+def test_benchmark_pedantic_uses_fresh_setup_arguments():
+    seen = []
+    bench = Benchmark("case[1k]")
+
+    bench.pedantic(seen.append, setup=lambda: ((len(seen),), {}), rounds=3)
+
+    assert seen == [0, 1, 2]
+    assert bench.stats["rounds"] == 3
+
+
+def test_catalog_is_reproducible():
+    assert parse_size("10k") == 10_000
+    assert Catalog(1_000, seed=7).recipe(5) == Catalog(1_000, seed=7).recipe(5)
+    assert Catalog(1_000, seed=7).recipe(5) != Catalog(1_000, seed=8).recipe(5)
@@ -0,0 +1,65 @@
+from sqlalchemy import text
+
+from app.core import catalog_image
+from app.core.db_manager import engine
+from app.core.modules.recipes.recipes_manager import get_recipe_by_name
+from app.core.modules.spices.spices_manager import suggest_spices_for_recipe
+
+
+def seed(client):
+    for name, ingredient in (("Pancakes", "Flour"), ("Tomato Soup", "Tomato")):
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": "Cook",
+            "ingredients": [{"name": ingredient, "quantity": 1, "unit": "Unit"}],
+        })
+    client.post("/import/spice", json={"name": "Basil", "pairs_with_ingredients": "Tomato"})
+
+
+def use_image(monkeypatch, root):
+    monkeypatch.setattr(catalog_image, "CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(catalog_image, "image", catalog_image.CatalogImage(root))
+
+
+def drop_behind_the_orm(name):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM recipes WHERE name = :name"), {"name": name})
+
+
+def test_reads_are_served_from_the_published_image(test_client, tmp_path, monkeypatch):
+    seed(test_client)
+    catalog_image.publish(tmp_path)
+    use_image(monkeypatch, tmp_path)
+
+    drop_behind_the_orm("Tomato Soup")
+
+    assert get_recipe_by_name("tomato soup")["data"]["ingredients"][0]["name"] == "Tomato"
+    assert [s["name"] for s in suggest_spices_for_recipe("Tomato Soup")] == ["Basil"]
+    assert get_recipe_by_name("Gazpacho")["status"] == "error"
+
+
+def test_local_writes_fall_back_to_the_database(test_client, tmp_path, monkeypatch):
+    seed(test_client)
+    catalog_image.publish(tmp_path)
+    use_image(monkeypatch, tmp_path)
+
+    test_client.put("/recipes/name", json={"old_name": "Pancakes", "new_name": "Crepes"})
+
+    assert get_recipe_by_name("Pancakes")["status"] == "error"
+    assert get_recipe_by_name("Crepes")["data"]["name"] == "Crepes"
+
+
+def test_publish_swaps_current_and_prunes_old_versions(test_client, tmp_path, monkeypatch):
+    seed(test_client)
+    first = catalog_image.publish(tmp_path)
+    use_image(monkeypatch, tmp_path)
+    assert catalog_image.image.current().counts["recipes"] == 2
+
+    drop_behind_the_orm("Pancakes")
+    second = catalog_image.publish(tmp_path, keep=1)
+
+    assert catalog_image.image.current().counts["recipes"] == 1
+    assert catalog_image.image.version == second
+    assert (tmp_path / "CURRENT").read_text() == second
+    assert not (tmp_path / first).exists()
+    assert get_recipe_by_name("Pancakes")["status"] == "error"
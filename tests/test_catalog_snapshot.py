@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.core.catalog_snapshot import MANIFEST, export_snapshot, load_snapshot
+
+
+def seed(client):
+    client.post("/recipes/", json={
+        "name": "Pancakes",
+        "steps": "Mix and fry.",
+        "ingredients": [
+            {"name": "Flour", "quantity": 200, "unit": "Grm"},
+            {"name": "Milk", "quantity": 300, "unit": "Mls"},
+        ],
+    })
+    client.post("/recipes/", json={
+        "name": "Crème Brûlée",
+        "steps": "Bake slowly.",
+        "ingredients": [{"name": "Milk", "quantity": 500, "unit": "Mls"}],
+    })
+    client.post("/import/spice", json={"name": "Vanilla", "flavor_profile": "Sweet", "pairs_with_ingredients": "Milk"})
+
+
+def test_round_trip_is_memory_mapped(test_client, tmp_path):
+    seed(test_client)
+
+    manifest = export_snapshot(tmp_path)
+    snapshot = load_snapshot(tmp_path)
+
+    assert manifest["counts"]["recipes"] == 2 and manifest["counts"]["links"] == 3
+    assert isinstance(snapshot["recipes.id"], np.memmap)
+    assert snapshot["recipes.links"].tolist() == [0, 2, 3]
+    assert snapshot.recipe(1)["name"] == "Crème Brûlée"
+    assert sorted(i["name"] for i in snapshot.recipe(0)["ingredients"]) == ["Flour", "Milk"]
+    assert snapshot.strings.decode(snapshot["spices.name"]) == ["Vanilla"]
+    assert snapshot.strings[-1] is None
+
+
+def test_rejects_unfinished_or_foreign_snapshots(test_client, tmp_path):
+    seed(test_client)
+    export_snapshot(tmp_path)
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+
+    manifest["columns"]["recipes.id"]["length"] = 5
+    (tmp_path / MANIFEST).write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="recipes.id"):
+        load_snapshot(tmp_path)
+
+    manifest["version"] = 99
+    (tmp_path / MANIFEST).write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="expected"):
+        load_snapshot(tmp_path)
+
+    with pytest.raises(ValueError, match="no catalog snapshot"):
+        load_snapshot(tmp_path / "missing")
@@ -6,7 +6,8 @@ from app.core.data_cleaner import (
     normalize_quantity,
     normalize_unit,
     validate_and_clean_ingredient,
-    validate_and_clean_recipe
+    validate_and_clean_recipe,
+    validate_and_normalize_recipe
 )
 
 def test_normalize_string():
@@ -127,4 +128,31 @@ def test_full_scenario_cleaning():
     }
 
     result = normalize_universal_input(messy_input)
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+def test_validate_and_normalize_recipe_cleans_in_one_pass():
+    result = validate_and_normalize_recipe({
+        "name": " panCakes ",
+        "steps": "Mix and fry",
+        "ingredients": [{"name": "flour", "quantity": "200", "unit": "gramas"}],
+        "spices": ["Cinnamon"],
+    })
+    assert result == {"status": "success", "data": {
+        "name": "Pancakes",
+        "steps": "Mix and fry",
+        "ingredients": [{"name": "Flour", "quantity": 200.0, "unit": "Grm"}],
+        "spices": ["Cinnamon"],
+    }}
+
+def test_validate_and_normalize_recipe_reports_every_problem():
+    result = validate_and_normalize_recipe({
+        "name": "Soup",
+        "steps": "Boil",
+        "ingredients": [
+            {"name": "Leek", "quantity": ""},
+            {"name": "Salt", "quantity": "a pinch", "unit": "unit"},
+            {"name": "Water", "quantity": 1, "unit": "l"},
+        ],
+    })
+    assert result["status"] == "error"
+    assert result["message"] == "Invalid quantity for ingredient 'Leek'"
+    assert [e["field"] for e in result["errors"]] == ["ingredients[0].quantity", "ingredients[1].quantity"]
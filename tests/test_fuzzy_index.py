@@ -0,0 +1,102 @@
+from sqlalchemy import delete
+
+from app.core.fuzzy_index import FuzzyIndex, levenshtein
+from app.core.db_manager import Ingredient, RecipeIngredient, engine
+
+
+def add(client, name, ingredients, fix_typos=False):
+    return client.post("/recipes/", params={"fix_typos": fix_typos}, json={
+        "name": name,
+        "steps": "Cook",
+        "ingredients": [{"name": i, "quantity": 1, "unit": "Unit"} for i in ingredients],
+    }).json()
+
+
+def test_index_resolves_single_close_name_only():
+    index = FuzzyIndex(["Tomato", "Potato", "Red Bean", "Red Beet", "Egg"])
+
+    assert index.resolve("TOMATO") == "Tomato"
+    assert index.resolve("Tomatoe") == "Tomato"
+    assert index.resolve("Red Beat") is None  # as close to Bean as to Beet
+    assert index.resolve("Eggs") is None  # too short to rewrite
+    assert index.suggest("potatoe") == [("Potato", 1)]
+    assert index.suggest("otato") == [("Potato", 1), ("Tomato", 2)]
+
+    index.discard("Tomato")
+    assert index.resolve("Tomatoe") is None
+
+
+def test_levenshtein_gives_up_past_limit():
+    assert levenshtein("kitten", "sitting", 3) == 3
+    assert levenshtein("kitten", "sitting", 2) == 3
+    assert levenshtein("flour", "flour", 0) == 0
+
+
+def test_add_recipe_reuses_existing_ingredient(test_client):
+    add(test_client, "Salad", ["Tomato", "Lettuce"])
+
+    body = add(test_client, "Sauce", ["Tomatoe", "Garlic"], fix_typos=True)
+
+    assert body["resolved"] == {"Tomatoe": "Tomato"}
+    names = [i["name"] for i in test_client.get("/ingredients/").json()]
+    assert sorted(names) == ["Garlic", "Lettuce", "Tomato"]
+
+
+def test_add_recipe_keeps_close_names_by_default(test_client):
+    add(test_client, "Sandwich", ["Mustard", "Butter"])
+
+    body = add(test_client, "Trifle", ["Custard", "Batter"])
+
+    assert "resolved" not in body
+    assert body["suggestions"] == {"Custard": ["Mustard"], "Batter": ["Butter"]}
+    names = [i["name"] for i in test_client.get("/ingredients/").json()]
+    assert sorted(names) == ["Batter", "Butter", "Custard", "Mustard"]
+
+
+def test_stale_index_entry_is_stored_as_given(test_client):
+    add(test_client, "Salad", ["Tomato"])
+    test_client.get("/ingredients/Tomatto")  # build the index
+    with engine.begin() as conn:  # behind the index's back
+        conn.execute(delete(RecipeIngredient))
+        conn.execute(delete(Ingredient))
+
+    body = test_client.post("/import/recipe", params={"mode": "replace", "fix_typos": True}, json={
+        "name": "Sauce", "steps": "Cook", "ingredients": [{"name": "Tomatoe", "quantity": 1, "unit": "Unit"}]
+    }).json()
+
+    assert body["status"] == "success"
+    assert [i["name"] for i in test_client.get("/ingredients/").json()] == ["Tomato"]
+
+
+def test_lookup_miss_suggests_and_index_follows_renames(test_client):
+    add(test_client, "Salad", ["Tomato"])
+
+    assert test_client.get("/ingredients/Tomatto").json()["suggestions"] == ["Tomato"]
+
+    test_client.put("/ingredients/name", json={"old_name": "Tomato", "new_name": "Cherry Tomato"})
+
+    assert test_client.get("/ingredients/Cherry Tomatto").json()["suggestions"] == ["Cherry Tomato"]
+    assert "suggestions" not in test_client.get("/ingredients/Tomatto").json()
+
+
+def test_spice_link_tolerates_typos(test_client):
+    add(test_client, "Apple Pie", ["Apple"])
+    test_client.post("/spices/", json={"name": "Cinnamon", "pairs_with_ingredients": ["Apple"]})
+
+    body = test_client.post("/spices/link", json={"spice_name": "cinamon", "recipe_name": "Apple Pie"}).json()
+
+    assert body["status"] == "success"
+    assert "Cinnamon" in body["message"]
+
+
+def test_import_rewrites_known_ingredients(test_client):
+    add(test_client, "Salad", ["Tomato"])
+
+    body = test_client.post("/import/recipe", params={"fix_typos": True}, json={
+        "name": "Soup",
+        "steps": "Boil",
+        "ingredients": [{"name": "tomatoe", "quantity": "2", "unit": "unit"}],
+    }).json()
+
+    assert body["data"]["ingredients"][0]["name"] == "Tomato"
+    assert body["resolved"] == {"Tomatoe": "Tomato"}
@@ -0,0 +1,174 @@
+def recipe(name, steps, **ingredients):
+    return {
+        "name": name,
+        "steps": steps,
+        "ingredients": [{"name": n, "quantity": q, "unit": "Grm"} for n, q in ingredients.items()],
+    }
+
+
+def ingredients(client, name):
+    data = client.get(f"/recipes/{name}").json()["data"]
+    return data["steps"], {i["name"]: i["quantity"] for i in data["ingredients"]}
+
+
+def test_bulk_import_modes(test_client):
+    first = test_client.post("/import/bulk?mode=skip", json=[recipe("Pancakes", "Fry", Flour=200, Milk=250)]).json()
+    assert first[0]["action"] == "created"
+
+    again = test_client.post("/import/bulk?mode=skip", json=[recipe("Pancakes", "Bake", Flour=1)]).json()
+    assert again[0]["action"] == "skipped"
+    assert ingredients(test_client, "Pancakes") == ("Fry", {"Flour": 200.0, "Milk": 250.0})
+
+    merged = test_client.post("/import/bulk?mode=merge", json=[recipe("Pancakes", "Whisk", Flour=300, Egg=2)]).json()
+    assert merged[0]["action"] == "merged"
+    assert ingredients(test_client, "Pancakes") == ("Whisk", {"Flour": 300.0, "Milk": 250.0, "Egg": 2.0})
+
+    replaced = test_client.post("/import/bulk?mode=replace", json=[recipe("Pancakes", "Fry", Oats=100)]).json()
+    assert replaced[0]["action"] == "replaced"
+    assert ingredients(test_client, "Pancakes") == ("Fry", {"Oats": 100.0})
+
+
+def test_bulk_import_keeps_per_item_errors(test_client):
+    body = test_client.post("/import/bulk?mode=skip", json=[
+        recipe("Bread", "Bake", Flour=500),
+        {"name": "Broken", "steps": "x", "ingredients": [{"name": "Salt", "quantity": "lots", "unit": "Grm"}]},
+        recipe("Bread", "Bake twice", Flour=1),
+    ]).json()
+
+    assert [item["status"] for item in body] == ["success", "error", "error"]
+    assert [r["name"] for r in test_client.get("/recipes/search", params={"q": "bake"}).json()["data"]] == ["Bread"]
+
+
+def test_import_without_mode_only_normalizes(test_client):
+    test_client.post("/import/bulk", json=[recipe("Bread", "Bake", Flour=500)])
+
+    assert test_client.get("/recipes/").json()["data"] == []
+
+
+def test_spice_import_modes(test_client):
+    spice = {"name": "Cinnamon", "flavor_profile": "Warm", "pairs_with_ingredients": ["Apple"]}
+    assert test_client.post("/import/spice", json=spice).json()["status"] == "success"
+
+    duplicate = test_client.post("/import/spice", json=spice).json()
+    assert duplicate["status"] == "error" and "already exists" in duplicate["message"]
+
+    merged = test_client.post("/import/bulkspices?mode=merge", json=[
+        {"name": "cinnamon", "pairs_with_ingredients": ["Banana", "apple"]},
+        {"name": "Clove", "flavor_profile": "Sharp"},
+    ]).json()
+    assert [item["action"] for item in merged] == ["merged", "created"]
+
+    stored = {s["name"]: s for s in test_client.get("/spices/").json()}
+    assert stored["Cinnamon"]["flavor_profile"] == "Warm"
+    assert stored["Cinnamon"]["pairs_with_ingredients"] == "Apple,Banana"
+
+
+def test_reimport_skips_unchanged_records(test_client):
+    feed = [recipe("Bread", "Bake", Flour=500), recipe("Soup", "Simmer", Leek=2)]
+    test_client.post("/import/bulk?mode=replace", json=feed)
+
+    feed[1] = recipe("Soup", "Simmer gently", Leek=3)
+    body = test_client.post("/import/bulk?mode=replace", json=feed).json()
+
+    assert [item["action"] for item in body] == ["unchanged", "replaced"]
+    assert ingredients(test_client, "Soup") == ("Simmer gently", {"Leek": 3.0})
+
+
+def test_spice_reimport_skips_unchanged_records(test_client):
+    feed = [{"name": "Cumin", "flavor_profile": "Earthy"}, {"name": "Mace", "flavor_profile": "Warm"}]
+    test_client.post("/import/bulkspices?mode=replace", json=feed)
+
+    feed[1]["flavor_profile"] = "Delicate"
+    body = test_client.post("/import/bulkspices?mode=replace", json=feed).json()
+
+    assert [item["action"] for item in body] == ["unchanged", "replaced"]
+
+
+def test_reimport_restores_records_edited_since(test_client):
+    feed = [recipe("waffles", "Bake", Flour=250), recipe("Crepes", "Fry", Milk=500)]
+    test_client.post("/import/bulk?mode=replace", json=feed)
+    test_client.patch("/recipes/Waffles", json={"operations": [{"op": "set_steps", "steps": "burn it"}]})
+    test_client.put("/recipes/name", json={"old_name": "Crepes", "new_name": "Galettes"})
+
+    body = test_client.post("/import/bulk?mode=replace", json=feed).json()
+
+    assert [item["action"] for item in body] == ["replaced", "created"]
+    assert ingredients(test_client, "Waffles") == ("Bake", {"Flour": 250.0})
+
+    again = test_client.post("/import/bulk?mode=replace", json=feed).json()
+    assert [(item["name"], item["action"]) for item in again] == [("Waffles", "unchanged"), ("Crepes", "unchanged")]
+
+
+def test_reimport_restores_records_whose_ingredients_changed(test_client):
+    feed = [recipe("Crepes", "Fry", Milk=500)]
+    test_client.post("/import/bulk?mode=replace", json=feed)
+    test_client.put("/ingredients/batch", json={"items": [{"name": "Milk", "new_name": "Oat Milk"}]})
+
+    body = test_client.post("/import/bulk?mode=replace", json=feed).json()
+
+    assert body[0]["action"] == "replaced"
+    assert ingredients(test_client, "Crepes") == ("Fry", {"Milk": 500.0})
+
+
+def test_merged_records_are_not_reported_unchanged(test_client):
+    test_client.post("/import/bulk?mode=replace", json=[recipe("Bread", "Bake", Flour=500, Salt=5)])
+    merged = [recipe("Bread", "Bake", Flour=450)]
+    test_client.post("/import/bulk?mode=merge", json=merged)
+    test_client.post("/import/bulk?mode=replace", json=[recipe("Bread", "Bake", Flour=500, Salt=5)])
+
+    assert test_client.post("/import/bulk?mode=merge", json=merged).json()[0]["action"] == "merged"
+
+
+def test_spice_reimport_restores_updated_spice(test_client):
+    feed = [{"name": "Cumin", "flavor_profile": "Earthy"}]
+    test_client.post("/import/bulkspices?mode=replace", json=feed)
+    test_client.put("/spices/", json={"name": "Cumin", "flavor_profile": "Smoky"})
+
+    assert test_client.post("/import/bulkspices?mode=replace", json=feed).json()[0]["action"] == "replaced"
+    assert {s["name"]: s for s in test_client.get("/spices/").json()}["Cumin"]["flavor_profile"] == "Earthy"
+
+
+def test_feed_validation_reports_errors_per_record(test_client):
+    body = test_client.post("/import/bulk?mode=skip", json=[
+        recipe("Bread", "Bake", Flour=500),
+        {"name": "Broken", "steps": "Mix", "ingredients": [{"name": "Salt", "quantity": "a pinch"}]},
+        {"steps": "No name"},
+    ]).json()
+
+    assert [item["status"] for item in body] == ["success", "error", "error"]
+    assert body[1]["errors"][0]["field"] == "ingredients[0].quantity"
+    assert body[2]["errors"][0]["field"] == "name"
+
+
+def test_feed_must_be_a_json_array(test_client):
+    assert test_client.post("/import/bulk", content=b'{"name": "Bread"}').status_code == 422
+    assert test_client.post("/import/bulkspices", content=b"not json").status_code == 422
+
+
+def test_spice_feed_accepts_partner_field_names(test_client):
+    body = test_client.post("/import/bulkspices?mode=skip", json=[
+        {"title": "Sumac", "taste": "Tangy", "recipes": "Fattoush, Kebab"},
+        {"title": 3},
+    ]).json()
+
+    assert [item["status"] for item in body] == ["success", "error"]
+    stored = {s["name"]: s for s in test_client.get("/spices/").json()}
+    assert stored["Sumac"]["pairs_with_recipes"] == "Fattoush,Kebab"
+
+
+def test_feed_records_are_validated_once(test_client, monkeypatch):
+    from app.core.modules.import_gateway import import_manager
+
+    def validated_again(raw):
+        raise AssertionError("feed record validated twice")
+
+    monkeypatch.setattr(import_manager, "validate_and_normalize_recipe", validated_again)
+    body = test_client.post("/import/bulk?mode=skip", json=[
+        {"name": "  panCakes ", "steps": "Fry", "ingredients": [{"name": "flour", "quantity": "200", "unit": " gramas"}]},
+        {"name": " ", "steps": "   ", "ingredients": [{"name": "Salt", "quantity": "nan"}]},
+    ]).json()
+
+    assert body[0]["data"]["name"] == "Pancakes" and body[0]["action"] == "created"
+    assert [e["field"] for e in body[1]["errors"]] == ["name", "steps", "ingredients[0].quantity"]
+    assert ingredients(test_client, "Pancakes") == ("Fry", {"Flour": 200.0})
+    assert test_client.get("/recipes/Pancakes").json()["data"]["ingredients"][0]["unit"] == "Grm"
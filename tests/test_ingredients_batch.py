@@ -0,0 +1,59 @@
+def names(client):
+    return sorted(i["name"] for i in client.get("/ingredients/").json())
+
+
+def test_batch_create_reports_each_item(test_client):
+    test_client.post("/ingredients/", json={"name": "Salt", "unit": "Grm"})
+
+    body = test_client.post("/ingredients/batch", json={"items": [
+        {"name": "eggs", "unit": "unit"},
+        {"name": "salt", "unit": "grm"},
+        {"name": "Flour", "unit": "grm"},
+        {"name": "FLOUR", "unit": "grm"},
+    ]}).json()
+
+    assert body["applied"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "error", "created", "error"]
+    assert names(test_client) == ["Eggs", "Flour", "Salt"]
+
+
+def test_atomic_batch_applies_nothing_on_error(test_client):
+    body = test_client.post("/ingredients/batch", json={"atomic": True, "items": [
+        {"name": "Eggs", "unit": "Unit"},
+        {"name": "Eggs", "unit": "Unit"},
+    ]}).json()
+
+    assert body["status"] == "error" and body["applied"] == 0
+    assert [r["status"] for r in body["results"]] == ["skipped", "error"]
+    assert names(test_client) == []
+
+
+def test_batch_update_renames_and_changes_units(test_client):
+    test_client.post("/ingredients/batch", json={"items": [
+        {"name": "Milk", "unit": "Mls"}, {"name": "Rice", "unit": "Kg"}, {"name": "Salt", "unit": "Grm"},
+    ]})
+
+    body = test_client.put("/ingredients/batch", json={"items": [
+        {"name": "milk", "new_name": "oat milk"},
+        {"name": "Rice", "new_unit": "gramas"},
+        {"name": "Salt", "new_name": "Rice"},
+        {"name": "Pepper", "new_unit": "grm"},
+    ]}).json()
+
+    assert [r["status"] for r in body["results"]] == ["updated", "updated", "error", "error"]
+    units = {i["name"]: i["unit"] for i in test_client.get("/ingredients/").json()}
+    assert units == {"Oat Milk": "Mls", "Rice": "Grm", "Salt": "Grm"}
+
+
+def test_batch_delete_refuses_ingredients_in_use(test_client):
+    test_client.post("/recipes/", json={
+        "name": "Omelette", "steps": "Cook",
+        "ingredients": [{"name": "Egg", "quantity": 2, "unit": "Unit"}],
+    })
+    test_client.post("/ingredients/", json={"name": "Saffron", "unit": "Grm"})
+
+    body = test_client.request("DELETE", "/ingredients/batch", json={"names": ["saffron", "Egg", "Truffle"]}).json()
+
+    assert [r["status"] for r in body["results"]] == ["deleted", "error", "error"]
+    assert "used by 1 recipe" in body["results"][1]["message"]
+    assert names(test_client) == ["Egg"]
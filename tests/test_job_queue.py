@@ -0,0 +1,37 @@
+from app.core.job_queue import JobQueue
+
+
+def test_jobs_are_batched_and_flushed():
+    batches = []
+    jobs = JobQueue(batches.append, batch_size=10, max_wait=0.2)
+
+    for i in range(25):
+        jobs.enqueue(i)
+
+    assert jobs.flush(timeout=5)
+    assert jobs.pending == 0
+    assert sorted(i for batch in batches for i in batch) == list(range(25))
+    assert all(len(batch) <= 10 for batch in batches)
+
+
+def test_failed_batches_are_retried_then_recorded():
+    attempts = []
+
+    def flaky(batch):
+        attempts.append(batch)
+        if len(attempts) < 2:
+            raise RuntimeError("database is locked")
+
+    jobs = JobQueue(flaky, retries=3, backoff=0)
+    jobs.enqueue("Pancakes")
+    assert jobs.flush(timeout=5)
+    assert len(attempts) == 2
+    assert not jobs.failed
+
+    def broken(batch):
+        raise RuntimeError("boom")
+
+    jobs = JobQueue(broken, retries=2, backoff=0)
+    jobs.enqueue("Omelette")
+    assert jobs.flush(timeout=5)
+    assert jobs.failed[0] == {"jobs": ["Omelette"], "error": "boom"}
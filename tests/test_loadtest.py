@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from benchmarks.catalog import Catalog
+from benchmarks.loadtest import LoadRun, parse_mix, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_mixed_workload_reports_every_route(test_client):
+    catalog = Catalog(50)
+    for i in range(3):
+        payload = catalog.recipe(i)
+        payload.pop("spices")
+        assert test_client.post("/recipes/", json=payload).status_code == 201
+
+    async def drive():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://panaceia") as client:
+            run = LoadRun(client, [catalog.recipe_name(i) for i in range(3)], catalog, seed=3)
+            return await run.run(parse_mix("browse=1,detail=1,suggest=1,import=1"), users=2, max_requests=40)
+
+    report = asyncio.run(drive())
+
+    assert report["errors"] == 0
+    assert {"GET /recipes/", "GET /recipes/{name}", "GET /spices/suggest/{recipe_name}",
+            "POST /import/recipe", "POST /recipes/"} <= set(report["routes"])
+    assert report["routes"]["GET /recipes/{name}"]["p99_ms"] >= report["routes"]["GET /recipes/{name}"]["p50_ms"]
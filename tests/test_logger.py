@@ -0,0 +1,24 @@
+import logging
+
+from app.core.logger import configure_logging, get_logger, parse_module_levels
+
+
+def test_parse_module_levels():
+    spec = "app.core.modules.spices=debug, app.core.job_queue=INFO,broken"
+    assert parse_module_levels(spec) == {
+        "app.core.modules.spices": "DEBUG",
+        "app.core.job_queue": "INFO",
+    }
+
+
+def test_module_levels_gate_debug_records():
+    configure_logging("WARNING", {"app.core.modules.spices.utils.spice_bridge": "DEBUG"})
+    try:
+        bridge = get_logger("app.core.modules.spices.utils.spice_bridge")
+        quiet = get_logger("app.core.modules.recipes.recipes_manager")
+
+        assert bridge.isEnabledFor(logging.DEBUG)
+        assert not quiet.isEnabledFor(logging.DEBUG)
+        assert quiet.isEnabledFor(logging.WARNING)
+    finally:
+        configure_logging("WARNING", {"app.core.modules.spices.utils.spice_bridge": "NOTSET"})
@@ -0,0 +1,87 @@
+from sqlalchemy import text
+
+from app.core import memory_catalog
+from app.core.db_manager import engine
+from app.core.modules.spices.spices_manager import suggest_spices_for_recipe
+
+
+def seed(client):
+    client.post("/recipes/", json={
+        "name": "Tomato Soup",
+        "steps": "Simmer",
+        "ingredients": [
+            {"name": "Tomato", "quantity": 4, "unit": "Unit"},
+            {"name": "Cream", "quantity": 100, "unit": "Mls"},
+        ],
+    })
+    client.post("/import/spice", json={"name": "Basil", "flavor_profile": "Fresh", "pairs_with_ingredients": "Tomato"})
+
+
+def use_memory(monkeypatch):
+    monkeypatch.setattr(memory_catalog, "catalog", memory_catalog.MemoryCatalog())
+
+
+def clear_behind_the_orm():
+    with engine.begin() as conn:
+        for table in ("recipe_ingredients", "recipes", "ingredients"):
+            conn.execute(text(f"DELETE FROM {table}"))
+
+
+def test_reads_are_answered_from_memory(test_client, monkeypatch):
+    seed(test_client)
+    use_memory(monkeypatch)
+    assert test_client.get("/recipes/Tomato Soup").json()["status"] == "success"
+
+    clear_behind_the_orm()
+
+    recipe = test_client.get("/recipes/Tomato Soup").json()["data"]
+    assert [(i["name"], i["quantity"]) for i in recipe["ingredients"]] == [("Tomato", 4.0), ("Cream", 100.0)]
+    assert [r["name"] for r in test_client.get("/recipes/").json()["data"]] == ["Tomato Soup"]
+    assert test_client.get("/ingredients/Cream").json()["data"] == {"name": "Cream", "unit": "Mls"}
+    assert [s["name"] for s in suggest_spices_for_recipe("Tomato Soup")] == ["Basil"]
+
+
+def test_committed_writes_are_followed(test_client, monkeypatch):
+    seed(test_client)
+    use_memory(monkeypatch)
+    test_client.get("/recipes/")
+    test_client.get("/spices/")
+
+    test_client.put("/ingredients/name", json={"old_name": "Tomato", "new_name": "Plum Tomato"})
+    test_client.put("/recipes/name", json={"old_name": "Tomato Soup", "new_name": "Gazpacho"})
+    test_client.put("/spices/", json={"name": "Basil", "flavor_profile": "Sweet"})
+
+    recipe = test_client.get("/recipes/Gazpacho").json()["data"]
+    assert recipe["ingredients"][0]["name"] == "Plum Tomato"
+    assert test_client.get("/recipes/Tomato Soup").json()["status"] == "error"
+    assert test_client.get("/spices/").json()[0]["flavor_profile"] == "Sweet"
+
+
+def test_ingredients_come_in_the_database_order(test_client, monkeypatch):
+    seed(test_client)
+    test_client.post("/recipes/", json={
+        "name": "Cream Of Tomato",
+        "steps": "Blend",
+        "ingredients": [
+            {"name": "Cream", "quantity": 50, "unit": "Mls"},
+            {"name": "Tomato", "quantity": 6, "unit": "Unit"},
+        ],
+    })
+    from_db = test_client.get("/recipes/Cream Of Tomato").json()["data"]
+
+    use_memory(monkeypatch)
+    assert test_client.get("/recipes/Cream Of Tomato").json()["data"] == from_db
+    assert [i["name"] for i in from_db["ingredients"]] == ["Tomato", "Cream"]
+
+
+def test_writes_from_other_processes_are_seen_after_max_age(test_client, monkeypatch):
+    seed(test_client)
+    use_memory(monkeypatch)
+    assert test_client.get("/recipes/Tomato Soup").json()["status"] == "success"
+
+    clear_behind_the_orm()
+    assert test_client.get("/recipes/Tomato Soup").json()["status"] == "success"
+
+    memory_catalog.catalog._main_built_at -= memory_catalog.DEFAULT_MAX_AGE
+    assert test_client.get("/recipes/Tomato Soup").json()["status"] == "error"
+    assert test_client.get("/recipes/").json()["data"] == []
@@ -0,0 +1,31 @@
+from app.core import metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram((1, 5))
+    for value in (0.5, 3, 3, 9):
+        histogram.observe(value)
+
+    assert histogram.snapshot()["buckets"] == {"1": 1, "5": 3, "+Inf": 4}
+    assert histogram.snapshot()["max"] == 9
+
+
+def test_requests_report_server_timing_and_route_histograms(test_client):
+    metrics.reset()
+    test_client.post("/recipes/", json={
+        "name": "Pancakes",
+        "ingredients": [{"name": "Flour", "quantity": 200, "unit": "g"}],
+        "steps": "Mix and cook",
+    })
+
+    response = test_client.get("/recipes/Pancakes")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing
+    assert " queries" in timing
+
+    data = test_client.get("/metrics").json()["data"]
+    detail = data["GET /recipes/{name}"]
+    assert detail["count"] == 1
+    assert detail["queries"]["sum"] > 0
+    assert data["POST /recipes/"]["queries"]["sum"] > 0
@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine, text
+
+from app.core.migrations import discover, migrate, status
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE recipes (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, steps VARCHAR)",
+    "CREATE TABLE ingredients (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, unit VARCHAR)",
+    "CREATE TABLE recipe_ingredients (recipe_id INTEGER, ingredient_id INTEGER, quantity FLOAT, "
+    "PRIMARY KEY (recipe_id, ingredient_id))",
+    "CREATE TABLE recipe_spices (recipe_id INTEGER, spice_id INTEGER, PRIMARY KEY (recipe_id, spice_id))",
+]
+
+
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+    return engine
+
+
+def test_existing_database_gets_reverse_lookup_indexes(tmp_path):
+    engine = legacy_engine(tmp_path)
+
+    assert migrate(engine) == [m.version for m in discover()]
+
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT recipe_id FROM recipe_ingredients WHERE ingredient_id = 1"
+        )))
+        spice_indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(recipe_spices)"))}
+
+    assert "COVERING INDEX ix_recipe_ingredients_ingredient_recipe" in plan
+    assert "ix_recipe_spices_spice_recipe" in spice_indexes
+    engine.dispose()
+
+
+def test_migrations_are_recorded_and_applied_once(tmp_path):
+    engine = legacy_engine(tmp_path)
+    migrate(engine)
+
+    assert migrate(engine) == []
+    assert all(row["applied"] for row in status(engine))
+    engine.dispose()
+
+
+def test_existing_database_gets_content_hash(tmp_path):
+    engine = legacy_engine(tmp_path)
+    migrate(engine)
+
+    with engine.connect() as conn:
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(recipes)"))}
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(recipes)"))}
+
+    assert "content_hash" in columns
+    assert "ix_recipes_content_hash" in indexes
+    engine.dispose()
+
+
+def test_existing_database_gets_guarded_search_triggers(tmp_path):
+    engine = legacy_engine(tmp_path)
+    migrate(engine)
+
+    with engine.connect() as conn:
+        triggers = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'recipes_fts%'"
+        )).scalars().all()
+
+    assert len(triggers) == 3
+    assert all("recipes_fts_paused" in sql for sql in triggers)
+    engine.dispose()
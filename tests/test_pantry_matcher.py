@@ -0,0 +1,81 @@
+import numpy as np
+
+from app.core import pantry_matcher
+
+RECIPES = [
+    ("Pancakes", ["Flour", "Egg", "Milk"]),
+    ("Pasta", ["Flour", "Egg"]),
+    ("Bread", ["Flour", "Yeast", "Salt"]),
+    ("Omelette", ["Egg", "Salt"]),
+]
+
+
+def seed(client):
+    for name, ingredients in RECIPES:
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": "Cook",
+            "ingredients": [{"name": i, "quantity": 1, "unit": "Unit"} for i in ingredients],
+        })
+
+
+def pantry(client, ingredients, **extra):
+    return client.post("/recipes/pantry", json={"ingredients": ingredients, **extra}).json()
+
+
+def test_ranks_by_missing_then_present(test_client):
+    seed(test_client)
+
+    body = pantry(test_client, ["flour", " EGG ", "Saffron"])
+
+    assert body["unknown"] == ["Saffron"]
+    assert [(r["name"], r["present"], r["missing"]) for r in body["data"]] == [
+        ("Pasta", 2, 0), ("Pancakes", 2, 1), ("Omelette", 1, 1), ("Bread", 1, 2),
+    ]
+    assert body["data"][1]["missing_ingredients"] == ["Milk"]
+    assert body["data"][3]["missing_ingredients"] == ["Salt", "Yeast"]
+
+
+def test_max_missing_and_limit(test_client):
+    seed(test_client)
+
+    body = pantry(test_client, ["Flour", "Egg"], max_missing=1, limit=2)
+
+    assert [r["name"] for r in body["data"]] == ["Pasta", "Pancakes"]
+
+
+def test_index_follows_recipe_writes(test_client):
+    seed(test_client)
+    assert pantry(test_client, ["Yeast"])["data"][0]["name"] == "Bread"
+
+    test_client.post("/recipes/", json={
+        "name": "Pizza",
+        "steps": "Bake",
+        "ingredients": [{"name": "Yeast", "quantity": 1, "unit": "Unit"}],
+    })
+    test_client.request("DELETE", "/recipes/", json={"name": "Bread"})
+
+    body = pantry(test_client, ["Yeast"])
+    assert [(r["name"], r["missing"]) for r in body["data"]] == [("Pizza", 0)]
+
+
+def test_rollback_is_not_published(test_client):
+    seed(test_client)
+    pantry(test_client, ["Egg"])
+
+    assert test_client.post("/recipes/", json={
+        "name": "Pasta",
+        "steps": "Again",
+        "ingredients": [{"name": "Egg", "quantity": 1, "unit": "Unit"}],
+    }).json()["status"] == "error"
+
+    assert not pantry_matcher.matcher._pending_recipes
+    assert len(pantry(test_client, ["Egg"])["data"]) == 3
+
+
+def test_popcount_fallback_matches_numpy():
+    words = np.array([[0, 1, 2**64 - 1], [2**63, 3, 0]], dtype=np.uint64)
+    lut = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    fallback = lut[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+    assert pantry_matcher.popcount(words).tolist() == fallback.tolist() == [[0, 1, 64], [1, 2, 0]]
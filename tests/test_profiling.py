@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import data_cleaner, profiling
+
+
+def slow_square(n):
+    return sum(i * i for i in range(n))
+
+
+profiled_square = profiling.instrument(slow_square)
+
+
+@pytest.fixture
+def profiled_client():
+    demo = FastAPI()
+
+    @demo.get("/square/{n}")
+    def square(n: int):
+        return {"value": profiled_square(n)}
+
+    demo.add_middleware(profiling.ProfilingMiddleware, sample_rate=0.0, token="secret")
+    profiling.reset()
+    yield TestClient(demo)
+    profiling.reset()
+
+
+@pytest.mark.skipif(profiling.ENABLED, reason="profiling enabled in this environment")
+def test_profiled_is_free_when_disabled():
+    assert profiling.profiled(slow_square) is slow_square
+    assert not hasattr(data_cleaner.normalize_universal_input, "__wrapped__")
+
+
+def test_header_profiles_request_into_route_buffer(profiled_client):
+    profiled_client.get("/square/2000", headers={"X-Profile": "secret"})
+
+    entries = profiling.snapshot()["GET /square/{n}"]
+    assert len(entries) == 1
+    assert entries[0]["trigger"] == "header"
+    assert any("slow_square" in row["function"] for row in entries[0]["top"])
+
+
+def test_requests_without_matching_header_are_not_profiled(profiled_client):
+    profiled_client.get("/square/10")
+    profiled_client.get("/square/10", headers={"X-Profile": "wrong"})
+
+    assert profiling.snapshot() == {}
+
+
+def test_admin_endpoint_lists_profiles(test_client):
+    response = test_client.get("/admin/profiles")
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is profiling.ENABLED
@@ -0,0 +1,56 @@
+from sqlalchemy import func, select
+
+from app.core import db_manager
+from app.core.db_manager import RecipeIngredient
+from app.core.modules.recipes.recipes_manager import remove_recipe
+
+
+def seed(client, names):
+    for name in names:
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": "Bake slowly",
+            "ingredients": [{"name": "Flour", "quantity": 1, "unit": "Unit"}],
+        })
+
+
+def link_count():
+    with db_manager.session_scope() as session:
+        return session.scalar(select(func.count()).select_from(RecipeIngredient))
+
+
+def test_bulk_delete_by_names_removes_links(test_client):
+    seed(test_client, ["Bread", "Cake", "Scones"])
+
+    body = test_client.request("DELETE", "/recipes/batch", json={"names": ["bread", "cake", "waffles"]}).json()
+
+    assert body == {"status": "success", "deleted": 2, "not_found": ["Waffles"]}
+    assert link_count() == 1
+    pantry = test_client.post("/recipes/pantry", json={"ingredients": ["Flour"]}).json()
+    assert [r["name"] for r in pantry["data"]] == ["Scones"]
+    assert test_client.get("/recipes/search", params={"q": "bake"}).json()["total"] == 1
+
+
+def test_bulk_delete_by_pattern_and_dry_run(test_client):
+    seed(test_client, ["Christmas Cake", "Christmas Pudding", "Easter Bread"])
+
+    dry = test_client.request("DELETE", "/recipes/batch", json={"name_pattern": "christmas *", "dry_run": True}).json()
+    assert dry["matched"] == 2
+    assert len(test_client.get("/recipes/").json()["data"]) == 3
+
+    body = test_client.request("DELETE", "/recipes/batch", json={"name_pattern": "christmas *"}).json()
+    assert body["deleted"] == 2
+    assert [r["name"] for r in test_client.get("/recipes/").json()["data"]] == ["Easter Bread"]
+
+
+def test_bulk_delete_needs_names_or_pattern(test_client):
+    body = test_client.request("DELETE", "/recipes/batch", json={}).json()
+
+    assert body["status"] == "error"
+
+
+def test_single_delete_cascades_in_database(test_client):
+    seed(test_client, ["Bread"])
+
+    assert remove_recipe({"name": "Bread"})["status"] == "success"
+    assert link_count() == 0
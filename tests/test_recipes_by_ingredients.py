@@ -0,0 +1,54 @@
+RECIPES = [
+    ("Pancakes", ["Flour", "Egg", "Milk"]),
+    ("Pasta", ["Flour", "Egg"]),
+    ("Bread", ["Flour", "Yeast", "Salt"]),
+    ("Omelette", ["Egg", "Salt"]),
+]
+
+
+def seed(client):
+    for name, ingredients in RECIPES:
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": "Cook",
+            "ingredients": [{"name": i, "quantity": 1, "unit": "Unit"} for i in ingredients],
+        })
+
+
+def test_match_all_with_exclusion(test_client):
+    seed(test_client)
+
+    body = test_client.get("/recipes/by-ingredients", params={"include": "flour,egg", "exclude": "milk"}).json()
+
+    assert body["total"] == 1
+    assert body["data"] == [{"name": "Pasta", "matched": 2, "coverage": 1.0, "ingredient_count": 2}]
+
+
+def test_match_any_ranks_by_coverage_and_paginates(test_client):
+    seed(test_client)
+    params = [("include", "Flour"), ("include", "Egg"), ("include", "Salt"), ("match", "any"), ("page_size", 2)]
+
+    first = test_client.get("/recipes/by-ingredients", params=params).json()
+    second = test_client.get("/recipes/by-ingredients", params=params + [("page", 2)]).json()
+
+    assert first["total"] == 4
+    assert [r["matched"] for r in first["data"] + second["data"]] == [2, 2, 2, 2]
+    assert [r["name"] for r in first["data"] + second["data"]] == ["Pancakes", "Pasta", "Bread", "Omelette"]
+
+
+def test_unknown_ingredient_matches_nothing_when_all_required(test_client):
+    seed(test_client)
+
+    body = test_client.get("/recipes/by-ingredients", params={"include": "Flour,Saffron"}).json()
+
+    assert body["status"] == "success"
+    assert body["data"] == []
+
+
+def test_page_past_the_end_keeps_total(test_client):
+    seed(test_client)
+
+    body = test_client.get("/recipes/by-ingredients", params={"include": "Egg", "page": 5}).json()
+
+    assert body["data"] == []
+    assert body["total"] == 3
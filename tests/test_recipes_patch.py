@@ -0,0 +1,112 @@
+def seed(client):
+    for name, ingredients in [("Pancakes", ["Flour", "Egg", "Milk"]), ("Omelette", ["Egg", "Salt"])]:
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": "Cook",
+            "ingredients": [{"name": i, "quantity": 1, "unit": "Unit"} for i in ingredients],
+        })
+
+
+def ingredients(client, name):
+    recipe = client.get(f"/recipes/{name}").json()["data"]
+    return {i["name"]: i["quantity"] for i in recipe["ingredients"]}
+
+
+def test_patch_applies_operations_in_order(test_client):
+    seed(test_client)
+
+    body = test_client.patch("/recipes/pancakes", json={"operations": [
+        {"op": "replace_ingredient", "old": "milk", "new": "oat milk"},
+        {"op": "set_quantity", "name": "Oat Milk", "quantity": 250},
+        {"op": "add_ingredient", "name": "Sugar", "quantity": 20, "unit": "grm"},
+        {"op": "remove_ingredient", "name": "Egg"},
+        {"op": "set_steps", "steps": "Whisk and fry"},
+        {"op": "rename", "new_name": "vegan pancakes"},
+    ]}).json()
+
+    assert body["status"] == "success"
+    assert body["data"]["name"] == "Vegan Pancakes"
+    assert ingredients(test_client, "Vegan Pancakes") == {"Flour": 1.0, "Oat Milk": 250.0, "Sugar": 20.0}
+
+
+def test_failing_operation_leaves_recipe_untouched(test_client):
+    seed(test_client)
+
+    body = test_client.patch("/recipes/Pancakes", json={"operations": [
+        {"op": "set_quantity", "name": "Flour", "quantity": 500},
+        {"op": "remove_ingredient", "name": "Butter"},
+    ]}).json()
+
+    assert body["status"] == "error" and body["operation"] == 1
+    assert ingredients(test_client, "Pancakes")["Flour"] == 1.0
+
+
+def test_unknown_operation_is_rejected(test_client):
+    seed(test_client)
+
+    response = test_client.patch("/recipes/Pancakes", json={"operations": [{"op": "explode"}]})
+
+    assert response.status_code == 422
+
+
+def test_batch_patch_reports_per_recipe(test_client):
+    seed(test_client)
+
+    body = test_client.patch("/recipes/", json={"patches": [
+        {"name": "Pancakes", "operations": [{"op": "set_quantity", "name": "Milk", "quantity": 3}]},
+        {"name": "Omelette", "operations": [{"op": "rename", "new_name": "Pancakes"}]},
+        {"name": "Waffles", "operations": [{"op": "set_steps", "steps": "Bake"}]},
+    ]}).json()
+
+    assert body["applied"] == 1
+    assert [r["status"] for r in body["results"]] == ["success", "error", "error"]
+    assert ingredients(test_client, "Pancakes")["Milk"] == 3.0
+
+
+def test_atomic_batch_patch(test_client):
+    seed(test_client)
+
+    body = test_client.patch("/recipes/", json={"atomic": True, "patches": [
+        {"name": "Pancakes", "operations": [{"op": "set_quantity", "name": "Milk", "quantity": 3}]},
+        {"name": "Omelette", "operations": [{"op": "remove_ingredient", "name": "Milk"}]},
+    ]}).json()
+
+    assert [r["status"] for r in body["results"]] == ["skipped", "error"]
+    assert ingredients(test_client, "Pancakes")["Milk"] == 1.0
+
+
+def test_batch_rename_collisions_are_order_independent(test_client):
+    seed(test_client)
+
+    body = test_client.patch("/recipes/", json={"patches": [
+        {"name": "Omelette", "operations": [{"op": "rename", "new_name": "Pancakes"}]},
+        {"name": "Pancakes", "operations": [{"op": "set_steps", "steps": "Fry"}]},
+    ]}).json()
+
+    assert [r["status"] for r in body["results"]] == ["error", "success"]
+
+
+def test_set_steps_keeps_the_text_as_given(test_client):
+    seed(test_client)
+
+    test_client.patch("/recipes/pancakes", json={"operations": [{"op": "set_steps", "steps": "  mix flour and fry "}]})
+
+    assert test_client.get("/recipes/Pancakes").json()["data"]["steps"] == "mix flour and fry"
+
+
+def test_added_name_is_checked_after_typo_resolution(test_client):
+    test_client.post("/recipes/", json={
+        "name": "Soup", "steps": "Boil", "ingredients": [{"name": "Tomato Paste", "quantity": 1, "unit": "Unit"}],
+    })
+    add = {"operations": [{"op": "add_ingredient", "name": "Tomato Pastes", "quantity": 2, "unit": "unit"}]}
+
+    response = test_client.patch("/recipes/Soup", params={"fix_typos": True}, json=add)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "error" and response.json()["operation"] == 0
+    assert ingredients(test_client, "Soup") == {"Tomato Paste": 1.0}
+
+    body = test_client.patch("/recipes/Soup", json=add).json()
+
+    assert body["status"] == "success"
+    assert body["suggestions"] == {"Tomato Pastes": ["Tomato Paste"]}
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.db_manager import bulk_load_search_index, engine, search_triggers_suspended
+from app.core.modules.recipes.recipes_manager import fts_query
+
+RECIPES = [
+    ("Pancakes", "Mix flour and milk, then fry until golden."),
+    ("Tomato Soup", "Roast the tomatoes and blend with cream."),
+    ("Golden Rice", "Cook rice with turmeric."),
+]
+
+
+def seed(client):
+    for name, steps in RECIPES:
+        client.post("/recipes/", json={
+            "name": name,
+            "steps": steps,
+            "ingredients": [{"name": "Salt", "quantity": 1, "unit": "Unit"}],
+        })
+
+
+def search(client, q, **params):
+    return client.get("/recipes/search", params={"q": q, **params}).json()
+
+
+def test_name_hits_rank_first_with_snippets(test_client):
+    seed(test_client)
+
+    body = search(test_client, "golden")
+
+    assert body["total"] == 2
+    assert [r["name"] for r in body["data"]] == ["Golden Rice", "Pancakes"]
+    assert "<mark>golden</mark>" in body["data"][1]["snippet"]
+
+
+def test_prefix_and_diacritics(test_client):
+    seed(test_client)
+
+    assert [r["name"] for r in search(test_client, "tomat")["data"]] == ["Tomato Soup"]
+    assert [r["name"] for r in search(test_client, "créam")["data"]] == ["Tomato Soup"]
+
+
+def test_index_follows_updates_and_deletes(test_client):
+    seed(test_client)
+
+    test_client.put("/recipes/name", json={"old_name": "Pancakes", "new_name": "Crepes"})
+    test_client.request("DELETE", "/recipes/", json={"name": "Golden Rice"})
+
+    assert [r["name"] for r in search(test_client, "golden")["data"]] == ["Crepes"]
+
+
+def test_operators_are_literal_and_empty_query_errors(test_client):
+    seed(test_client)
+
+    assert fts_query('soup" OR NEAR(x') == '"soup" "OR" "NEAR" "x"*'
+    assert search(test_client, "soup OR")["total"] == 0
+    assert search(test_client, "!!!")["status"] == "error"
+
+
+def test_bulk_load_rebuilds_index_once(test_client):
+    with engine.begin() as conn, bulk_load_search_index(conn):
+        conn.execute(text("INSERT INTO recipes (id, name, steps) VALUES (10, 'Bulk Stew', 'Simmer slowly')"))
+        assert conn.execute(text("SELECT count(*) FROM recipes_fts WHERE recipes_fts MATCH 'simmer'")).scalar() == 0
+
+    assert [r["name"] for r in search(test_client, "simmer")["data"]] == ["Bulk Stew"]
+
+
+def test_bulk_upsert_indexes_the_batch_and_keeps_triggers(test_client):
+    test_client.post("/import/bulk?mode=replace", json=[
+        {"name": "Stew", "steps": "Simmer slowly", "ingredients": [{"name": "Beef", "quantity": 1, "unit": "Kg"}]},
+    ])
+    test_client.post("/import/bulk?mode=replace", json=[
+        {"name": "Stew", "steps": "Braise gently", "ingredients": [{"name": "Beef", "quantity": 1, "unit": "Kg"}]},
+        {"name": "Braised Leeks", "steps": "Butter", "ingredients": [{"name": "Leek", "quantity": 2, "unit": "Unit"}]},
+    ])
+
+    assert search(test_client, "simmer")["total"] == 0
+    assert [r["name"] for r in search(test_client, "braise")["data"]] == ["Braised Leeks", "Stew"]
+    with engine.connect() as conn:
+        triggers = conn.execute(text("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'recipes_fts%'")).scalar()
+    assert triggers == 3
+    seed(test_client)
+    assert [r["name"] for r in search(test_client, "pancakes")["data"]] == ["Pancakes"]
+
+
+def test_failed_bulk_write_leaves_search_triggers_working(test_client):
+    with pytest.raises(RuntimeError):
+        with engine.begin() as conn, search_triggers_suspended(conn):
+            conn.execute(text("INSERT INTO recipes (id, name, steps) VALUES (10, 'Lost Stew', 'Simmer')"))
+            raise RuntimeError("import failed")
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM recipes_fts_paused")).scalar() == 0
+    seed(test_client)
+    test_client.post("/recipes/", json={"name": "Crepes", "steps": "Fry thin", "ingredients": []})
+    assert [r["name"] for r in search(test_client, "crepes")["data"]] == ["Crepes"]
+    assert search(test_client, "stew")["total"] == 0
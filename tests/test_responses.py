@@ -0,0 +1,41 @@
+import json
+from unittest import mock
+
+import fastapi.routing
+from fastapi import FastAPI, APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.responses import FastJSONResponse, FastJSONRoute, dumps
+
+
+class Point(BaseModel):
+    x: int
+
+
+def test_dumps_matches_the_default_encoder():
+    payload = {"status": "success", "data": [{"name": "Crème Brûlée", "quantity": 1.5, "point": Point(x=1)}], 3: None}
+
+    assert json.loads(dumps(payload)) == json.loads(json.dumps(jsonable_encoder(payload)))
+
+
+def test_route_skips_jsonable_encoder_and_keeps_status_code():
+    router = APIRouter(route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+    @router.post("/items", status_code=201)
+    def create():
+        return {"status": "success", "data": list(range(3))}
+
+    @router.get("/model", response_model=Point)
+    def model():
+        return {"x": 2}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        with mock.patch.object(fastapi.routing, "jsonable_encoder", side_effect=AssertionError("slow path")):
+            response = client.post("/items")
+        assert response.status_code == 201
+        assert response.json() == {"status": "success", "data": [0, 1, 2]}
+        assert client.get("/model").json() == {"x": 2}
@@ -0,0 +1,68 @@
+import pytest
+
+from app.core import db_manager
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+    def close(self):
+        self.calls.append("close")
+
+
+def test_private_session_is_rolled_back_and_closed_on_error():
+    fake = FakeSession()
+
+    with pytest.raises(RuntimeError):
+        with db_manager.session_scope(factory=lambda: fake):
+            raise RuntimeError("boom")
+
+    assert fake.calls == ["rollback", "close"]
+
+
+def test_injected_session_is_left_to_the_request():
+    fake = FakeSession()
+
+    with db_manager.session_scope(fake) as session:
+        assert session is fake
+
+    assert fake.calls == []
+
+
+def test_request_checks_out_a_single_main_session(test_client, monkeypatch):
+    opened = []
+    factory = db_manager.SessionLocal
+
+    def counting_factory():
+        session = factory()
+        opened.append(session)
+        return session
+
+    monkeypatch.setattr("app.core.db_manager.SessionLocal", counting_factory)
+
+    recipe = {
+        "name": "Omelette",
+        "steps": "Beat and cook.",
+        "ingredients": [
+            {"name": "Egg", "quantity": 3, "unit": "Unit"},
+            {"name": "Butter", "quantity": 10, "unit": "Grm"},
+        ],
+    }
+    assert test_client.post("/recipes/", json=recipe).json()["status"] == "success"
+    assert len(opened) == 1
+
+    opened.clear()
+    res = test_client.put("/recipes/quantity", json={
+        "recipe_name": "Omelette", "ingredient": "Egg", "new_quantity": 4
+    })
+    assert res.json()["status"] == "success"
+    assert len(opened) == 1
+
+    assert test_client.get("/recipes/Omelette").json()["data"]["ingredients"][0]["quantity"] == 4.0
@@ -0,0 +1,137 @@
+from app.core.modules.spices.db import spices_models
+from app.core.modules.spices.db.spices_models import SpicePairing
+from app.core.modules.spices import spices_manager
+from app.core.modules.spices.spices_manager import learning_queue
+
+
+def learned_pairs():
+    session = spices_models.SessionLocal()
+    try:
+        return {
+            p.ingredient: p.co_occurrences
+            for p in session.query(SpicePairing).all()
+        }
+    finally:
+        session.close()
+
+
+def test_recipe_write_learns_pairs_once(test_client):
+    spice = {
+        "name": "Cinnamon",
+        "flavor_profile": "Warm and sweet",
+        "recommended_quantity": "1 tsp per loaf",
+        "pairs_with_ingredients": [],
+        "pairs_with_recipes": [],
+    }
+    assert test_client.post("/spices/", json=spice).status_code == 201
+
+    for name in ("Banana Bread", "Banana Pie"):
+        recipe = {
+            "name": name,
+            "steps": "Mash and bake.",
+            "ingredients": [
+                {"name": "Banana", "quantity": 150, "unit": "Grm"},
+                {"name": "Flour", "quantity": 200, "unit": "Grm"},
+            ],
+            "spices": ["Cinnamon"],
+        }
+        assert test_client.post("/recipes/", json=recipe).json()["status"] == "success"
+
+    assert learning_queue.flush(timeout=5)
+    assert learned_pairs() == {"Banana": 2, "Flour": 2}
+
+    res = test_client.get("/spices/suggest/Banana Pie")
+    assert any(s["name"] == "Cinnamon" for s in res.json())
+
+
+def test_relearn_catalog_rebuilds_counts(test_client):
+    spice = {"name": "Nutmeg", "pairs_with_ingredients": [], "pairs_with_recipes": []}
+    test_client.post("/spices/", json=spice)
+    recipe = {
+        "name": "Custard",
+        "steps": "Whisk and bake.",
+        "ingredients": [{"name": "Milk", "quantity": 500, "unit": "Mls"}],
+        "spices": ["Nutmeg"],
+    }
+    test_client.post("/recipes/", json=recipe)
+    learning_queue.flush(timeout=5)
+
+    res = test_client.post("/spices/learn")
+    assert res.status_code == 200
+    assert res.json() == {"status": "success", "pairs": 1}
+    assert learned_pairs() == {"Milk": 1}
+
+
+def test_reimport_does_not_inflate_pairs(test_client):
+    test_client.post("/spices/", json={"name": "Clove", "pairs_with_ingredients": [], "pairs_with_recipes": []})
+
+    def recipe(steps, **ingredients):
+        return [{
+            "name": "Mulled Wine",
+            "steps": steps,
+            "ingredients": [{"name": n, "quantity": q, "unit": "Grm"} for n, q in ingredients.items()],
+            "spices": ["Clove"],
+        }]
+
+    test_client.post("/import/bulk?mode=replace", json=recipe("Simmer.", Wine=750, Orange=1))
+    assert learning_queue.flush(timeout=5)
+    assert learned_pairs() == {"Wine": 1, "Orange": 1}
+
+    test_client.post("/import/bulk?mode=replace", json=recipe("Simmer gently.", Wine=750, Orange=1))
+    assert learning_queue.flush(timeout=5)
+    assert learned_pairs() == {"Wine": 1, "Orange": 1}
+
+    test_client.post("/import/bulk?mode=replace", json=recipe("Simmer.", Wine=750, Honey=20))
+    assert learning_queue.flush(timeout=5)
+    assert learned_pairs() == {"Wine": 1, "Honey": 1}
+
+    test_client.post("/spices/learn")
+    assert learned_pairs() == {"Wine": 1, "Honey": 1}
+
+
+def cinnamon_recipe(client, name, *ingredients):
+    client.post("/recipes/", json={
+        "name": name,
+        "steps": "Bake.",
+        "ingredients": [{"name": i, "quantity": 1, "unit": "Unit"} for i in ingredients],
+        "spices": ["Cinnamon"],
+    })
+
+
+def test_failed_learning_is_retried_with_its_links(test_client, monkeypatch):
+    test_client.post("/spices/", json={"name": "Cinnamon", "pairs_with_ingredients": [], "pairs_with_recipes": []})
+    learn = spices_manager.auto_learn_from_recipes
+    attempts = []
+
+    def flaky(jobs, main_session=None):
+        attempts.append(jobs)
+        if len(attempts) == 1:
+            return {"status": "error", "message": "database is locked"}
+        return learn(jobs, main_session)
+
+    monkeypatch.setattr(spices_manager, "auto_learn_from_recipes", flaky)
+    cinnamon_recipe(test_client, "Apple Pie", "Apple", "Flour")
+    assert learning_queue.flush(timeout=5)
+
+    assert len(attempts) == 2
+    assert learned_pairs() == {"Apple": 1, "Flour": 1}
+
+
+def test_removals_and_patches_follow_learned_pairs(test_client):
+    test_client.post("/spices/", json={"name": "Cinnamon", "pairs_with_ingredients": [], "pairs_with_recipes": []})
+    cinnamon_recipe(test_client, "Apple Pie", "Apple", "Flour", "Butter")
+    cinnamon_recipe(test_client, "Apple Crumble", "Apple", "Oats")
+    cinnamon_recipe(test_client, "Buns", "Flour")
+    assert learning_queue.flush(timeout=5)
+
+    test_client.request("DELETE", "/recipes/ingredient", json={"name": "Apple Pie", "ingredient": "Butter"})
+    test_client.patch("/recipes/Apple Crumble", json={"operations": [
+        {"op": "replace_ingredient", "old": "Oats", "new": "Pear"},
+    ]})
+    test_client.request("DELETE", "/recipes/", json={"name": "Buns"})
+    test_client.request("DELETE", "/recipes/batch", json={"names": ["Apple Pie"]})
+
+    expected = {"Apple": 1, "Pear": 1}
+    assert learned_pairs() == expected
+    test_client.post("/spices/learn")
+    assert learned_pairs() == expected
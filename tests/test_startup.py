@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+IMPORT_BUDGET_SECONDS = 1.5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+from app.core import db_manager
+from app.core.modules.spices.db import spices_models
+print(json.dumps({
+    "seconds": elapsed,
+    "engines": [db_manager._engine is not None, spices_models._engine is not None],
+}))
+"""
+
+
+def test_importing_the_app_is_fast_and_touches_no_database(tmp_path):
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    env.pop("PYTEST_CURRENT_TEST", None)
+
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, env=env,
+        capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["engines"] == [False, False]
+    assert list(tmp_path.iterdir()) == []
+    assert probe["seconds"] < IMPORT_BUDGET_SECONDS